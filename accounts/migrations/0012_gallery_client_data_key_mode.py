@@ -0,0 +1,18 @@
+# Generated by Django 5.2 on 2026-10-17 10:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0011_gallery_logo'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='gallery',
+            name='client_data_key_mode',
+            field=models.CharField(choices=[('accessor', '컬럼 accessor 키'), ('column_id', '컬럼 ID 키')], default='accessor', editable=False, max_length=20, verbose_name='고객 데이터 키 방식'),
+        ),
+    ]
@@ -55,6 +55,18 @@ class Gallery(models.Model):
         verbose_name="자동 생성 갤러리"
     )
     
+    # 고객 data 저장 키 방식 (clients.column_keys 참고)
+    client_data_key_mode = models.CharField(
+        max_length=20,
+        choices=[
+            ('accessor', '컬럼 accessor 키'),
+            ('column_id', '컬럼 ID 키'),
+        ],
+        default='accessor',
+        editable=False,  # 전환은 convert_client_data_keys 명령으로만 (data 변환 필요)
+        verbose_name="고객 데이터 키 방식"
+    )
+    
     # 상태 관리
     is_active = models.BooleanField(default=True, verbose_name="활성 상태")
     subscription_expires = models.DateTimeField(null=True, blank=True, verbose_name="구독 만료일")
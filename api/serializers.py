@@ -1,4 +1,5 @@
 from rest_framework import serializers
+from clients.column_keys import get_data_key_map
 from clients.models import ClientColumn
 from clients.models import Client, Tag
 
@@ -29,8 +30,16 @@ class ClientSerializer(serializers.ModelSerializer):
             client.tags.set(tag_ids)
         return client
     
+    def to_representation(self, instance):
+        rep = super().to_representation(instance)
+        if 'data' in rep:
+            rep['data'] = get_data_key_map(instance.gallery_id).to_accessors(rep['data'])
+        return rep
+    
     def update(self, instance, validated_data):
         tag_ids = validated_data.pop('tag_ids', None)
+        if 'data' in validated_data:
+            validated_data['data'] = get_data_key_map(instance.gallery_id).to_storage(validated_data['data'])
         for attr, value in validated_data.items():
             setattr(instance, attr, value)
         instance.save()
@@ -5,4 +5,12 @@ class StaticStorage(S3Boto3Storage):
 
 class MediaStorage(S3Boto3Storage):
     location = "media"
-    file_overwrite = False 
\ No newline at end of file
+    file_overwrite = False
+
+class PrivateUploadStorage(S3Boto3Storage):
+    """공개 URL 없이 서버에서만 읽는 업로드 파일 (고객 엑셀 가져오기 등)"""
+    location = "private"
+    default_acl = "private"
+    file_overwrite = False
+    querystring_auth = True
+    custom_domain = None
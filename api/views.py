@@ -1,12 +1,22 @@
+import logging
+
+from django.db import transaction
 from rest_framework import viewsets, permissions
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status
 from clients.models import ClientColumn
 from clients.models import Client, Tag
+from clients.column_keys import get_data_key_map
+from clients.column_sync import ColumnSyncError, sync_gallery_columns
+from clients.metadata import get_gallery_metadata
+from clients.data_keys import rename_client_data_key
+from clients.versioning import GalleryETagListMixin
 from .serializers import ClientColumnSerializer, ClientSerializer, TagSerializer
 
-class ClientColumnViewSet(viewsets.ModelViewSet):
+logger = logging.getLogger(__name__)
+
+class ClientColumnViewSet(GalleryETagListMixin, viewsets.ModelViewSet):
     queryset = ClientColumn.objects.all().order_by('order', 'id')
     serializer_class = ClientColumnSerializer
     pagination_class = None  # 페이지네이션 비활성화 - 모든 컬럼을 한번에 가져오기
@@ -20,11 +30,19 @@ class ClientColumnViewSet(viewsets.ModelViewSet):
             return ClientColumn.objects.filter(gallery_id=user.gallery_id).order_by('order', 'id')
         return ClientColumn.objects.none()
     
+    def list_response(self, request, *args, **kwargs):
+        """컬럼 목록은 갤러리 메타데이터 캐시에서 응답 (ClientColumnSerializer와 같은 형태)"""
+        gallery_id = request.user.gallery_id
+        columns = get_gallery_metadata(gallery_id).columns
+        return Response([{'id': column['id'], 'gallery': gallery_id, **{
+            field: column[field] for field in ('header', 'accessor', 'type', 'order')
+        }} for column in columns])
+    
     def perform_create(self, serializer):
         """컬럼 생성 시 현재 사용자의 갤러리 자동 할당 (중복 방지)"""
         gallery = getattr(self.request.user, 'gallery', None)
         if not gallery:
-            print(f"❌ 컬럼 생성 실패: 사용자 {self.request.user.username}에게 갤러리가 할당되지 않음")
+            logger.warning('컬럼 생성 실패: 사용자 %s에게 갤러리가 할당되지 않음', self.request.user.username)
             from rest_framework.exceptions import ValidationError
             raise ValidationError("갤러리 정보가 없습니다. 관리자에게 문의하세요.")
         
@@ -39,89 +57,82 @@ class ClientColumnViewSet(viewsets.ModelViewSet):
         ).first()
         
         if existing_column:
-            print(f"⚠️ 컬럼 중복 생성 방지: {header} (accessor: {accessor}) 이미 존재")
+            logger.info('컬럼 중복 생성 방지: %s (accessor: %s) 이미 존재', header, accessor)
             from rest_framework.exceptions import ValidationError
             raise ValidationError(f"'{header}' 컬럼이 이미 존재합니다.")
         
-        print(f"✅ 컬럼 생성: {header} (갤러리: {gallery.name})")
+        logger.info('컬럼 생성: %s (갤러리: %s)', header, gallery.name)
         serializer.save(gallery=gallery)
     
     def update(self, request, *args, **kwargs):
         """컬럼 수정 시 데이터 마이그레이션 포함"""
-        print(f"🔧 컬럼 수정 요청 시작: {kwargs}")
-        print(f"🔧 수정할 데이터: {request.data}")
+        logger.debug('컬럼 수정 요청: %s, 데이터: %s', kwargs, request.data)
         
         try:
             instance = self.get_object()
             old_accessor = instance.accessor
-            print(f"🔧 수정할 컬럼 찾음: {instance.header} (ID: {instance.id})")
-            print(f"🔧 기존 데이터: header={instance.header}, accessor={old_accessor}, type={instance.type}")
+            logger.debug(
+                '수정할 컬럼: ID %s, header=%s, accessor=%s, type=%s',
+                instance.id, instance.header, old_accessor, instance.type,
+            )
             
             # 새로운 accessor 값 확인
             new_accessor = request.data.get('accessor')
             
             # accessor가 변경되는 경우 클라이언트 데이터 마이그레이션
-            if new_accessor and new_accessor != old_accessor:
-                print(f"🔄 accessor 변경 감지: {old_accessor} → {new_accessor}")
-                print(f"🔄 클라이언트 데이터 마이그레이션 시작...")
-                
-                # 현재 갤러리의 클라이언트만 대상으로 data 필드에서 키 변경
-                from clients.models import Client
-                user = getattr(self.request, 'user', None)
-                if user and getattr(user, 'gallery_id', None):
-                    clients = Client.objects.filter(gallery_id=user.gallery_id)
-                else:
-                    clients = Client.objects.none()
-                updated_count = 0
-                
-                for client in clients:
-                    if client.data and old_accessor in client.data:
-                        # 기존 값 백업
-                        old_value = client.data[old_accessor]
-                        
-                        # 새 키로 값 복사
-                        client.data[new_accessor] = old_value
-                        
-                        # 기존 키 제거
-                        del client.data[old_accessor]
-                        
-                        # 저장
-                        client.save(update_fields=['data'])
-                        updated_count += 1
-                        
-                        print(f"🔄 클라이언트 {client.id}({client.name}) 데이터 마이그레이션: {old_accessor} → {new_accessor}")
+            # (UPDATE 한 문장으로 JSON 키 변경, 대상이 많으면 백그라운드 작업으로 처리)
+            data_migration = None
+            with transaction.atomic():
+                if new_accessor and new_accessor != old_accessor:
+                    logger.info('컬럼 %s accessor 변경: %s -> %s', instance.id, old_accessor, new_accessor)
+                    
+                    # 현재 갤러리의 클라이언트만 대상으로 data 필드에서 키 변경
+                    # (컬럼 ID 키로 저장하는 갤러리는 data에 accessor가 없으므로 변경할 것이 없음)
+                    user = getattr(self.request, 'user', None)
+                    if user and getattr(user, 'gallery_id', None) and get_data_key_map(user.gallery_id).keyed_by_id:
+                        data_migration = {'status': 'done', 'updated_count': 0}
+                        logger.debug('컬럼 ID 키 저장 갤러리 - 데이터 마이그레이션 불필요')
+                    elif user and getattr(user, 'gallery_id', None):
+                        updated_count, job = rename_client_data_key(
+                            user.gallery_id, old_accessor, new_accessor, created_by=user
+                        )
+                        if job:
+                            data_migration = {'status': 'queued', 'job_id': job.id, 'total': job.progress_total}
+                            logger.info('대상 고객 %s명 - 백그라운드 작업 #%s로 마이그레이션', job.progress_total, job.id)
+                        else:
+                            data_migration = {'status': 'done', 'updated_count': updated_count}
+                            logger.info('데이터 마이그레이션 완료: %s개 클라이언트 업데이트', updated_count)
                 
-                print(f"✅ 데이터 마이그레이션 완료: {updated_count}개 클라이언트 업데이트")
-            
-            # 컬럼 수정 수행
-            result = super().update(request, *args, **kwargs)
+                # 컬럼 수정 수행
+                result = super().update(request, *args, **kwargs)
+            if data_migration is not None:
+                result.data['data_migration'] = data_migration
             
             # 업데이트된 인스턴스 다시 로드
             instance.refresh_from_db()
-            print(f"🔧 컬럼 수정 완료: {instance.header} (ID: {instance.id})")
-            print(f"🔧 수정된 데이터: header={instance.header}, accessor={instance.accessor}, type={instance.type}")
+            logger.debug(
+                '컬럼 수정 완료: ID %s, header=%s, accessor=%s, type=%s',
+                instance.id, instance.header, instance.accessor, instance.type,
+            )
             
             return result
-        except Exception as e:
-            print(f"❌ 컬럼 수정 실패: {e}")
-            print(f"❌ 에러 상세: {type(e).__name__}: {str(e)}")
+        except Exception:
+            logger.exception('컬럼 수정 실패: %s', kwargs)
             raise
     
     def destroy(self, request, *args, **kwargs):
         """컬럼 삭제 시 더 확실한 처리"""
         try:
-            print(f"🗑️ 컬럼 삭제 요청 시작: {kwargs}")
+            logger.debug('컬럼 삭제 요청: %s', kwargs)
             
             instance = self.get_object()
             column_id = instance.id
             column_header = instance.header
             
-            print(f"🗑️ 삭제할 컬럼 찾음: {column_header} (ID: {column_id})")
-            
             # 실제 삭제 수행
             instance.delete()
             
-            print(f"🗑️ 컬럼 삭제 완료: {column_header} (ID: {column_id})")
+            logger.info('컬럼 삭제: %s (ID: %s)', column_header, column_id)
             
             return Response({
                 'message': f'컬럼 "{column_header}"이(가) 삭제되었습니다.',
@@ -131,8 +142,7 @@ class ClientColumnViewSet(viewsets.ModelViewSet):
             }, status=status.HTTP_200_OK)
             
         except Exception as e:
-            print(f"❌ 컬럼 삭제 실패: {e}")
-            print(f"❌ 에러 상세: {type(e).__name__}: {str(e)}")
+            logger.exception('컬럼 삭제 실패: %s', kwargs)
             return Response({
                 'error': f'컬럼 삭제 실패: {str(e)}',
                 'success': False
@@ -152,16 +162,16 @@ class ClientColumnSyncView(APIView):
         if not gallery:
             return Response({'detail': '갤러리 정보가 필요합니다.'}, status=400)
         
-        # 현재 갤러리의 컬럼만 삭제
-        ClientColumn.objects.filter(gallery=gallery).delete()
-        
-        # bulk create with gallery
-        objs = []
-        for col in columns:
-            col['gallery'] = gallery
-            objs.append(ClientColumn(**col))
-        ClientColumn.objects.bulk_create(objs)
-        return Response({'status': 'ok', 'count': len(objs)}, status=status.HTTP_201_CREATED)
+        # 기존 컬럼과 비교해 추가/수정/삭제분만 반영 (컬럼 ID 유지)
+        try:
+            result = sync_gallery_columns(gallery.id, columns, created_by=user)
+        except ColumnSyncError as e:
+            return Response({'detail': str(e)}, status=400)
+        logger.info(
+            '컬럼 동기화 (갤러리 %s): 추가 %s, 수정 %s, 삭제 %s',
+            gallery.id, result['created'], result['updated'], result['deleted'],
+        )
+        return Response({'status': 'ok', 'count': len(columns), **result}, status=status.HTTP_201_CREATED)
 
 
 class TagViewSet(viewsets.ModelViewSet):
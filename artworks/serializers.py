@@ -24,8 +24,15 @@ class ArtworkSerializer(serializers.ModelSerializer):
         extra_kwargs = {field: {'required': False, 'allow_null': True} for field in fields} 
 
     def __init__(self, *args, **kwargs):
+        # ?fields= 로 요청된 필드만 응답 (예: 구매자 선택용 드롭다운)
+        requested_fields = kwargs.pop('requested_fields', None)
         super().__init__(*args, **kwargs)
+        if requested_fields:
+            for field_name in set(self.fields) - set(requested_fields) - {'id'}:
+                self.fields.pop(field_name)
         request = self.context.get('request') if hasattr(self, 'context') else None
+        if 'buyer' not in self.fields:
+            return
         if request and getattr(request.user, 'gallery_id', None):
             self.fields['buyer'].queryset = Client.objects.filter(gallery_id=request.user.gallery_id)
         else:
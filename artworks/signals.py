@@ -0,0 +1,24 @@
+"""
+작품 관련 시그널 핸들러 (ArtworksConfig.ready에서 연결)
+"""
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from clients.versioning import bump_gallery_version
+from .models import Artwork
+
+
+@receiver(post_save, sender=Artwork)
+def bump_version_on_artwork_save(sender, instance, raw=False, **kwargs):
+    """작품 변경 시 갤러리 데이터 버전 증가 (목록 ETag 무효화)"""
+    if raw:
+        return
+    bump_gallery_version(instance.gallery_id)
+
+
+@receiver(post_delete, sender=Artwork)
+def bump_version_on_artwork_delete(sender, instance, **kwargs):
+    """삭제 시 버전 증가는 커밋 후 실행 (갤러리 연쇄 삭제 대비)"""
+    gallery_id = instance.gallery_id
+    transaction.on_commit(lambda: bump_gallery_version(gallery_id))
@@ -1,3 +1,41 @@
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
 
-# Create your tests here.
+from accounts.models import Gallery, User
+from clients.models import Client
+
+from .models import Artwork
+
+
+class ArtworkFieldsTests(TestCase):
+    def setUp(self):
+        self.gallery = Gallery.objects.create(name='테스트 갤러리', address='-', phone='-', email='gallery@example.com')
+        user = User.objects.create_user(username='artwork-user', password=None, gallery=self.gallery)
+        self.api = APIClient()
+        self.api.force_authenticate(user)
+
+    def add_artworks(self, count):
+        for index in range(count):
+            buyer = Client.objects.create(gallery=self.gallery, name=f'구매자{index}', phone=f'010-3000-{index:04d}')
+            Artwork.objects.create(gallery=self.gallery, title_ko=f'작품{index}', price=1000, buyer=buyer)
+
+    def test_fields_limit_response(self):
+        self.add_artworks(1)
+
+        response = self.api.get('/api/artworks/', {'fields': 'title_ko,buyer_detail,unknown'})
+
+        row = response.data[0]
+        self.assertEqual(set(row), {'id', 'title_ko', 'buyer_detail'})
+        self.assertEqual(row['buyer_detail']['name'], '구매자0')
+
+    def test_buyer_is_joined_not_queried_per_row(self):
+        self.add_artworks(1)
+        with CaptureQueriesContext(connection) as baseline:
+            self.api.get('/api/artworks/', {'fields': 'title_ko,buyer_detail'})
+
+        self.add_artworks(5)
+        with self.assertNumQueries(len(baseline)):
+            response = self.api.get('/api/artworks/', {'fields': 'title_ko,buyer_detail'})
+        self.assertEqual(len(response.data), 6)
@@ -3,6 +3,7 @@ from rest_framework import viewsets, filters, permissions
 from .models import Artwork
 from .serializers import ArtworkSerializer
 from clients.models import Client
+from clients.versioning import GalleryETagListMixin
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status
@@ -12,7 +13,7 @@ import boto3
 
 # Create your views here.
 
-class ArtworkViewSet(viewsets.ModelViewSet):
+class ArtworkViewSet(GalleryETagListMixin, viewsets.ModelViewSet):
     queryset = Artwork.objects.all()
     serializer_class = ArtworkSerializer
     filter_backends = [filters.SearchFilter, filters.OrderingFilter]
@@ -59,8 +60,37 @@ class ArtworkViewSet(viewsets.ModelViewSet):
             print(f"ArtworkViewSet get_queryset error: {e}")
             queryset = Artwork.objects.all().order_by('-id')
         
+        # ?fields= 요청 시 필요한 컬럼만 조회
+        requested_fields = self.get_requested_fields()
+        if requested_fields:
+            only = [field for field in requested_fields if field != 'buyer_detail']
+            if 'buyer_detail' in requested_fields:
+                # 구매자 정보는 한 번에 조인 (행마다 구매자 조회 방지)
+                queryset = queryset.select_related('buyer')
+                only += ['buyer', 'buyer__id', 'buyer__name', 'buyer__phone']
+            queryset = queryset.only('id', *only)
+        else:
+            queryset = queryset.select_related('buyer')
+        
         return queryset
 
+    def get_requested_fields(self):
+        """?fields=id,title_ko,buyer_detail (GET에만 적용, 알 수 없는 필드는 무시)"""
+        if self.request.method != 'GET' or 'fields' not in self.request.query_params:
+            return None
+        allowed = set(ArtworkSerializer.Meta.fields)
+        requested = [
+            field.strip() for field in self.request.query_params['fields'].split(',')
+            if field.strip() in allowed
+        ]
+        return requested or None
+
+    def get_serializer(self, *args, **kwargs):
+        requested_fields = self.get_requested_fields()
+        if requested_fields:
+            kwargs['requested_fields'] = requested_fields
+        return super().get_serializer(*args, **kwargs)
+
     def create(self, request, *args, **kwargs):
         data = request.data.copy()
         file = request.FILES.get('image')
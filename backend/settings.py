@@ -185,6 +185,28 @@ REST_FRAMEWORK = {
     # 'PAGE_SIZE': 6,  # 20 → 6으로 변경하여 프론트엔드와 일치
 }
 
+# 고객 델타 동기화 삭제 기록 보관 기간 (이보다 오래된 커서는 전체 재동기화)
+CLIENT_TOMBSTONE_RETENTION_DAYS = int(os.environ.get('CLIENT_TOMBSTONE_RETENTION_DAYS', '30'))
+
+# 컬럼 accessor 변경 시 요청 안에서 바로 data 키를 바꾸는 최대 고객 수 (넘으면 백그라운드 작업)
+CLIENT_DATA_RENAME_SYNC_LIMIT = int(os.environ.get('CLIENT_DATA_RENAME_SYNC_LIMIT', '50000'))
+
+# 고객 data 식 인덱스 대상 (ensure_client_data_indexes)
+# 쉼표로 구분한 accessor 목록은 항상, 그 외에는 이 수 이상의 갤러리가 쓰는 accessor만 인덱스를 만듦
+CLIENT_DATA_INDEX_ACCESSORS = [
+    accessor.strip() for accessor in os.environ.get('CLIENT_DATA_INDEX_ACCESSORS', '').split(',') if accessor.strip()
+]
+CLIENT_DATA_INDEX_MIN_GALLERIES = int(os.environ.get('CLIENT_DATA_INDEX_MIN_GALLERIES', '10'))
+# 컬럼 ID 키 갤러리의 갤러리별 부분 인덱스는 고객 수가 이 이상인 갤러리에만 만듦
+CLIENT_DATA_INDEX_MIN_CLIENTS = int(os.environ.get('CLIENT_DATA_INDEX_MIN_CLIENTS', '5000'))
+
+# 실행 중인 백그라운드 작업의 진행 기록(heartbeat)이 이 시간 동안 없으면 worker가 중단된 것으로 보고
+# 다시 대기열에 넣거나(재실행해도 안전한 작업) 실패 처리
+BACKGROUND_JOB_STALE_SECONDS = int(os.environ.get('BACKGROUND_JOB_STALE_SECONDS', '900'))
+
+# 작업 없이 남은 가져오기 업로드/파싱 파일 보관 시간 (지나면 worker/prune_client_imports가 삭제, 끝나지 않은 작업의 파일은 유지)
+CLIENT_IMPORT_UPLOAD_RETENTION_HOURS = int(os.environ.get('CLIENT_IMPORT_UPLOAD_RETENTION_HOURS', '24'))
+
 # 세션 설정
 SESSION_COOKIE_AGE = 86400  # 24시간
 SESSION_SAVE_EVERY_REQUEST = True
@@ -234,6 +256,10 @@ STORAGES = {
     "staticfiles": {
         "BACKEND": "django.contrib.staticfiles.storage.StaticFilesStorage",
     },
+    # 고객 엑셀 가져오기 업로드 (비공개 ACL, 공개 media와 다른 경로)
+    "client_imports": {
+        "BACKEND": "api.storages.PrivateUploadStorage",
+    },
 }
 
 # Default primary key field type
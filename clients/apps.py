@@ -4,3 +4,7 @@ from django.apps import AppConfig
 class ClientsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'clients'
+
+    def ready(self):
+        from . import signals  # noqa: F401
+        from . import data_keys, importer  # noqa: F401  백그라운드 작업 처리 함수 등록
@@ -0,0 +1,190 @@
+"""
+고객 data 저장 키 (컬럼 accessor / 컬럼 ID)
+
+Gallery.client_data_key_mode가 'column_id'인 갤러리는 data를 ClientColumn.id 기반 키로 저장합니다.
+
+    accessor   {"구매 작가명": "김환기", "등록일": "2024-03-05"}
+    column_id  {"#12": "김환기", "#15": "2024-03-05"}
+
+API 입출력과 내부 로직(필터, 타입 인덱스, 연락처 보완 등)은 항상 accessor 기준이며,
+저장할 때 to_storage(), 읽을 때 to_accessors()로 갤러리 메타데이터 캐시의 컬럼 맵을 거쳐 변환합니다.
+행마다 긴 한글 키가 반복되지 않고, 컬럼 accessor를 바꿔도 고객 data를 다시 쓸 필요가 없습니다.
+
+컬럼이 없는 키는 accessor 그대로 저장합니다. column_id 갤러리에서 컬럼이 생기면 같은 accessor 키를
+컬럼 ID 키로 옮기고(claim_column_key), 컬럼이 삭제되면 다시 accessor 키로 되돌립니다(release_column_key).
+저장 방식 전환은 convert_client_data_keys 관리 명령으로 합니다.
+"""
+from django.db import transaction
+
+from accounts.models import Gallery
+
+from .metadata import get_gallery_metadata
+from .models import Client, ClientColumn
+from .versioning import bump_gallery_version
+
+KEY_MODE_ACCESSOR = 'accessor'
+KEY_MODE_COLUMN_ID = 'column_id'
+KEY_MODES = (KEY_MODE_ACCESSOR, KEY_MODE_COLUMN_ID)
+
+_BATCH_SIZE = 1000
+
+
+def column_key(column_id):
+    """컬럼 ID 저장 키 ('#12')"""
+    return f'#{column_id}'
+
+
+class DataKeyMap:
+    """
+    갤러리 하나의 accessor <-> 저장 키 변환표 (accessor 방식이면 변환 없음)
+
+    renames: 백그라운드 작업(rename_data_key)이 아직 옮기는 중인 [(이전 저장 키, 새 저장 키)]
+        작업이 끝날 때까지 새 키가 없는 고객은 이전 키 값을 읽습니다 (clients.data_keys).
+    """
+
+    def __init__(self, columns=(), keyed_by_id=False, renames=()):
+        self.keyed_by_id = keyed_by_id
+        self.keys = {accessor: column_key(column_id) for column_id, accessor in columns} if keyed_by_id else {}
+        self.accessors = {key: accessor for accessor, key in self.keys.items()}
+        self.renamed = {old_key: new_key for old_key, new_key in renames}
+        self.previous = {new_key: old_key for old_key, new_key in renames}
+
+    def storage_key(self, accessor):
+        """accessor의 저장 키 (컬럼이 없으면 accessor 그대로)"""
+        return self.keys.get(accessor, accessor)
+
+    def fallback_keys(self, key):
+        """저장 키 key로 옮겨지는 중인 이전 저장 키 목록 (최근 이름부터, 없으면 빈 목록)"""
+        keys = []
+        key = self.previous.get(key)
+        while key is not None and key not in keys:
+            keys.append(key)
+            key = self.previous.get(key)
+        return keys
+
+    def source_keys(self, accessor):
+        """accessor 값을 찾을 저장 키 (저장 키, 옮기는 중인 이전 키, accessor 순)"""
+        key = self.storage_key(accessor)
+        return list(dict.fromkeys([key, *self.fallback_keys(key), accessor]))
+
+    def lookup(self, data, accessor):
+        """저장된 data에서 accessor 값 (없으면 None)"""
+        for key in self.source_keys(accessor):
+            if key in data:
+                return data[key]
+        return None
+
+    def current_key(self, key):
+        """옮겨지는 중인 이전 키의 최종 저장 키"""
+        seen = set()
+        while key in self.renamed and key not in seen:
+            seen.add(key)
+            key = self.renamed[key]
+        return key
+
+    def to_storage(self, data):
+        """accessor 키 data -> 저장용 data"""
+        if not self.keys or not data:
+            return data
+        return {self.keys.get(key, key): value for key, value in data.items()}
+
+    def to_accessors(self, data):
+        """
+        저장된 data -> accessor 키 data
+
+        같은 컬럼 값이 컬럼 ID 키와 accessor 키 모두에 있으면 컬럼 ID 키 값을 사용하고,
+        옮기는 중인 이전 키 값은 새 키가 없을 때만 새 키 이름으로 사용합니다.
+        """
+        if not (self.accessors or self.renamed) or not data:
+            return data
+        converted = {}
+        for key, value in data.items():
+            if key in self.renamed:
+                continue
+            accessor = self.accessors.get(key)
+            if accessor is None:
+                converted.setdefault(key, value)
+            else:
+                converted[accessor] = value
+        for key, value in data.items():
+            if key in self.renamed:
+                key = self.current_key(key)
+                converted.setdefault(self.accessors.get(key, key), value)
+        return converted
+
+
+ACCESSOR_KEY_MAP = DataKeyMap()
+
+
+def get_key_mode(gallery_id):
+    """DB에서 바로 읽은 저장 방식 (갤러리가 없으면 None)"""
+    return Gallery.objects.filter(pk=gallery_id).values_list('client_data_key_mode', flat=True).first()
+
+
+def _build_key_map(metadata):
+    if metadata.key_mode != KEY_MODE_COLUMN_ID:
+        return DataKeyMap(renames=metadata.renames) if metadata.renames else ACCESSOR_KEY_MAP
+    return DataKeyMap(
+        [(column['id'], column['accessor']) for column in metadata.columns],
+        keyed_by_id=True,
+        renames=metadata.renames,
+    )
+
+
+def get_data_key_map(gallery_id):
+    """갤러리의 DataKeyMap (갤러리 메타데이터 캐시에서 생성, clients.metadata)"""
+    if not gallery_id:
+        return ACCESSOR_KEY_MAP
+    return get_gallery_metadata(gallery_id).memo('data_key_map', _build_key_map)
+
+
+def claim_column_key(gallery_id, column_id, accessor):
+    """column_id 갤러리에 컬럼이 생기면 accessor 키로 저장돼 있던 값을 컬럼 ID 키로 옮김"""
+    if get_key_mode(gallery_id) != KEY_MODE_COLUMN_ID:
+        return
+    from .data_keys import rename_client_data_key
+    rename_client_data_key(gallery_id, accessor, column_key(column_id))
+
+
+def release_column_key(gallery_id, column_id, accessor):
+    """column_id 갤러리에서 컬럼이 삭제되면 컬럼 ID 키 값을 accessor 키로 되돌림 (accessor 방식과 같은 동작)"""
+    if get_key_mode(gallery_id) != KEY_MODE_COLUMN_ID:
+        return
+    from .data_keys import rename_client_data_key
+    rename_client_data_key(gallery_id, column_key(column_id), accessor)
+
+
+def convert_gallery_data_keys(gallery_id, mode):
+    """
+    갤러리 data 저장 방식 전환 (고객 data를 새 방식의 키로 다시 저장)
+
+    API로 보이는 data는 그대로이므로 updated_at은 바꾸지 않습니다. 반환값: 변경된 고객 수
+    """
+    if mode not in KEY_MODES:
+        raise ValueError(f'알 수 없는 저장 방식입니다: {mode}')
+    columns = list(ClientColumn.objects.filter(gallery_id=gallery_id).values_list('id', 'accessor'))
+    # 기존 행에 두 방식의 키가 섞여 있어도 읽을 수 있도록 항상 컬럼 ID 변환표로 읽음
+    source = DataKeyMap(columns, keyed_by_id=True)
+    target = DataKeyMap(columns, keyed_by_id=mode == KEY_MODE_COLUMN_ID)
+
+    updated = 0
+    with transaction.atomic():
+        # 저장 방식을 먼저 바꿔 갤러리 행을 잠근 상태로 변환
+        Gallery.objects.filter(pk=gallery_id).update(client_data_key_mode=mode)
+        batch = []
+        clients = Client.objects.filter(gallery_id=gallery_id).only('id', 'data')
+        for client in clients.iterator(chunk_size=_BATCH_SIZE):
+            data = target.to_storage(source.to_accessors(client.data))
+            if data == client.data:
+                continue
+            client.data = data
+            batch.append(client)
+            if len(batch) >= _BATCH_SIZE:
+                Client.objects.bulk_update(batch, ['data'])
+                updated += len(batch)
+                batch = []
+        if batch:
+            Client.objects.bulk_update(batch, ['data'])
+            updated += len(batch)
+        bump_gallery_version(gallery_id, metadata=True)
+    return updated
@@ -0,0 +1,163 @@
+"""
+갤러리 컬럼 목록 동기화 (client-columns-sync)
+
+전체 삭제 후 다시 만들지 않고 기존 컬럼과 비교해 바뀐 것만 반영하므로 컬럼 ID가 유지됩니다.
+(컬럼 ID 키로 저장된 고객 data와 ID로 지정한 엑셀 매핑이 계속 유효)
+
+    보낸 항목 매칭: id가 있으면 id, 없으면 accessor로 기존 컬럼을 찾음
+    header/order만 변경   -> bulk_update 한 번
+    accessor/type 변경    -> 건별 save() (타입 인덱스/변환표 시그널 처리, accessor 방식 갤러리는 data 키 변경)
+    새 항목               -> bulk_create 후 메타데이터 버전/타입 인덱스 처리
+    보내지 않은 기존 컬럼  -> 삭제
+"""
+from django.db import IntegrityError, transaction
+
+from .column_keys import claim_column_key, get_data_key_map
+from .data_keys import rename_client_data_key
+from .models import ClientColumn
+from .typed_values import TYPED_COLUMN_TYPES, rebuild_typed_column
+from .versioning import bump_gallery_version
+
+HEADER_MAX_LENGTH = ClientColumn._meta.get_field('header').max_length
+ACCESSOR_MAX_LENGTH = ClientColumn._meta.get_field('accessor').max_length
+TYPE_MAX_LENGTH = ClientColumn._meta.get_field('type').max_length
+
+
+class ColumnSyncError(ValueError):
+    """동기화 요청 검증 실패 또는 accessor 충돌"""
+
+
+def _validate(columns):
+    """[{'id', 'header', 'accessor', 'type', 'order'}] 정리본 (accessor 중복/누락 시 ColumnSyncError)"""
+    wanted = []
+    accessors = set()
+    for position, column in enumerate(columns):
+        if not isinstance(column, dict):
+            raise ColumnSyncError(f'{position}번째 컬럼이 객체가 아닙니다.')
+        header = str(column.get('header') or '').strip()
+        accessor = str(column.get('accessor') or '').strip()
+        if not header or not accessor:
+            raise ColumnSyncError(f'{position}번째 컬럼에 header와 accessor가 필요합니다.')
+        if len(header) > HEADER_MAX_LENGTH or len(accessor) > ACCESSOR_MAX_LENGTH:
+            raise ColumnSyncError(f'{position}번째 컬럼의 header/accessor가 너무 깁니다.')
+        if accessor in accessors:
+            raise ColumnSyncError(f'accessor가 중복되었습니다: {accessor}')
+        accessors.add(accessor)
+
+        column_type = str(column.get('type') or 'text')
+        if len(column_type) > TYPE_MAX_LENGTH:
+            raise ColumnSyncError(f'{position}번째 컬럼의 type이 너무 깁니다.')
+        order = column.get('order', position)
+        if not isinstance(order, int) or isinstance(order, bool) or order < 0:
+            raise ColumnSyncError(f'{position}번째 컬럼의 order는 0 이상의 정수여야 합니다.')
+        column_id = column.get('id')
+        wanted.append({
+            'id': column_id if isinstance(column_id, int) and not isinstance(column_id, bool) else None,
+            'header': header,
+            'accessor': accessor,
+            'type': column_type,
+            'order': order,
+        })
+    return wanted
+
+
+def sync_gallery_columns(gallery_id, columns, created_by=None):
+    """
+    갤러리 컬럼을 columns 목록과 같게 맞춤
+
+    반환값: {'created', 'updated', 'deleted', 'columns': [{'id', 'accessor'}], 'data_migrations': [...]}
+    """
+    wanted = _validate(columns)
+    try:
+        with transaction.atomic():
+            return _apply(gallery_id, wanted, created_by)
+    except IntegrityError:
+        raise ColumnSyncError('accessor가 다른 컬럼과 겹칩니다. 두 컬럼의 accessor를 서로 바꾸려면 나눠서 요청해주세요.')
+
+
+def _apply(gallery_id, wanted, created_by):
+    existing = {
+        column.pk: column
+        for column in ClientColumn.objects.select_for_update().filter(gallery_id=gallery_id)
+    }
+    by_accessor = {column.accessor: column for column in existing.values()}
+
+    # id로 지정한 항목을 먼저 매칭하고, 남은 항목은 accessor로 매칭
+    matched = {}
+    unmatched = []
+    for item in wanted:
+        column = existing.get(item['id'])
+        if column is None or column.pk in matched:
+            unmatched.append(item)
+        else:
+            matched[column.pk] = (column, item)
+    creates = []
+    for item in unmatched:
+        column = by_accessor.get(item['accessor'])
+        if column is None or column.pk in matched:
+            creates.append(item)
+        else:
+            matched[column.pk] = (column, item)
+
+    # 1. 보내지 않은 컬럼 삭제 (시그널이 타입 인덱스/data 키를 정리)
+    deleted_ids = [pk for pk in existing if pk not in matched]
+    if deleted_ids:
+        ClientColumn.objects.filter(pk__in=deleted_ids).delete()
+
+    # 2. accessor/type 변경은 건별 저장, header/order만 바뀐 컬럼은 한 번에 반영
+    keyed_by_id = get_data_key_map(gallery_id).keyed_by_id
+    data_migrations = []
+    simple_updates = []
+    updated = 0
+    for column, item in matched.values():
+        if (column.accessor, column.type) != (item['accessor'], item['type']):
+            updated += 1
+            if column.accessor != item['accessor'] and not keyed_by_id:
+                updated_count, job = rename_client_data_key(
+                    gallery_id, column.accessor, item['accessor'], created_by=created_by
+                )
+                data_migrations.append(
+                    {'column_id': column.pk, 'status': 'queued', 'job_id': job.id, 'total': job.progress_total}
+                    if job else
+                    {'column_id': column.pk, 'status': 'done', 'updated_count': updated_count}
+                )
+            for field in ('header', 'accessor', 'type', 'order'):
+                setattr(column, field, item[field])
+            column.save()
+        elif (column.header, column.order) != (item['header'], item['order']):
+            column.header, column.order = item['header'], item['order']
+            simple_updates.append(column)
+    if simple_updates:
+        ClientColumn.objects.bulk_update(simple_updates, ['header', 'order'])
+        updated += len(simple_updates)
+
+    # 3. 새 컬럼 (bulk_create/bulk_update는 시그널을 보내지 않으므로 버전/타입 인덱스를 직접 처리)
+    created = ClientColumn.objects.bulk_create([
+        ClientColumn(
+            gallery_id=gallery_id,
+            header=item['header'],
+            accessor=item['accessor'],
+            type=item['type'],
+            order=item['order'],
+        )
+        for item in creates
+    ])
+    if created or deleted_ids or updated:
+        # 이후 타입 인덱스 생성이 새 컬럼 정보를 읽도록 메타데이터 버전을 먼저 올림
+        bump_gallery_version(gallery_id, metadata=True)
+    for column in created:
+        if keyed_by_id:
+            transaction.on_commit(
+                lambda column=column: claim_column_key(gallery_id, column.pk, column.accessor)
+            )
+        if column.type in TYPED_COLUMN_TYPES:
+            rebuild_typed_column(gallery_id, column.accessor, column.type)
+
+    columns = sorted(list(existing[pk] for pk in matched) + created, key=lambda column: (column.order, column.pk))
+    return {
+        'created': len(created),
+        'updated': updated,
+        'deleted': len(deleted_ids),
+        'columns': [{'id': column.pk, 'accessor': column.accessor} for column in columns],
+        'data_migrations': data_migrations,
+    }
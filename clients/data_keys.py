@@ -0,0 +1,181 @@
+"""
+고객 data 키 이름 변경 (컬럼 accessor 변경 시)
+
+고객을 한 명씩 불러와 저장하지 않고 UPDATE 한 문장으로 JSON 키를 옮깁니다.
+    PostgreSQL: jsonb_build_object('new', data -> 'old') || (data - 'old')
+    SQLite:     json_insert(json_remove(data, '$."old"'), '$."new"', data -> '$."old"')
+SQLite 경로는 Django와 같이 json.dumps로 만들어('$."\uba54\ubaa8"') 저장된 이스케이프 키와 맞추고,
+json_extract 대신 -> 연산자로 값을 옮겨 true/false가 1/0으로 바뀌지 않게 합니다.
+SQLite는 새 키를 경로 문자열 그대로 기록하므로 새 키가 이스케이프가 필요 없는 ASCII일 때만
+(예: 컬럼 ID 키 '#12') UPDATE를 쓰고, 그 외 DB/키이거나 -> 연산자가 없는 SQLite(3.38 미만)는
+bulk_update로 처리합니다.
+
+새 키가 이미 있는 고객은 새 키 값을 유지하고 이전 키만 삭제합니다.
+
+대상 고객이 CLIENT_DATA_RENAME_SYNC_LIMIT 명을 넘으면 요청 안에서 처리하지 않고
+백그라운드 작업(rename_data_key)으로 id 구간별로 나눠 처리하며 진행 상황을 기록합니다.
+작업이 성공할 때까지는 갤러리 메타데이터에 (이전 키, 새 키)가 들어가(pending_renames) 목록/필터/수정이
+새 키가 없는 고객의 이전 키 값을 읽고, 수정한 고객은 새 키로만 저장됩니다 (column_keys.DataKeyMap).
+중간에 멈추면 고객 일부만 키가 바뀌므로 이 작업은 취소할 수 없고, 실패한 작업도 이전 키를 계속 읽습니다.
+"""
+import json
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.utils import timezone
+
+from .jobs import enqueue_job, job_handler, report_progress
+from .models import BackgroundJob, Client
+from .versioning import bump_gallery_version
+
+RENAME_JOB_KIND = 'rename_data_key'
+RENAME_CHUNK_SIZE = 5000
+
+
+def rename_sync_limit():
+    return getattr(settings, 'CLIENT_DATA_RENAME_SYNC_LIMIT', 50000)
+
+
+def sqlite_json_path(key):
+    """SQLite JSON 경로 ('$."key"', Django KeyTransform과 같은 json.dumps 이스케이프)"""
+    return '$.' + json.dumps(key)
+
+
+def _sqlite_can_rename(new_key):
+    """
+    SQLite UPDATE로 옮길 수 있는지
+
+    JSON 타입을 유지하는 -> 연산자(3.38+)가 있고, 새 키가 경로에 그대로 적어도 저장 형태와 같은
+    (이스케이프가 필요 없는) ASCII 키여야 합니다.
+    """
+    if connection.Database.sqlite_version_info < (3, 38, 0):
+        return False
+    return json.dumps(new_key) == f'"{new_key}"'
+
+
+def _rename_with_sql(gallery_id, old_key, new_key, id_range=None):
+    """UPDATE 한 문장으로 키 변경. 지원하지 않는 DB/키면 None"""
+    table = connection.ops.quote_name(Client._meta.db_table)
+    now = connection.ops.adapt_datetimefield_value(timezone.now())
+    range_sql, range_params = '', []
+    if id_range:
+        range_sql = ' AND id BETWEEN %s AND %s'
+        range_params = list(id_range)
+
+    if connection.vendor == 'postgresql':
+        sql = (
+            f'UPDATE {table} SET data = jsonb_build_object(%s, data -> %s) || (data - %s), updated_at = %s '
+            f'WHERE gallery_id = %s AND data ? %s{range_sql}'
+        )
+        params = [new_key, old_key, old_key, now, gallery_id, old_key, *range_params]
+    elif connection.vendor == 'sqlite':
+        if not _sqlite_can_rename(new_key):
+            return None
+        old_path, new_path = sqlite_json_path(old_key), sqlite_json_path(new_key)
+        sql = (
+            f'UPDATE {table} SET data = json_insert(json_remove(data, %s), %s, data -> %s), updated_at = %s '
+            f'WHERE gallery_id = %s AND json_type(data, %s) IS NOT NULL{range_sql}'
+        )
+        params = [old_path, new_path, old_path, now, gallery_id, old_path, *range_params]
+    else:
+        return None
+
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        return cursor.rowcount
+
+
+def _rename_with_orm(gallery_id, old_key, new_key, id_range=None):
+    clients = Client.objects.filter(gallery_id=gallery_id, data__has_key=old_key).only('id', 'data')
+    if id_range:
+        clients = clients.filter(id__range=id_range)
+    now = timezone.now()
+    updated = []
+    for client in clients.iterator(chunk_size=1000):
+        client.data.setdefault(new_key, client.data.pop(old_key))
+        client.updated_at = now
+        updated.append(client)
+    Client.objects.bulk_update(updated, ['data', 'updated_at'], batch_size=1000)
+    return len(updated)
+
+
+def rename_data_key(gallery_id, old_key, new_key, id_range=None):
+    """
+    갤러리 고객 data의 old_key를 new_key로 변경 (new_key가 이미 있으면 그 값을 유지하고 old_key만 삭제)
+
+    검색 인덱스는 키가 아닌 값만 쓰므로 다시 만들 필요가 없습니다. 반환값: 변경된 고객 수
+    """
+    updated = _rename_with_sql(gallery_id, old_key, new_key, id_range)
+    if updated is None:
+        updated = _rename_with_orm(gallery_id, old_key, new_key, id_range)
+    return updated
+
+
+def rename_client_data_key(gallery_id, old_key, new_key, created_by=None):
+    """
+    컬럼 accessor 변경에 따른 data 키 변경
+
+    반환값: (변경된 고객 수, None) 또는 대상이 많아 백그라운드 작업으로 넘긴 경우 (None, BackgroundJob)
+    """
+    total = Client.objects.filter(gallery_id=gallery_id, data__has_key=old_key).count()
+    if total > rename_sync_limit():
+        job = enqueue_job(
+            RENAME_JOB_KIND,
+            gallery_id=gallery_id,
+            params={'old_key': old_key, 'new_key': new_key},
+            created_by=created_by,
+            total=total,
+        )
+        # 작업이 끝날 때까지 이전 키를 읽도록 메타데이터 갱신
+        bump_gallery_version(gallery_id, metadata=True)
+        return None, job
+
+    with transaction.atomic():
+        updated = rename_data_key(gallery_id, old_key, new_key)
+        if updated:
+            bump_gallery_version(gallery_id)
+    return updated, None
+
+
+def pending_renames(gallery_id):
+    """
+    갤러리에서 아직 성공하지 못한 키 변경 작업의 [(이전 키, 새 키)] (등록 순)
+
+    실패(또는 이전에 취소)된 작업은 고객 일부의 값이 이전 키에 남아 있으므로 대기/실행 중인 작업과 같이 포함합니다.
+    """
+    jobs = (
+        BackgroundJob.objects
+        .filter(gallery_id=gallery_id, kind=RENAME_JOB_KIND)
+        .exclude(status=BackgroundJob.STATUS_SUCCEEDED)
+        .order_by('created_at', 'id')
+        .values_list('params', flat=True)
+    )
+    return [(params['old_key'], params['new_key']) for params in jobs]
+
+
+def _rename_job_finished(job):
+    """작업 종료 후 메타데이터 갱신 (성공하면 이전 키를 더 읽지 않음)"""
+    bump_gallery_version(job.gallery_id, metadata=True)
+
+
+@job_handler(RENAME_JOB_KIND, on_finish=_rename_job_finished, retry_stale=True, cancellable=False)
+def rename_data_key_job(job):
+    """id 구간별로 나눠 키 변경 (구간마다 커밋, 진행 상황 기록)"""
+    gallery_id = job.gallery_id
+    old_key, new_key = job.params['old_key'], job.params['new_key']
+    clients = Client.objects.filter(gallery_id=gallery_id).order_by('id')
+
+    done = 0
+    last_id = 0
+    while True:
+        ids = list(clients.filter(id__gt=last_id).values_list('id', flat=True)[:RENAME_CHUNK_SIZE])
+        if not ids:
+            break
+        with transaction.atomic():
+            updated = rename_data_key(gallery_id, old_key, new_key, id_range=(ids[0], ids[-1]))
+            if updated:
+                bump_gallery_version(gallery_id)
+        done += updated
+        last_id = ids[-1]
+        report_progress(job, done, max(job.progress_total, done))
+    return {'updated_count': done}
@@ -0,0 +1,44 @@
+"""
+갤러리 기본 태그('일반고객') 캐시
+
+고객을 만들 때마다 기본 태그를 get_or_create 하지 않도록 갤러리별 태그 ID를 캐시합니다.
+태그 이름 변경/삭제 시그널에서 캐시를 지우고, 다른 프로세스의 캐시가 낡았을 경우는
+clients.services.assign_default_tag 가 감지해 다시 조회합니다.
+"""
+import logging
+
+from django.core.cache import cache
+
+from .models import Tag
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TAG_NAME = '일반고객'
+DEFAULT_TAG_COLOR = '#6B7280'
+CACHE_TIMEOUT = 60 * 60
+
+
+def _cache_key(gallery_id):
+    return f'clients:default_tag:{gallery_id or "none"}'
+
+
+def get_default_tag_id(gallery_id, refresh=False):
+    """갤러리 기본 태그 ID (없으면 생성). refresh=True면 캐시를 무시하고 다시 조회"""
+    key = _cache_key(gallery_id)
+    if not refresh:
+        tag_id = cache.get(key)
+        if tag_id:
+            return tag_id
+    tag, created = Tag.objects.get_or_create(
+        gallery_id=gallery_id,
+        name=DEFAULT_TAG_NAME,
+        defaults={'color': DEFAULT_TAG_COLOR},
+    )
+    if created:
+        logger.info("'%s' 태그 생성 (갤러리 %s, ID %s)", DEFAULT_TAG_NAME, gallery_id, tag.pk)
+    cache.set(key, tag.pk, CACHE_TIMEOUT)
+    return tag.pk
+
+
+def invalidate_default_tag(gallery_id):
+    cache.delete(_cache_key(gallery_id))
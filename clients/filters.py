@@ -0,0 +1,292 @@
+"""
+고객 data(JSONField) 컬럼 서버사이드 필터링/정렬
+
+쿼리 파라미터 형식 (accessor는 ClientColumn.accessor 또는 기본 필드):
+    filter.<accessor>=값               같음
+    filter.<accessor>.contains=값      부분 일치 (대소문자 무시)
+    filter.<accessor>.gte=값           범위 (gt, gte, lt, lte)
+    filter.<accessor>.empty=true       값 없음 (false면 값 있음)
+    sort=<accessor>,-<accessor>        다중 키 정렬 (- 는 내림차순)
+
+number/date/boolean 타입 컬럼의 같음/범위 비교와 정렬은 문자열이 아닌
+타입 인덱스(ClientTypedValue)로 처리합니다.
+"""
+import hashlib
+import re
+
+from django.db import connection
+from django.db.models import F, OuterRef, Q, Subquery, TextField
+from django.db.models.expressions import RawSQL
+from django.db.models.fields.json import KeyTextTransform
+from django.db.models.functions import Coalesce
+from rest_framework.exceptions import ValidationError
+from rest_framework.filters import BaseFilterBackend
+
+from .column_keys import get_data_key_map
+from .data_keys import sqlite_json_path
+from .metadata import get_gallery_metadata
+from .models import Client, ClientTypedValue
+from .typed_values import TYPED_COLUMN_TYPES, VALUE_FIELDS, typed_filter_value
+
+FILTER_PREFIX = 'filter.'
+SORT_PARAM = 'sort'
+RANGE_OPERATORS = ('gt', 'gte', 'lt', 'lte')
+OPERATORS = ('contains', 'empty') + RANGE_OPERATORS
+
+# data가 아닌 모델 컬럼으로 바로 조회하는 기본 필드
+BASE_FIELDS = {
+    'id': 'id',
+    'name': 'name',
+    'phone': 'phone',
+    'created_at': 'created_at',
+    'updated_at': 'updated_at',
+}
+
+TRUE_VALUES = ('1', 'true', 'yes', 'y')
+
+DATA_INDEX_PREFIX = 'client_data_'
+_DATA_INDEX_NAME_RE = re.compile(DATA_INDEX_PREFIX + r'(\d+_)?[0-9a-f]{12}')
+
+
+def is_indexable_accessor(accessor):
+    """식 인덱스를 만들 수 있는 accessor인지 (빈 값/NUL 문자 제외, 따옴표 등은 이스케이프)"""
+    return bool(accessor) and '\x00' not in accessor
+
+
+def _sql_literal(text):
+    """SQL 문자열 리터럴 (작은따옴표를 두 번 써서 이스케이프)"""
+    return "'" + text.replace("'", "''") + "'"
+
+
+def _sqlite_path_literal(accessor):
+    """SQLite JSON 경로 리터럴 (Django KeyTransform과 같은 json.dumps 경로라 한글 키도 일치)"""
+    return _sql_literal(sqlite_json_path(accessor))
+
+
+def _key_text_expression(accessor):
+    if connection.vendor == 'sqlite' and is_indexable_accessor(accessor):
+        column = f"{connection.ops.quote_name(Client._meta.db_table)}.{connection.ops.quote_name('data')}"
+        # RawSQL은 파라미터가 없어도 %를 서식 문자로 처리하므로 %%로 이스케이프
+        path = _sqlite_path_literal(accessor).replace('%', '%%')
+        return RawSQL(f'json_extract({column}, {path})', [], output_field=TextField())
+    return KeyTextTransform(accessor, 'data')
+
+
+def data_key_expression(accessor, fallback_keys=()):
+    """
+    data의 accessor 값을 텍스트로 꺼내는 식
+
+    DB의 accessor별 식 인덱스(ensure_data_key_index)와 같은 모양의 SQL이 나오도록 만듭니다.
+    SQLite는 바인딩 파라미터가 있으면 식 인덱스를 쓰지 못하므로 경로를 리터럴로 넣습니다.
+    fallback_keys: 키 변경 작업이 아직 옮기지 못한 이전 키 (값이 없으면 차례로 사용, 인덱스는 쓰지 못함)
+    """
+    if not fallback_keys:
+        return _key_text_expression(accessor)
+    return Coalesce(*(_key_text_expression(key) for key in (accessor, *fallback_keys)), output_field=TextField())
+
+
+def data_key_index_name(accessor, gallery_id=None):
+    digest = hashlib.md5(accessor.encode('utf-8')).hexdigest()[:12]
+    if gallery_id:
+        return f'{DATA_INDEX_PREFIX}{int(gallery_id)}_{digest}'
+    return f'{DATA_INDEX_PREFIX}{digest}'
+
+
+def is_data_key_index_name(name):
+    """ensure_data_key_index가 만든 인덱스명인지 (GIN 인덱스 client_data_gin 등은 제외)"""
+    return bool(_DATA_INDEX_NAME_RE.fullmatch(name))
+
+
+def ensure_data_key_index(accessor, schema_editor=None, gallery_id=None):
+    """
+    accessor 하나에 대한 (gallery_id, data 값) 식 인덱스 생성 (이미 있으면 무시)
+
+    PostgreSQL: (data ->> 'accessor') 식 인덱스
+    SQLite: json_extract(data, '$."accessor"') 식 인덱스 (경로는 json.dumps로 만들어 조회 식과 같게 함)
+    accessor는 SQL 문자열 리터럴로 이스케이프해 넣습니다.
+
+    gallery_id를 주면 그 갤러리 행만 담는 부분 인덱스를 만듭니다. 컬럼 ID 키('#12')처럼 갤러리 하나에서만
+    쓰는 키에 테이블 전체 인덱스를 만들지 않기 위한 것으로, PostgreSQL은 조회의 gallery_id 값으로
+    부분 인덱스를 고르지만 SQLite는 바인딩 파라미터 조건으로는 부분 인덱스를 쓰지 못합니다.
+    반환값: 생성(또는 확인)한 인덱스명, 지원하지 않는 경우 None
+    """
+    conn = schema_editor.connection if schema_editor else connection
+    if not is_indexable_accessor(accessor):
+        return None
+
+    table = conn.ops.quote_name(Client._meta.db_table)
+    index_name = data_key_index_name(accessor, gallery_id)
+    if conn.vendor == 'postgresql':
+        expression = f'(data ->> {_sql_literal(accessor)})'
+    elif conn.vendor == 'sqlite':
+        expression = f'json_extract(data, {_sqlite_path_literal(accessor)})'
+    else:
+        return None
+    if gallery_id:
+        sql = f'CREATE INDEX IF NOT EXISTS {index_name} ON {table} ({expression}) WHERE gallery_id = {int(gallery_id)}'
+    else:
+        sql = f'CREATE INDEX IF NOT EXISTS {index_name} ON {table} (gallery_id, {expression})'
+
+    with conn.cursor() as cursor:
+        cursor.execute(sql)
+    return index_name
+
+
+def existing_data_key_indexes():
+    """ensure_data_key_index로 만든 인덱스명 목록"""
+    with connection.cursor() as cursor:
+        constraints = connection.introspection.get_constraints(cursor, Client._meta.db_table)
+    return sorted(
+        name for name, info in constraints.items()
+        if info.get('index') and is_data_key_index_name(name)
+    )
+
+
+def drop_data_key_index(index_name):
+    if not is_data_key_index_name(index_name):
+        raise ValueError(f'data 식 인덱스가 아닙니다: {index_name}')
+    with connection.cursor() as cursor:
+        cursor.execute(f'DROP INDEX IF EXISTS {index_name}')
+
+
+def parse_bool(value):
+    return str(value).strip().lower() in TRUE_VALUES
+
+
+class ClientDataFilterBackend(BaseFilterBackend):
+    """
+    filter.* / sort 쿼리 파라미터를 DB 쿼리로 변환하는 필터 백엔드
+
+    허용되는 accessor는 갤러리의 ClientColumn과 기본 필드뿐이며,
+    그 외 accessor는 400 에러로 응답합니다.
+    """
+
+    def get_gallery_columns(self, request):
+        """{accessor: type}"""
+        gallery_id = getattr(request.user, 'gallery_id', None)
+        return get_gallery_metadata(gallery_id).column_types
+
+    def parse_filters(self, request):
+        """[(accessor, operator, value)] 목록. operator None은 같음 비교"""
+        conditions = []
+        for param, values in request.query_params.lists():
+            if not param.startswith(FILTER_PREFIX):
+                continue
+            accessor = param[len(FILTER_PREFIX):]
+            operator = None
+            head, sep, tail = accessor.rpartition('.')
+            if sep and tail in OPERATORS:
+                accessor, operator = head, tail
+            for value in values:
+                conditions.append((accessor, operator, value))
+        return conditions
+
+    def parse_sort(self, request):
+        """[(accessor, descending)] 목록"""
+        raw = request.query_params.get(SORT_PARAM, '')
+        keys = []
+        for part in raw.split(','):
+            part = part.strip()
+            if not part:
+                continue
+            descending = part.startswith('-')
+            keys.append((part.lstrip('-'), descending))
+        return keys
+
+    def filter_queryset(self, request, queryset, view):
+        conditions = self.parse_filters(request)
+        sort_keys = self.parse_sort(request)
+        if not conditions and not sort_keys:
+            return queryset
+
+        data_accessors = {accessor for accessor, _, _ in conditions} | {accessor for accessor, _ in sort_keys}
+        data_accessors -= set(BASE_FIELDS)
+        column_types = {}
+        if data_accessors:
+            columns = self.get_gallery_columns(request)
+            unknown = data_accessors - set(columns)
+            if unknown:
+                raise ValidationError({'detail': f"알 수 없는 컬럼입니다: {', '.join(sorted(unknown))}"})
+            column_types = {
+                accessor: columns[accessor] for accessor in data_accessors
+                if columns[accessor] in TYPED_COLUMN_TYPES
+            }
+        gallery_id = getattr(request.user, 'gallery_id', None)
+
+        aliases = {}
+        typed_aliases = {}
+
+        def lookup_name(accessor):
+            if accessor in BASE_FIELDS:
+                return BASE_FIELDS[accessor]
+            if accessor not in aliases:
+                aliases[accessor] = f'data_key_{len(aliases)}'
+            return aliases[accessor]
+
+        def sort_name(accessor):
+            if accessor not in column_types:
+                return lookup_name(accessor)
+            if accessor not in typed_aliases:
+                typed_aliases[accessor] = f'typed_key_{len(typed_aliases)}'
+            return typed_aliases[accessor]
+
+        q = Q()
+        for accessor, operator, value in conditions:
+            if accessor in column_types and operator in (None,) + RANGE_OPERATORS:
+                q &= Q(id__in=self.typed_condition(gallery_id, accessor, column_types[accessor], operator, value))
+                continue
+            name = lookup_name(accessor)
+            if operator is None:
+                q &= Q(**{name: value})
+            elif operator == 'contains':
+                q &= Q(**{f'{name}__icontains': value})
+            elif operator == 'empty':
+                empty = Q(**{f'{name}__isnull': True}) | Q(**{name: ''})
+                q &= empty if parse_bool(value) else ~empty
+            else:
+                q &= Q(**{f'{name}__{operator}': value})
+
+        ordering = []
+        for accessor, descending in sort_keys:
+            expression = F(sort_name(accessor))
+            ordering.append(expression.desc(nulls_last=True) if descending else expression.asc(nulls_last=True))
+
+        if aliases:
+            # 컬럼 ID 키로 저장하는 갤러리는 저장 키로 조회 (clients.column_keys)
+            key_map = get_data_key_map(gallery_id)
+            # 키 변경 작업이 진행 중이면 새 키가 없는 고객은 이전 키 값으로 조회
+            storage_keys = {accessor: key_map.storage_key(accessor) for accessor in aliases}
+            queryset = queryset.alias(**{
+                alias: data_key_expression(storage_keys[accessor], key_map.fallback_keys(storage_keys[accessor]))
+                for accessor, alias in aliases.items()
+            })
+        if typed_aliases:
+            queryset = queryset.alias(**{
+                alias: self.typed_value_expression(accessor, column_types[accessor])
+                for accessor, alias in typed_aliases.items()
+            })
+        if conditions:
+            queryset = queryset.filter(q)
+        if ordering:
+            queryset = queryset.order_by(*ordering, 'id')
+        return queryset
+
+    def typed_condition(self, gallery_id, accessor, column_type, operator, value):
+        """타입 인덱스에서 조건에 맞는 고객 ID 서브쿼리 ((gallery, accessor, 값) 인덱스 사용)"""
+        try:
+            typed = typed_filter_value(value, column_type)
+        except ValueError:
+            raise ValidationError({'detail': f"'{accessor}' 컬럼({column_type})에 맞지 않는 값입니다: {value}"})
+        field = VALUE_FIELDS[column_type]
+        lookup = field if operator is None else f'{field}__{operator}'
+        return ClientTypedValue.objects.filter(
+            gallery_id=gallery_id, accessor=accessor, **{lookup: typed}
+        ).values('client_id')
+
+    def typed_value_expression(self, accessor, column_type):
+        """정렬용 타입 값 ((client, accessor) 유니크 인덱스로 고객당 1행 조회)"""
+        return Subquery(
+            ClientTypedValue.objects
+            .filter(client_id=OuterRef('pk'), accessor=accessor)
+            .values(VALUE_FIELDS[column_type])[:1]
+        )
@@ -0,0 +1,290 @@
+"""
+엑셀/CSV 가져오기 미리보기 (컬럼 타입 추론, 매핑 제안)
+
+시트를 한 번 읽어 DataFrame으로 만들고 모든 행에 대해 컬럼 단위(벡터 연산)로 추론합니다.
+
+    null_ratio     빈 셀 비율
+    unique_count   빈 셀을 제외한 고유 값 수 (cardinality)
+    phone_ratio    연락처 형태(국내 번호 자릿수) 비율
+    date_ratio     날짜 형태(2024-03-05, 2024.3.5, 2024년 3월 5일, 날짜 셀) 비율
+    number_ratio   숫자 형태('1,200,000원' 포함) 비율
+    boolean_ratio  참/거짓 단어(Y/N, 예/아니오, 동의/거부 ...) 비율
+
+비율은 빈 셀을 제외한 값 기준이며 INFERENCE_THRESHOLD 이상이면 해당 타입으로 제안합니다.
+
+결과는 갤러리 + 파일 SHA-256 기준으로 캐시합니다. 파싱한 행(헤더 + 행)은 가져오기 업로드와 같은
+비공개 저장소에 gzip JSON Lines 파일로 저장하므로(parsed_rows_path), 같은 파일을 실제로 가져올 때
+(process_excel_file_pandas_with_mapping) 다른 프로세스인 worker도 시트를 다시 읽지 않고 이 파일을
+스트리밍합니다. 파일은 가져오기 작업이 끝나면 삭제되고, 가져오지 않은 파일은 prune_import_uploads()가
+보관 기간 후 삭제합니다. 미리보기 없이 바로 가져온 파일만 업로드 원본을 스트리밍합니다.
+"""
+import gzip
+import hashlib
+import io
+import json
+from datetime import date, datetime, time
+
+import pandas as pd
+from django.core.cache import cache
+
+from .importer import (
+    CATEGORY_FIELDS,
+    IMPORT_UPLOAD_DIR,
+    NAME_FIELDS,
+    PHONE_FIELDS,
+    cell_text,
+    clean_headers,
+    import_storage,
+    is_blank_row,
+    iter_upload_rows,
+)
+from .metadata import get_gallery_metadata
+from .typed_values import FALSE_WORDS, TRUE_WORDS
+
+PREVIEW_CACHE_TIMEOUT = 60 * 30
+PARSED_ROWS_SUFFIX = '.rows.jsonl.gz'
+INFERENCE_THRESHOLD = 0.9
+SAMPLE_ROW_COUNT = 5
+SAMPLE_VALUE_COUNT = 3
+
+_PHONE_SHAPE_RE = r'\+?[\d\s\-().]+'
+# 0으로 시작하는 국내 번호, 82 국가번호, 엑셀 숫자 셀이라 앞자리 0이 빠진 휴대폰 번호
+_PHONE_DIGITS_RE = r'0\d{8,10}|82\d{9,10}|1\d{8,9}'
+_DATE_RE = r'^(\d{4})\s*[-./년]\s*(\d{1,2})\s*[-./월]\s*(\d{1,2})'
+_NUMBER_NOISE_RE = r'[,\s원₩$]'
+_BOOLEAN_WORDS = list(TRUE_WORDS | FALSE_WORDS)
+BASIC_FIELDS = NAME_FIELDS + PHONE_FIELDS + CATEGORY_FIELDS
+
+
+def file_hash(file):
+    """업로드 파일 SHA-256 (읽은 뒤 처음 위치로 되돌림)"""
+    digest = hashlib.sha256()
+    for chunk in file.chunks():
+        digest.update(chunk)
+    file.seek(0)
+    return digest.hexdigest()
+
+
+def _preview_key(gallery_id, digest):
+    return f'clients:import_preview:{gallery_id}:{digest}'
+
+
+def parsed_rows_path(gallery_id, digest):
+    """미리보기에서 파싱한 행 파일 경로 (가져오기 업로드 저장소)"""
+    return f'{IMPORT_UPLOAD_DIR}/{gallery_id}/{digest}{PARSED_ROWS_SUFFIX}'
+
+
+def _encode_cell(value):
+    """JSON으로 쓸 수 없는 셀 값 (엑셀 날짜/시각 셀은 타입을 유지)"""
+    for kind, cls in (('datetime', datetime), ('date', date), ('time', time)):
+        if isinstance(value, cls):
+            return {'$' + kind: value.isoformat()}
+    return str(value)
+
+
+def _decode_cell(obj):
+    if len(obj) == 1:
+        for kind, cls in (('datetime', datetime), ('date', date), ('time', time)):
+            if '$' + kind in obj:
+                return cls.fromisoformat(obj['$' + kind])
+    return obj
+
+
+def save_parsed_rows(gallery_id, digest, headers, rows):
+    """파싱한 [헤더, 행...]을 gzip JSON Lines로 저장 (첫 줄은 행 수, 이미 있으면 그대로 둠)"""
+    storage = import_storage()
+    path = parsed_rows_path(gallery_id, digest)
+    if storage.exists(path):
+        return
+    buffer = io.BytesIO()
+    with gzip.GzipFile(fileobj=buffer, mode='wb') as f:
+        for line in ({'row_count': len(rows)}, headers, *rows):
+            f.write(json.dumps(line, default=_encode_cell, ensure_ascii=False).encode('utf-8') + b'\n')
+    buffer.seek(0)
+    storage.save(path, buffer)
+
+
+def read_parsed_rows(file):
+    """save_parsed_rows 파일 -> (행 수, [헤더, 행...] iterator) (한 줄씩 읽음)"""
+    lines = (
+        json.loads(line, object_hook=_decode_cell)
+        for line in gzip.GzipFile(fileobj=file, mode='rb')
+    )
+    meta = next(lines)
+    return meta['row_count'], (tuple(row) for row in lines)
+
+
+def forget_import_rows(gallery_id, digest):
+    """미리보기 캐시와 파싱한 행 파일 삭제 (가져오기 작업이 끝난 뒤)"""
+    if digest:
+        cache.delete(_preview_key(gallery_id, digest))
+        import_storage().delete(parsed_rows_path(gallery_id, digest))
+
+
+def read_sheet(file):
+    """시트를 한 번 읽어 (헤더, 행 목록) 반환 (가져오기와 같은 헤더 정리 규칙)"""
+    rows = (row for row in iter_upload_rows(file) if not is_blank_row(row))
+    header_row = next(rows, None)
+    if header_row is None:
+        return [], []
+    first_row = next(rows, None)
+    headers, used_first_row = clean_headers(header_row, first_row)
+    data_rows = [] if first_row is None or used_first_row else [first_row]
+    data_rows.extend(rows)
+    # 헤더보다 짧은 행은 빈 셀로 채우고 긴 행은 자름
+    width = len(headers)
+    return headers, [tuple(row[:width]) + (None,) * (width - len(row)) for row in data_rows]
+
+
+def _ratio(mask, present, count):
+    return round(float((mask & present).sum()) / count, 4) if count else 0.0
+
+
+def _date_mask(text):
+    """연-월-일로 읽을 수 있고 실제 있는 날짜인지"""
+    parts = text.str.extract(_DATE_RE).fillna('')
+    dates = pd.to_datetime(
+        pd.DataFrame({
+            'year': pd.to_numeric(parts[0], errors='coerce'),
+            'month': pd.to_numeric(parts[1], errors='coerce'),
+            'day': pd.to_numeric(parts[2], errors='coerce'),
+        }),
+        errors='coerce',
+    )
+    return dates.notna()
+
+
+def infer_column(values):
+    """컬럼 하나(Series)의 통계와 추론 타입"""
+    total = len(values)
+    text = values.astype('string').str.strip().fillna('').astype(str)
+    present = text != ''
+    count = int(present.sum())
+
+    digits = text.str.replace(r'\D', '', regex=True)
+    phone = text.str.fullmatch(_PHONE_SHAPE_RE) & digits.str.fullmatch(_PHONE_DIGITS_RE)
+
+    is_date = _date_mask(text) if count else present
+
+    numbers = pd.to_numeric(text.str.replace(_NUMBER_NOISE_RE, '', regex=True), errors='coerce')
+    is_number = numbers.notna()
+
+    is_boolean = text.str.lower().isin(_BOOLEAN_WORDS)
+    unique_count = int(text[present].nunique())
+
+    stats = {
+        'null_ratio': round(1 - count / total, 4) if total else 1.0,
+        'unique_count': unique_count,
+        'unique_ratio': round(unique_count / count, 4) if count else 0.0,
+        'phone_ratio': _ratio(phone, present, count),
+        'date_ratio': _ratio(is_date, present, count),
+        'number_ratio': _ratio(is_number, present, count),
+        'boolean_ratio': _ratio(is_boolean, present, count),
+    }
+    if not count:
+        inferred = 'text'
+    elif stats['phone_ratio'] >= INFERENCE_THRESHOLD:
+        inferred = 'phone'
+    elif stats['date_ratio'] >= INFERENCE_THRESHOLD:
+        inferred = 'date'
+    elif stats['boolean_ratio'] >= INFERENCE_THRESHOLD and unique_count <= 2:
+        inferred = 'boolean'
+    elif stats['number_ratio'] >= INFERENCE_THRESHOLD:
+        inferred = 'number'
+    else:
+        inferred = 'text'
+    stats['inferred_type'] = inferred
+    stats['sample_values'] = text[present].drop_duplicates().head(SAMPLE_VALUE_COUNT).tolist()
+    return stats
+
+
+def _role(header, inferred_type):
+    if header in NAME_FIELDS:
+        return 'name'
+    if header in PHONE_FIELDS or inferred_type == 'phone':
+        return 'phone'
+    if header in CATEGORY_FIELDS:
+        return 'tags'
+    return 'data'
+
+
+def primary_phone_header(columns):
+    """고객 연락처로 쓸 컬럼 헤더 (연락처 헤더명인 첫 컬럼, 없으면 연락처로 추론된 첫 컬럼)"""
+    for matches in (lambda column: column['header'] in PHONE_FIELDS, lambda column: column['role'] == 'phone'):
+        for column in columns:
+            if matches(column):
+                return column['header']
+    return None
+
+
+def propose_mapping(gallery_id, columns):
+    """
+    {엑셀 헤더: 기존 컬럼 ID | 'new_<헤더>'} 제안
+
+    헤더/accessor가 같은 기존 컬럼이 있으면 그 컬럼, 고객 연락처 컬럼(primary_phone_header)은 기존 연락처 컬럼,
+    고객명/연락처/고객분류 헤더는 가져오기가 헤더명으로 처리하므로 매핑하지 않습니다.
+    연락처 형태인 다른 컬럼('보호자 연락처' 등)은 가져오기가 마지막 연락처 컬럼을 쓰므로 연락처 컬럼에
+    매핑하지 않고 자기 컬럼으로 둡니다.
+    """
+    existing = {}
+    phone_column_id = None
+    for column in get_gallery_metadata(gallery_id).columns:
+        for key in (column['accessor'], column['header']):
+            existing.setdefault(key.strip().lower(), column['id'])
+        if phone_column_id is None and column['accessor'] in PHONE_FIELDS:
+            phone_column_id = column['id']
+
+    phone_header = primary_phone_header(columns)
+    mapping = {}
+    for column in columns:
+        header = column['header']
+        column_id = existing.get(header.strip().lower())
+        if column_id is None and header == phone_header:
+            column_id = phone_column_id
+        if column_id is not None:
+            mapping[header] = str(column_id)
+        elif header not in BASIC_FIELDS:
+            mapping[header] = f'new_{header}'
+    return mapping
+
+
+def build_preview(gallery_id, file):
+    """
+    업로드 파일 미리보기 (같은 파일이면 캐시된 결과)
+
+    반환값: {'file_hash', 'row_count', 'headers', 'columns', 'proposed_mapping', 'sample_rows', 'cached'}
+    """
+    digest = file_hash(file)
+    key = _preview_key(gallery_id, digest)
+    preview = cache.get(key)
+    if preview is not None:
+        return {**preview, 'cached': True}
+
+    headers, rows = read_sheet(file)
+    df = pd.DataFrame.from_records(rows, columns=headers) if headers else pd.DataFrame()
+
+    columns = []
+    for position, header in enumerate(headers):
+        stats = infer_column(df.iloc[:, position])
+        columns.append({'header': header, 'role': _role(header, stats['inferred_type']), **stats})
+    # 연락처 역할은 한 컬럼만 (나머지 연락처 형태 컬럼은 data)
+    phone_header = primary_phone_header(columns)
+    for column in columns:
+        if column['role'] == 'phone' and column['header'] != phone_header:
+            column['role'] = 'data'
+
+    preview = {
+        'file_hash': digest,
+        'row_count': len(rows),
+        'headers': headers,
+        'columns': columns,
+        'proposed_mapping': propose_mapping(gallery_id, columns),
+        'sample_rows': [
+            {header: cell_text(value) for header, value in zip(headers, row)}
+            for row in rows[:SAMPLE_ROW_COUNT]
+        ],
+    }
+    if headers:
+        save_parsed_rows(gallery_id, digest, headers, rows)
+    cache.set(key, preview, PREVIEW_CACHE_TIMEOUT)
+    return {**preview, 'cached': False}
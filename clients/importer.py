@@ -0,0 +1,728 @@
+"""
+고객 엑셀/CSV 가져오기 (스트리밍)
+
+    rows = iter_upload_rows(upload_file)       # xlsx: openpyxl read_only, csv/tsv: csv 모듈, 행 단위 튜플
+    result = ClientImporter(gallery_id, column_mappings).run(rows)
+
+CSV/TSV는 앞부분 바이트로 인코딩(UTF-8 / CP949·EUC-KR)과 구분자를 판별한 뒤 csv 모듈로 읽으며,
+이후 매핑과 저장 경로는 엑셀과 같습니다.
+
+시트를 한 번만 읽습니다. 첫 행에서 헤더와 컬럼 매핑/역할(고객명, 연락처, 고객분류)을 한 번 정하고,
+이후 행은 CHUNK_SIZE개씩 모아 고객 bulk_create와 태그 연결 bulk_create로 저장하므로
+메모리에는 한 청크만 남고 행 수와 무관하게 청크당 쿼리 수가 일정합니다.
+
+bulk 경로는 save()와 시그널을 거치지 않으므로 phone_normalized, 검색/타입 인덱스,
+태그 비트맵, 기본 태그, 갤러리 버전을 청크마다 직접 처리합니다.
+청크 저장이 실패하면 그 청크만 한 행씩 다시 저장해 실패한 행만 건너뜁니다.
+
+가져오기 방식 (import_mode)
+    insert      모든 행을 새 고객으로 생성 (기본값)
+    phone       정규화 연락처가 같은 기존 고객이 있으면 병합, 없으면 생성
+    name_phone  고객명 + 정규화 연락처가 같은 기존 고객이 있으면 병합, 없으면 생성
+병합은 청크마다 기존 고객을 한 번에 조회해 bulk_update로 반영합니다. 엑셀의 빈 셀은 기존 값을 지우지 않고,
+값이 달라진 고객만 저장하므로 같은 파일을 다시 올리면 변경 없음으로 집계됩니다.
+
+업로드 요청은 enqueue_import()로 파일을 비공개 저장소(settings.STORAGES['client_imports'])에 올리고
+백그라운드 작업(import_clients)만 등록합니다. worker가 청크마다 진행 상황을 기록하고, 취소 요청을 받으면
+저장한 청크까지만 남기고 중단합니다. 올린 파일은 작업이 끝나면(실패/취소 포함) 삭제하며, worker가 중단되는 등으로
+남은 파일은 prune_import_uploads()가 보관 기간 후 삭제합니다.
+"""
+import codecs
+import csv
+import io
+import math
+import os
+import logging
+import uuid
+from datetime import timedelta
+
+import pandas as pd
+from django.conf import settings
+from django.core.files.storage import storages
+from django.db import transaction
+from django.utils import timezone
+
+from .column_keys import get_data_key_map
+from .jobs import enqueue_job, job_handler, report_progress
+from .metadata import get_gallery_metadata
+from .models import BackgroundJob, Client, ClientColumn, Tag
+from .phone import normalize_phone
+from .search import index_clients
+from .services import assign_default_tag
+from .tag_index import apply_link_changes, mark_clients
+from .typed_values import coerce_value, get_column_types, sync_typed_values
+from .versioning import bump_gallery_version
+
+logger = logging.getLogger(__name__)
+
+CHUNK_SIZE = 1000
+
+IMPORT_MODE_INSERT = 'insert'
+IMPORT_MODE_PHONE = 'phone'
+IMPORT_MODE_NAME_PHONE = 'name_phone'
+IMPORT_MODES = (IMPORT_MODE_INSERT, IMPORT_MODE_PHONE, IMPORT_MODE_NAME_PHONE)
+NEW_COLUMN_ORDER_START = 100
+IMPORT_TAG_COLOR = '#3B82F6'
+# 고객분류 셀 하나에 여러 태그를 적을 때의 구분자 ('VIP, 컬렉터' -> VIP, 컬렉터)
+TAG_SEPARATOR_RE = r'\s*[,;|\n]\s*'
+
+# 매핑된 헤더가 이 이름이면 data가 아닌 기본 필드/태그로 저장
+NAME_FIELDS = ('name', '고객명', 'customer_name')
+PHONE_FIELDS = ('phone', '연락처', '전화번호', '휴대폰', '핸드폰')
+CATEGORY_FIELDS = ('category', '고객분류', '고객 분류', 'tags')
+
+CSV_EXTENSIONS = ('.csv', '.tsv', '.txt')
+CSV_DELIMITERS = ',\t;|'
+# 인코딩/구분자 판별에 사용하는 앞부분 크기
+SNIFF_SIZE = 64 * 1024
+
+# 백그라운드 가져오기 파일을 올려두는 저장소(settings.STORAGES)와 경로 (작업이 끝나면 삭제)
+IMPORT_JOB_KIND = 'import_clients'
+IMPORT_STORAGE = 'client_imports'
+IMPORT_UPLOAD_DIR = 'client_imports'
+
+NAME_MAX_LENGTH = Client._meta.get_field('name').max_length
+PHONE_MAX_LENGTH = Client._meta.get_field('phone').max_length
+TAG_NAME_MAX_LENGTH = Tag._meta.get_field('name').max_length
+
+
+def iter_xlsx_rows(file):
+    """엑셀 첫 시트의 행을 값 튜플로 하나씩 반환 (read_only 모드라 시트 전체를 메모리에 올리지 않음)"""
+    from openpyxl import load_workbook
+
+    workbook = load_workbook(file, read_only=True, data_only=True)
+    try:
+        for row in workbook.active.iter_rows(values_only=True):
+            yield row
+    finally:
+        workbook.close()
+
+
+def estimate_xlsx_rows(file):
+    """첫 시트의 데이터 행 수 추정치 (시트 크기 정보 기준, 헤더 제외, 알 수 없으면 0)"""
+    from openpyxl import load_workbook
+
+    workbook = load_workbook(file, read_only=True, data_only=True)
+    try:
+        max_row = workbook.active.max_row or 0
+    finally:
+        workbook.close()
+    return max(max_row - 1, 0)
+
+
+def is_csv_file(name):
+    return os.path.splitext(name or '')[1].lower() in CSV_EXTENSIONS
+
+
+def detect_encoding(sample):
+    """앞부분 바이트로 인코딩 판별 (UTF-8 BOM / UTF-8 / CP949)"""
+    if sample.startswith(codecs.BOM_UTF8):
+        return 'utf-8-sig'
+    try:
+        # 샘플 끝에서 잘린 멀티바이트 문자는 오류로 보지 않음
+        codecs.getincrementaldecoder('utf-8')().decode(sample, final=False)
+        return 'utf-8'
+    except UnicodeDecodeError:
+        # 엑셀의 'CSV (쉼표로 분리)' 저장 기본 인코딩, EUC-KR 상위 호환
+        return 'cp949'
+
+
+def detect_delimiter(text, name=None):
+    """구분자 판별 (.tsv는 탭, 그 외는 앞부분 내용으로 추정, 실패하면 쉼표)"""
+    if os.path.splitext(name or '')[1].lower() == '.tsv':
+        return '\t'
+    lines = text.splitlines()[:50]
+    try:
+        return csv.Sniffer().sniff('\n'.join(lines), delimiters=CSV_DELIMITERS).delimiter
+    except csv.Error:
+        return ','
+
+
+def iter_csv_rows(file, name=None):
+    """CSV/TSV 행을 문자열 리스트로 하나씩 반환 (파일 전체를 메모리에 올리지 않음)"""
+    sample = file.read(SNIFF_SIZE)
+    file.seek(0)
+    encoding = detect_encoding(sample)
+    delimiter = detect_delimiter(sample.decode(encoding, errors='ignore'), name or getattr(file, 'name', None))
+    text = io.TextIOWrapper(file, encoding=encoding, errors='replace', newline='')
+    try:
+        for row in csv.reader(text, delimiter=delimiter):
+            yield row
+    finally:
+        # 원본 파일은 호출한 쪽에서 닫도록 분리
+        text.detach()
+
+
+def iter_upload_rows(file, name=None):
+    """업로드 파일 확장자에 따라 xlsx 또는 CSV/TSV 행 iterator"""
+    name = name or getattr(file, 'name', None)
+    if is_csv_file(name):
+        return iter_csv_rows(file, name)
+    return iter_xlsx_rows(file)
+
+
+def estimate_upload_rows(file, name=None):
+    """데이터 행 수 추정치 (CSV는 미리 알 수 없어 0)"""
+    if is_csv_file(name or getattr(file, 'name', None)):
+        return 0
+    return estimate_xlsx_rows(file)
+
+
+def cell_text(value):
+    """셀 값 -> 앞뒤 공백을 제거한 문자열 (빈 셀은 '')"""
+    if value is None:
+        return ''
+    if isinstance(value, float) and math.isnan(value):
+        return ''
+    return str(value).strip()
+
+
+def is_blank_row(row):
+    return not any(cell_text(value) for value in row)
+
+
+def clean_headers(header_row, first_row=None):
+    """
+    헤더 정리 (빈 헤더 칸은 첫 데이터 행 값, 그마저 없으면 column<n>, 중복 헤더는 _<n> 접미사)
+
+    반환값: (헤더 목록, 빈 헤더 칸이 있어 첫 데이터 행을 헤더로 사용했는지)
+    """
+    cleaned = []
+    has_blank = False
+    for index, value in enumerate(header_row):
+        text = cell_text(value)
+        if not text:
+            has_blank = True
+            if first_row is not None and index < len(first_row):
+                text = cell_text(first_row[index])
+        cleaned.append(text or f'column{index + 1}')
+
+    headers = []
+    counts = {}
+    for header in cleaned:
+        if header in counts:
+            counts[header] += 1
+            headers.append(f'{header}_{counts[header]}')
+        else:
+            counts[header] = 0
+            headers.append(header)
+    return headers, has_blank
+
+
+def split_tag_names(cells):
+    """고객분류 컬럼(Series) -> 행별 태그명 튜플 (구분자로 나누고 빈 값/중복 제거, 순서 유지)"""
+    return cells.str.split(TAG_SEPARATOR_RE, regex=True).map(
+        lambda names: tuple(dict.fromkeys(name for name in names if name))
+    )
+
+
+def merge_rows(first, second):
+    """같은 고객으로 보는 두 행을 하나로 (뒤 행의 비어있지 않은 값 우선, 태그는 합집합)"""
+    name, phone, normalized, data, tag_names = first
+    return (
+        second[0] or name,
+        second[1] or phone,
+        second[2] or normalized,
+        {**data, **second[3]},
+        tag_names + tuple(tag_name for tag_name in second[4] if tag_name not in tag_names),
+    )
+
+
+class ClientImporter:
+    """
+    매핑 정보에 따라 엑셀 행을 고객으로 저장
+
+    column_mappings: {엑셀 헤더: 기존 컬럼 ID 문자열 | 'new_...'}
+        기존 컬럼 ID면 그 컬럼 accessor로, 'new_'로 시작하거나 없는 ID면 헤더명으로 새 컬럼을 만들어 저장합니다.
+        매핑에 없는 헤더는 헤더명 그대로 data 키가 됩니다.
+    progress: 청크를 저장할 때마다 progress(처리한 행 수)로 호출 (백그라운드 작업 진행률 등)
+    mode: IMPORT_MODES 중 하나 (기존 고객과 병합할 기준)
+    """
+
+    def __init__(self, gallery_id, column_mappings, progress=None, chunk_size=CHUNK_SIZE, mode=IMPORT_MODE_INSERT):
+        if mode not in IMPORT_MODES:
+            raise ValueError(f'알 수 없는 가져오기 방식입니다: {mode}')
+        self.gallery_id = gallery_id
+        self.column_mappings = column_mappings or {}
+        self.progress = progress
+        self.mode = mode
+        self.chunk_size = chunk_size
+        self.Through = Client.tags.through
+        self.column_rename_map = {}
+        self.new_columns = []
+        self.created_count = 0
+        self.updated_count = 0
+        self.unchanged_count = 0
+        self.failed_count = 0
+        self.processed_count = 0
+
+    # 헤더/컬럼
+
+    def resolve_mappings(self):
+        """엑셀 헤더 -> accessor 매핑과 새로 만들 컬럼 목록"""
+        metadata = get_gallery_metadata(self.gallery_id)
+        id_to_accessor = {str(column['id']): column['accessor'] for column in metadata.columns}
+        for original_header, mapped_to in self.column_mappings.items():
+            mapped_to = str(mapped_to)
+            if not mapped_to.startswith('new_') and mapped_to in id_to_accessor:
+                self.column_rename_map[original_header] = id_to_accessor[mapped_to]
+                continue
+            if not mapped_to.startswith('new_'):
+                logger.info('컬럼 ID를 찾을 수 없어 새 컬럼으로 생성: %s -> %s', original_header, mapped_to)
+            self.column_rename_map[original_header] = original_header
+            self.new_columns.append({
+                'header': original_header,
+                'accessor': original_header,  # header와 동일하게 설정하여 데이터 매핑 일관성 유지
+                'type': 'text',
+                'order': NEW_COLUMN_ORDER_START + len(self.new_columns),  # 기본 컬럼 이후에 배치
+            })
+
+    def ensure_columns(self):
+        """새 컬럼 생성 (이미 있는 accessor는 건너뜀, 시그널이 메타데이터/키 변환을 처리)"""
+        existing = get_gallery_metadata(self.gallery_id).column_types
+        for column in self.new_columns:
+            if column['accessor'] in existing:
+                continue
+            try:
+                ClientColumn.objects.create(gallery_id=self.gallery_id, **column)
+                logger.info('새 컬럼 생성: %s (갤러리 %s)', column['header'], self.gallery_id)
+            except Exception:
+                logger.exception('컬럼 생성 실패: %s (갤러리 %s)', column['header'], self.gallery_id)
+
+    def plan_columns(self, headers):
+        """
+        컬럼 위치별 역할을 한 번 정함
+
+        고객명/연락처/고객분류는 (같은 역할 컬럼이 여럿이면 마지막) 위치 하나,
+        나머지는 [(위치, 저장 키, accessor)]로 self.base_columns / self.data_columns에 기록합니다.
+        """
+        self.width = len(headers)
+        self.base_columns = {}
+        self.data_columns = []
+        for position, header in enumerate(headers):
+            accessor = self.column_rename_map.get(header, header)
+            keys = (header, accessor)
+            if any(key in NAME_FIELDS for key in keys):
+                self.base_columns['name'] = position
+            elif any(key in PHONE_FIELDS for key in keys):
+                self.base_columns['phone'] = position
+            elif any(key in CATEGORY_FIELDS for key in keys):
+                self.base_columns['tags'] = position
+            else:
+                self.data_columns.append((position, self.key_map.storage_key(accessor), accessor))
+
+    # 실행
+
+    def run(self, rows):
+        """
+        rows: 첫 행이 헤더인 값 튜플 iterator
+        반환값: {'created_count', 'updated_count', 'unchanged_count', 'failed_count',
+                 'import_mode', 'column_mapping', 'new_columns_created'}
+        """
+        rows = iter(rows)
+        header_row = next((row for row in rows if not is_blank_row(row)), None)
+        if header_row is None:
+            return self.result()
+        first_row = next((row for row in rows if not is_blank_row(row)), None)
+        headers, used_first_row = clean_headers(header_row, first_row)
+        logger.debug('가져오기 헤더: %s', headers)
+
+        self.resolve_mappings()
+        self.ensure_columns()
+        self.column_types = get_column_types(self.gallery_id)
+        self.key_map = get_data_key_map(self.gallery_id)
+        self.plan_columns(headers)
+        self.tag_cache = dict(get_gallery_metadata(self.gallery_id).tag_ids)
+
+        chunk = []
+        if first_row is not None and not used_first_row:
+            chunk.append(first_row)
+        for row in rows:
+            if is_blank_row(row):
+                continue
+            chunk.append(row)
+            if len(chunk) >= self.chunk_size:
+                self.write_chunk(chunk)
+                chunk = []
+        if chunk:
+            self.write_chunk(chunk)
+        return self.result()
+
+    def result(self):
+        return {
+            'created_count': self.created_count,
+            'updated_count': self.updated_count,
+            'unchanged_count': self.unchanged_count,
+            'failed_count': self.failed_count,
+            'import_mode': self.mode,
+            'column_mapping': self.column_rename_map,
+            'new_columns_created': len(self.new_columns),
+        }
+
+    def clean_chunk(self, rows):
+        """
+        청크 행 -> [(name, phone, phone_normalized, 저장 키 data, 태그명 튜플)]
+
+        행마다 셀을 하나씩 확인하지 않고 DataFrame 컬럼 단위로 문자열 변환/공백 제거/빈 값 판별,
+        타입 컬럼 변환, 연락처 정규화를 한 번씩 처리한 뒤 한 번의 순회로 레코드를 만듭니다.
+        """
+        width = self.width
+        frame = pd.DataFrame.from_records(
+            [tuple(row[:width]) + (None,) * (width - len(row)) for row in rows],
+            columns=range(width),
+        )
+        text = frame.astype('string').apply(lambda column: column.str.strip()).fillna('').astype(object)
+
+        empty = pd.Series('', index=text.index, dtype=object)
+        names = text[self.base_columns['name']] if 'name' in self.base_columns else empty
+        phones = text[self.base_columns['phone']] if 'phone' in self.base_columns else empty
+        tag_names = text[self.base_columns['tags']] if 'tags' in self.base_columns else empty
+
+        too_long = (names.str.len() > NAME_MAX_LENGTH) | (phones.str.len() > PHONE_MAX_LENGTH)
+        if too_long.any():
+            logger.info('고객명/연락처가 너무 긴 행 %s건 건너뜀', int(too_long.sum()))
+            self.failed_count += int(too_long.sum())
+
+        positions = [position for position, _, _ in self.data_columns]
+        present = (text[positions] != '').to_numpy()
+        values = text[positions].copy()
+        for position, _, accessor in self.data_columns:
+            column_type = self.column_types.get(accessor)
+            if column_type:
+                # 숫자/날짜/참거짓 컬럼은 타입에 맞게 변환 (빈 셀은 present 마스크로 제외)
+                coerced = values[position].map(lambda value, t=column_type: coerce_value(value, t))
+                values[position] = coerced.astype(object)
+        storage_keys = [key for _, key, _ in self.data_columns]
+
+        parsed = []
+        for skip, name, phone, normalized, row_tags, row_values, row_present in zip(
+            too_long.to_numpy(),
+            names.to_numpy(),
+            phones.to_numpy(),
+            phones.map(normalize_phone).to_numpy(),
+            split_tag_names(tag_names).to_numpy(),
+            values.to_numpy(dtype=object),
+            present,
+        ):
+            if skip:
+                continue
+            data = {key: value for key, value, keep in zip(storage_keys, row_values, row_present) if keep}
+            parsed.append((name, phone, normalized, data, row_tags))
+        return parsed
+
+    def write_chunk(self, rows):
+        parsed = self.clean_chunk(rows)
+        tag_ids = self.resolve_tags({tag_name for *_, tag_names in parsed for tag_name in tag_names})
+        if self.mode != IMPORT_MODE_INSERT:
+            parsed = self.merge_existing(parsed, tag_ids)
+
+        try:
+            self.save_clients(parsed, tag_ids)
+            self.created_count += len(parsed)
+        except Exception as e:
+            # 청크 전체가 롤백되었으므로 한 행씩 다시 저장해 실패한 행만 건너뜀
+            logger.info('청크 저장 실패, 행 단위로 재시도: %s', e)
+            for item in parsed:
+                try:
+                    self.save_clients([item], tag_ids)
+                    self.created_count += 1
+                except Exception as row_error:
+                    logger.debug('행 저장 실패: %s', row_error)
+                    self.failed_count += 1
+
+        self.processed_count += len(rows)
+        if self.progress:
+            self.progress(self.processed_count)
+
+    # 병합 (import_mode: phone / name_phone)
+
+    def match_key(self, name, normalized):
+        """기존 고객과 비교하는 키 (연락처가 없거나 name_phone 방식에서 고객명이 없으면 None)"""
+        if not normalized:
+            return None
+        if self.mode == IMPORT_MODE_NAME_PHONE:
+            return (name, normalized) if name else None
+        return normalized
+
+    def merge_existing(self, parsed, tag_ids):
+        """
+        기존 고객과 키가 같은 행은 병합해 bulk_update로 저장하고, 새로 만들 행만 반환
+
+        같은 청크 안에서 키가 같은 행은 먼저 하나로 합칩니다 (뒤 행의 값 우선, 태그는 합집합).
+        """
+        inserts = []
+        pending = {}
+        for item in parsed:
+            key = self.match_key(item[0], item[2])
+            if key is None:
+                inserts.append(item)
+            elif key in pending:
+                pending[key] = merge_rows(pending[key], item)
+            else:
+                pending[key] = item
+        if not pending:
+            return inserts
+
+        existing = {}
+        candidates = (
+            Client.objects
+            .filter(gallery_id=self.gallery_id, phone_normalized__in={item[2] for item in pending.values()})
+            .only('id', 'gallery', 'name', 'phone', 'phone_normalized', 'data')
+            .order_by('id')
+        )
+        for client in candidates:
+            # 기존 데이터에 같은 키 고객이 여럿이면 가장 먼저 만든 고객에 병합
+            existing.setdefault(self.match_key(client.name or '', client.phone_normalized), client)
+
+        matched = []
+        for key, item in pending.items():
+            client = existing.get(key)
+            if client is None:
+                inserts.append(item)
+            else:
+                matched.append((client, item))
+        if not matched:
+            return inserts
+
+        linked = set(
+            self.Through.objects
+            .filter(client_id__in=[client.pk for client, _ in matched], tag_id__in=set(tag_ids.values()))
+            .values_list('client_id', 'tag_id')
+        )
+        changed = []
+        links = []
+        unchanged = 0
+        for client, (name, phone, _, data, tag_names) in matched:
+            before = (client.name, client.phone, client.data)
+            if name:
+                client.name = name
+            if phone:
+                client.phone = phone
+            client.data = {**(client.data or {}), **data}
+            new_links = [
+                (tag_ids[tag_name], client.pk) for tag_name in tag_names
+                if tag_name in tag_ids and (client.pk, tag_ids[tag_name]) not in linked
+            ]
+            if (client.name, client.phone, client.data) != before:
+                changed.append(client)
+            elif not new_links:
+                unchanged += 1
+            links.extend(new_links)
+
+        try:
+            self.save_merges(changed, links)
+        except Exception:
+            logger.exception('기존 고객 병합 실패 (갤러리 %s, %s명)', self.gallery_id, len(matched))
+            self.failed_count += len(matched)
+            return inserts
+        self.unchanged_count += unchanged
+        self.updated_count += len(matched) - unchanged
+        return inserts
+
+    @transaction.atomic
+    def save_merges(self, clients, links):
+        if clients:
+            # bulk_update는 auto_now를 적용하지 않으므로 델타 동기화용 updated_at을 직접 설정
+            now = timezone.now()
+            for client in clients:
+                client.updated_at = now
+            Client.objects.bulk_update(clients, ['name', 'phone', 'data', 'updated_at'], batch_size=self.chunk_size)
+            index_clients(clients)
+            sync_typed_values(clients, self.column_types)
+        if links:
+            self.Through.objects.bulk_create(
+                [self.Through(client_id=client_id, tag_id=tag_id) for tag_id, client_id in links],
+                ignore_conflicts=True,
+            )
+            apply_link_changes(self.gallery_id, added=links)
+        if clients or links:
+            bump_gallery_version(self.gallery_id)
+
+    def resolve_tags(self, names):
+        """
+        청크의 태그명 -> 태그 ID
+
+        캐시에 없는 태그만 bulk_create(ignore_conflicts) 한 번과 조회 한 번으로 준비합니다.
+        (다른 요청이 같은 이름을 먼저 만들어도 기존 태그를 사용, 고객 저장과 별도로 커밋)
+        """
+        missing = [name for name in names if name not in self.tag_cache and len(name) <= TAG_NAME_MAX_LENGTH]
+        if missing:
+            Tag.objects.bulk_create(
+                [Tag(gallery_id=self.gallery_id, name=name, color=IMPORT_TAG_COLOR) for name in missing],
+                ignore_conflicts=True,
+            )
+            self.tag_cache.update(
+                Tag.objects.filter(gallery_id=self.gallery_id, name__in=missing).values_list('name', 'id')
+            )
+            # bulk_create는 시그널을 보내지 않으므로 태그 사전(메타데이터) 버전을 직접 올림
+            bump_gallery_version(self.gallery_id, metadata=True)
+            logger.debug('가져오기 태그 생성: %s', missing)
+        return {name: self.tag_cache[name] for name in names if name in self.tag_cache}
+
+    @transaction.atomic
+    def save_clients(self, parsed, tag_ids):
+        clients = [
+            Client(
+                gallery_id=self.gallery_id,
+                name=name,
+                phone=phone,
+                data=data,
+                phone_normalized=normalized,
+            )
+            for name, phone, normalized, data, _ in parsed
+        ]
+        Client.objects.bulk_create(clients)
+
+        links = [
+            self.Through(client_id=client.pk, tag_id=tag_ids[tag_name])
+            for client, (*_, tag_names) in zip(clients, parsed)
+            for tag_name in tag_names
+            if tag_name in tag_ids
+        ]
+        self.Through.objects.bulk_create(links, ignore_conflicts=True)
+
+        client_ids = [client.pk for client in clients]
+        mark_clients(self.gallery_id, client_ids)
+        apply_link_changes(self.gallery_id, added=[(link.tag_id, link.client_id) for link in links])
+        # Client.save()로 만들 때와 같이 모든 고객에게 기본 태그 할당
+        assign_default_tag(self.gallery_id, client_ids)
+        index_clients(clients)
+        sync_typed_values(clients, self.column_types)
+        bump_gallery_version(self.gallery_id)
+
+
+# 백그라운드 가져오기
+
+def import_storage(alias=IMPORT_STORAGE):
+    """가져오기 업로드 저장소 (기본은 비공개 client_imports)"""
+    return storages[alias]
+
+
+def import_upload_retention():
+    return timedelta(hours=getattr(settings, 'CLIENT_IMPORT_UPLOAD_RETENTION_HOURS', 24))
+
+
+def enqueue_import(gallery_id, file, column_mappings, created_by=None, file_hash=None, mode=IMPORT_MODE_INSERT):
+    """
+    업로드 파일을 비공개 저장소에 올리고 가져오기 작업 등록
+
+    mode: IMPORT_MODES 중 하나 (잘못된 값이면 ValueError)
+    file_hash: 미리보기(clients.import_preview)와 같은 파일이면 worker가 미리보기에서 저장한 파싱 결과를 사용
+    """
+    if mode not in IMPORT_MODES:
+        raise ValueError(f'알 수 없는 가져오기 방식입니다: {mode}')
+    extension = os.path.splitext(file.name or '')[1].lower() or '.xlsx'
+    storage = import_storage()
+    path = storage.save(f'{IMPORT_UPLOAD_DIR}/{gallery_id}/{uuid.uuid4().hex}{extension}', file)
+    try:
+        return enqueue_job(
+            IMPORT_JOB_KIND,
+            gallery_id=gallery_id,
+            params={
+                'storage': IMPORT_STORAGE,
+                'file_path': path,
+                'file_name': file.name,
+                'file_hash': file_hash,
+                'column_mappings': column_mappings,
+                'import_mode': mode,
+            },
+            created_by=created_by,
+        )
+    except Exception:
+        storage.delete(path)
+        raise
+
+
+def _import_job_finished(job):
+    """
+    올려둔 파일과 미리보기 파싱 결과 삭제 (성공/실패/취소, worker 중단으로 실패 처리된 경우 모두)
+
+    청크마다 커밋하므로 처음부터 다시 실행하면 이미 저장한 고객이 중복될 수 있어, 멈춘 가져오기 작업은
+    다시 실행하지 않고 실패로 끝냅니다. (retry_stale=False)
+    """
+    from .import_preview import forget_import_rows
+
+    import_storage(job.params.get('storage', 'default')).delete(job.params['file_path'])
+    forget_import_rows(job.gallery_id, job.params.get('file_hash'))
+
+
+@job_handler(IMPORT_JOB_KIND, on_finish=_import_job_finished)
+def import_clients_job(job):
+    """
+    저장소의 파일을 스트리밍해 가져오기 (청크마다 커밋, 진행 상황 기록)
+
+    취소되거나 실패해도 그때까지의 건수를 job.result에 남기고, 올려둔 파일은 끝난 뒤 항상 삭제합니다.
+    """
+    from .import_preview import parsed_rows_path, read_parsed_rows
+
+    # 비공개 저장소 도입 전에 등록된 작업은 기본 저장소에 파일이 있음
+    storage = import_storage(job.params.get('storage', 'default'))
+    path = job.params['file_path']
+    digest = job.params.get('file_hash')
+    importer = ClientImporter(
+        job.gallery_id,
+        job.params.get('column_mappings'),
+        progress=lambda done: report_progress(job, done, max(job.progress_total, done)),
+        mode=job.params.get('import_mode', IMPORT_MODE_INSERT),
+    )
+    try:
+        parsed_path = parsed_rows_path(job.gallery_id, digest) if digest else None
+        if parsed_path and import_storage().exists(parsed_path):
+            # 미리보기에서 파싱해 둔 행 재사용 (대기 중에 취소된 작업은 여기서 바로 중단)
+            with import_storage().open(parsed_path, 'rb') as file:
+                total, rows = read_parsed_rows(file)
+                report_progress(job, 0, total)
+                return importer.run(rows)
+        with storage.open(path, 'rb') as file:
+            report_progress(job, 0, estimate_upload_rows(file, path))
+            file.seek(0)
+            return importer.run(iter_upload_rows(file, path))
+    except Exception:  # JobCancelled 포함
+        job.result = importer.result()
+        raise
+
+
+def _upload_paths(storage):
+    """저장소의 가져오기 업로드 파일 경로 (IMPORT_UPLOAD_DIR/<갤러리 ID>/<파일>)"""
+    try:
+        gallery_dirs, _ = storage.listdir(IMPORT_UPLOAD_DIR)
+    except (FileNotFoundError, NotImplementedError):
+        return
+    for gallery_dir in gallery_dirs:
+        directory = f'{IMPORT_UPLOAD_DIR}/{gallery_dir}'
+        for name in storage.listdir(directory)[1]:
+            yield f'{directory}/{name}'
+
+
+def prune_import_uploads():
+    """
+    보관 기간(CLIENT_IMPORT_UPLOAD_RETENTION_HOURS)이 지난 가져오기 업로드 파일 삭제
+
+    작업이 끝날 때 파일을 지우지만, 작업 등록 전에 실패했거나 가져오지 않은 미리보기 파싱 결과는 남습니다.
+    끝나지 않은 작업(오래 대기 중인 작업 포함)의 업로드 파일과 파싱 결과는 기간과 관계없이 남기고,
+    비공개 저장소 도입 전 기본 저장소에 올린 파일도 함께 정리합니다.
+    반환값: 삭제한 파일 수
+    """
+    from .import_preview import parsed_rows_path
+
+    cutoff = timezone.now() - import_upload_retention()
+    active = set()
+    unfinished = (
+        BackgroundJob.objects
+        .filter(kind=IMPORT_JOB_KIND)
+        .exclude(status__in=BackgroundJob.FINISHED_STATUSES)
+        .values_list('gallery_id', 'params')
+    )
+    for gallery_id, params in unfinished:
+        active.add(params.get('file_path'))
+        if params.get('file_hash'):
+            active.add(parsed_rows_path(gallery_id, params['file_hash']))
+    deleted = 0
+    for alias in dict.fromkeys([IMPORT_STORAGE, 'default']):
+        storage = import_storage(alias)
+        for path in list(_upload_paths(storage)):
+            if path in active or storage.get_modified_time(path) >= cutoff:
+                continue
+            storage.delete(path)
+            deleted += 1
+    return deleted
@@ -0,0 +1,201 @@
+"""
+백그라운드 작업 큐 (BackgroundJob)
+
+    @job_handler('rename_data_key')
+    def rename_data_key_job(job):
+        ...
+        report_progress(job, done, total)   # 취소 요청 시 JobCancelled 발생
+        return {'updated_count': done}     # job.result에 저장
+
+웹 요청은 enqueue_job()으로 작업을 등록만 하고, worker 프로세스
+(python manage.py run_background_jobs)가 대기 중인 작업을 가져가 실행합니다.
+request_cancel()은 취소 요청만 기록하며, 작업은 다음 report_progress()에서 중단됩니다.
+
+report_progress()는 updated_at도 갱신하는 heartbeat이므로, 처리 함수는 BACKGROUND_JOB_STALE_SECONDS보다
+자주 호출해야 합니다. worker가 배포/장애로 중단되어 그보다 오래 갱신되지 않은 실행 중 작업은
+reclaim_stale_jobs()가 다시 대기열에 넣거나(retry_stale=True로 등록한 작업, MAX_ATTEMPTS까지) 실패 처리합니다.
+작업 처리 함수가 있는 모듈은 ClientsConfig.ready에서 import 되어야 등록됩니다.
+"""
+import logging
+import traceback
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from .models import BackgroundJob
+
+logger = logging.getLogger(__name__)
+
+HANDLERS = {}
+# 작업이 끝난 뒤(상태 저장 후) 호출할 함수 {kind: func(job)}
+FINISH_HOOKS = {}
+# worker 중단으로 멈춘 작업을 처음부터 다시 실행해도 되는 작업 종류
+RETRY_STALE_KINDS = set()
+# 중간에 멈추면 데이터가 반쯤 바뀐 채 남는 작업 종류 (취소 요청 불가)
+UNCANCELLABLE_KINDS = set()
+MAX_ATTEMPTS = 3
+
+
+class JobCancelled(Exception):
+    """작업 취소 요청을 받아 중단"""
+
+
+class JobNotCancellable(Exception):
+    """취소할 수 없는 종류의 작업에 취소 요청"""
+
+
+def job_handler(kind, on_finish=None, retry_stale=False, cancellable=True):
+    """
+    작업 종류별 처리 함수 등록 데코레이터
+
+    on_finish: 성공/실패/취소와 관계없이 상태를 저장한 뒤 호출할 함수 (예: 캐시 무효화, 파일 정리)
+    retry_stale: 멈춘 작업을 다시 실행해도 결과가 같은(멱등) 작업이면 True
+    cancellable: 중간에 멈추면 안 되는 작업이면 False (request_cancel이 JobNotCancellable 발생)
+    """
+    def register(func):
+        HANDLERS[kind] = func
+        if on_finish is not None:
+            FINISH_HOOKS[kind] = on_finish
+        if retry_stale:
+            RETRY_STALE_KINDS.add(kind)
+        if not cancellable:
+            UNCANCELLABLE_KINDS.add(kind)
+        return func
+    return register
+
+
+def enqueue_job(kind, gallery_id=None, params=None, created_by=None, total=0):
+    if kind not in HANDLERS:
+        raise ValueError(f'등록되지 않은 작업 종류입니다: {kind}')
+    return BackgroundJob.objects.create(
+        kind=kind,
+        gallery_id=gallery_id,
+        params=params or {},
+        created_by=created_by if getattr(created_by, 'pk', None) else None,
+        progress_total=total,
+    )
+
+
+def claim_next_job():
+    """대기 중인 가장 오래된 작업을 실행 중으로 바꿔 반환 (여러 worker가 동시에 가져가지 않도록 잠금)"""
+    with transaction.atomic():
+        job = (
+            BackgroundJob.objects
+            .select_for_update(skip_locked=True)
+            .filter(status=BackgroundJob.STATUS_PENDING)
+            .order_by('created_at', 'id')
+            .first()
+        )
+        if job is None:
+            return None
+        job.status = BackgroundJob.STATUS_RUNNING
+        job.started_at = timezone.now()
+        job.attempts += 1
+        job.save(update_fields=['status', 'started_at', 'attempts', 'updated_at'])
+    return job
+
+
+def stale_job_timeout():
+    return timedelta(seconds=settings.BACKGROUND_JOB_STALE_SECONDS)
+
+
+def reclaim_stale_jobs(timeout=None):
+    """
+    heartbeat(updated_at)이 timeout보다 오래된 실행 중 작업 정리
+
+    retry_stale 작업은 실행 횟수가 MAX_ATTEMPTS 미만이고 취소 요청이 없으면 다시 대기 상태로,
+    그 외에는 실패로 기록하고 종료 함수(on_finish)를 호출합니다.
+    반환값: 정리한 작업 목록
+    """
+    cutoff = timezone.now() - (timeout or stale_job_timeout())
+    failed = []
+    with transaction.atomic():
+        jobs = list(
+            BackgroundJob.objects
+            .select_for_update(skip_locked=True)
+            .filter(status=BackgroundJob.STATUS_RUNNING, updated_at__lt=cutoff)
+            .order_by('id')
+        )
+        for job in jobs:
+            if job.kind in RETRY_STALE_KINDS and job.attempts < MAX_ATTEMPTS and not job.cancel_requested:
+                logger.warning('멈춘 작업을 다시 대기열에 넣음: %s (실행 %s회)', job, job.attempts)
+                job.status = BackgroundJob.STATUS_PENDING
+                job.started_at = None
+                job.save(update_fields=['status', 'started_at', 'updated_at'])
+                continue
+            logger.warning('멈춘 작업을 실패 처리: %s (마지막 기록 %s)', job, job.updated_at)
+            job.status = BackgroundJob.STATUS_FAILED
+            job.error = f'worker가 중단되어 작업이 끝나지 않았습니다. (마지막 진행 기록: {job.updated_at.isoformat()})'
+            job.finished_at = timezone.now()
+            job.save(update_fields=['status', 'error', 'finished_at', 'updated_at'])
+            failed.append(job)
+    for job in failed:
+        _call_finish_hook(job)
+    return jobs
+
+
+def report_progress(job, done, total=None):
+    """
+    진행 상황 기록 (행 잠금 없이 단일 UPDATE, updated_at을 갱신하는 heartbeat)
+
+    기록하면서 취소 요청 여부를 확인하고, 취소되었으면 JobCancelled를 발생시킵니다.
+    """
+    job.progress_done = done
+    fields = {'progress_done': done, 'updated_at': timezone.now()}
+    if total is not None:
+        job.progress_total = total
+        fields['progress_total'] = total
+    BackgroundJob.objects.filter(pk=job.pk).update(**fields)
+    if BackgroundJob.objects.filter(pk=job.pk, cancel_requested=True).exists():
+        raise JobCancelled()
+
+
+def request_cancel(job):
+    """
+    작업 취소 요청 (이미 끝난 작업이면 False, 취소할 수 없는 종류면 JobNotCancellable)
+
+    실행 중이거나 대기 중인 작업 모두 처리 함수가 다음 report_progress()를 호출할 때 중단됩니다.
+    """
+    if job.kind in UNCANCELLABLE_KINDS:
+        raise JobNotCancellable(f'취소할 수 없는 작업입니다: {job.kind}')
+    requested = (
+        BackgroundJob.objects
+        .filter(pk=job.pk)
+        .exclude(status__in=BackgroundJob.FINISHED_STATUSES)
+        .update(cancel_requested=True, updated_at=timezone.now())
+    )
+    if requested:
+        job.cancel_requested = True
+    return bool(requested)
+
+
+def run_job(job):
+    """작업 하나 실행 후 상태/결과 기록"""
+    handler = HANDLERS.get(job.kind)
+    try:
+        if handler is None:
+            raise ValueError(f'등록되지 않은 작업 종류입니다: {job.kind}')
+        job.result = handler(job) or {}
+        job.status = BackgroundJob.STATUS_SUCCEEDED
+    except JobCancelled:
+        job.status = BackgroundJob.STATUS_CANCELLED
+    except Exception as e:
+        logger.exception('백그라운드 작업 실패: %s', job)
+        job.status = BackgroundJob.STATUS_FAILED
+        job.error = f'{type(e).__name__}: {e}\n{traceback.format_exc()}'
+    job.finished_at = timezone.now()
+    job.save(update_fields=['status', 'result', 'error', 'finished_at', 'progress_done', 'progress_total', 'updated_at'])
+    _call_finish_hook(job)
+    return job
+
+
+def _call_finish_hook(job):
+    on_finish = FINISH_HOOKS.get(job.kind)
+    if on_finish is not None:
+        try:
+            on_finish(job)
+        except Exception:
+            logger.exception('백그라운드 작업 종료 처리 실패: %s', job)
+
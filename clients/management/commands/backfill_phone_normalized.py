@@ -0,0 +1,66 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from clients.models import Client
+from clients.phone import normalize_client_phone
+
+
+class Command(BaseCommand):
+    help = '기존 고객의 정규화 연락처(phone_normalized) 일괄 채우기'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=1000,
+            help='한 번에 갱신할 고객 수 (기본 1000)',
+        )
+        parser.add_argument(
+            '--gallery',
+            type=int,
+            help='특정 갤러리 ID만 처리',
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='실제 변경 없이 변경될 건수만 표시',
+        )
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        clients = Client.objects.only('id', 'gallery', 'phone', 'data', 'phone_normalized').order_by('id')
+        if options['gallery']:
+            clients = clients.filter(gallery_id=options['gallery'])
+
+        total = clients.count()
+        self.stdout.write(f'대상 고객 수: {total}명')
+
+        # pk 범위로 배치를 나눠 OFFSET 없이 순회
+        last_id = 0
+        processed = 0
+        changed = 0
+        while True:
+            batch = list(clients.filter(id__gt=last_id)[:batch_size])
+            if not batch:
+                break
+            last_id = batch[-1].id
+            processed += len(batch)
+
+            to_update = []
+            for client in batch:
+                normalized = normalize_client_phone(client.phone, client.accessor_data())
+                if normalized != client.phone_normalized:
+                    client.phone_normalized = normalized
+                    to_update.append(client)
+            changed += len(to_update)
+
+            if to_update and not options['dry_run']:
+                with transaction.atomic():
+                    Client.objects.bulk_update(to_update, ['phone_normalized'])
+            self.stdout.write(f'... {processed}/{total} (변경 {changed}건)')
+
+        if options['dry_run']:
+            self.stdout.write(self.style.WARNING(f'\n--dry-run 모드: {changed}건이 변경될 예정입니다.'))
+            return
+
+        self.stdout.write(self.style.SUCCESS(f'\n정규화 연락처 채우기 완료: {changed}건 변경'))
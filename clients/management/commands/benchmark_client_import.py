@@ -0,0 +1,269 @@
+import contextlib
+import io
+import json
+import random
+import tempfile
+import time
+import tracemalloc
+from datetime import date, datetime, timedelta
+
+from django.conf import settings
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import (
+    CaptureQueriesContext,
+    override_settings,
+    setup_test_environment,
+    teardown_test_environment,
+)
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from accounts.models import Gallery, User
+from clients.importer import IMPORT_MODE_INSERT, IMPORT_MODES, IMPORT_STORAGE
+from clients.jobs import claim_next_job, run_job
+from clients.models import BackgroundJob, ClientColumn
+
+UPLOAD_URL = '/api/excel/upload-with-mapping/'
+
+# 헤더 행 (None은 빈 헤더 칸 -> 첫 데이터 행 값이 헤더, 중복 헤더는 _1 접미사)
+HEADER_ROW = ['고객명', '연락처', None, '구매 작가명', '구매 작가명', '등록일', '구매 금액', '수신 동의', '고객분류', None, '메모']
+HEADER_FILL_ROW = [None, None, '이메일', None, None, None, None, None, None, None, None]
+
+# 미리 만들어 두고 ID로 매핑하는 타입 컬럼 (나머지는 new_ 매핑으로 새 컬럼 생성)
+TYPED_COLUMNS = [('등록일', 'date'), ('구매 금액', 'number'), ('수신 동의', 'boolean')]
+
+SURNAMES = '김이박최정강조윤장임한오서신권황안송류홍'
+GIVEN_SYLLABLES = '민서지현우준도윤하은수영예진성호유나연재'
+ARTISTS = ['김환기', '이우환', '박서보', '정상화', '윤형근', '하종현', '이중섭', '천경자']
+TAGS = ['VIP', '컬렉터', '신규', '작가 관심', '재방문']
+CONSENT_WORDS = ['Y', 'N', '동의', '거부', '예', '아니오']
+
+
+def _name(rng):
+    return rng.choice(SURNAMES) + ''.join(rng.choice(GIVEN_SYLLABLES) for _ in range(2))
+
+
+def _phone(rng):
+    middle, last = rng.randint(1000, 9999), rng.randint(1000, 9999)
+    if rng.random() < 0.2:
+        return int(f'10{middle}{last}')  # 숫자 셀이라 앞자리 0이 빠진 번호
+    return f'010-{middle}-{last}'
+
+
+def _registered(rng):
+    day = date(2015, 1, 1) + timedelta(days=rng.randint(0, 3650))
+    roll = rng.random()
+    if roll < 0.4:
+        return datetime(day.year, day.month, day.day)  # 날짜 셀
+    if roll < 0.7:
+        return f'{day.year}.{day.month}.{day.day}'
+    if roll < 0.9:
+        return f'{day.year}년 {day.month}월 {day.day}일'
+    return ''
+
+
+def _amount(rng):
+    amount = rng.randint(10, 5000) * 10000
+    roll = rng.random()
+    if roll < 0.5:
+        return amount
+    if roll < 0.8:
+        return f'{amount:,}원'
+    if roll < 0.9:
+        return '문의'  # 숫자로 바꿀 수 없는 값
+    return None
+
+
+def _tags(rng):
+    roll = rng.random()
+    if roll < 0.3:
+        return None
+    if roll < 0.8:
+        return rng.choice(TAGS)
+    return ', '.join(rng.sample(TAGS, 2))
+
+
+def synthetic_rows(count, seed=0):
+    """가상 갤러리 고객 행 (빈 헤더/중복 헤더/타입이 섞인 값 포함)"""
+    rng = random.Random(seed)
+    yield HEADER_ROW
+    yield HEADER_FILL_ROW
+    for index in range(count):
+        yield [
+            _name(rng),
+            _phone(rng),
+            f'client{index}@example.com' if rng.random() < 0.6 else None,
+            rng.choice(ARTISTS),
+            rng.choice(ARTISTS) if rng.random() < 0.3 else None,
+            _registered(rng),
+            _amount(rng),
+            rng.choice(CONSENT_WORDS),
+            _tags(rng),
+            rng.randint(1, 100) if rng.random() < 0.5 else None,
+            '전시 오프닝 방문' if rng.random() < 0.1 else '',
+        ]
+
+
+def synthetic_workbook(count, seed=0):
+    """가상 고객 엑셀 파일 바이트 (openpyxl write_only)"""
+    from openpyxl import Workbook
+
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet('고객')
+    for row in synthetic_rows(count, seed):
+        sheet.append(row)
+    buffer = io.BytesIO()
+    workbook.save(buffer)
+    return buffer.getvalue()
+
+
+class Command(BaseCommand):
+    help = '엑셀 가져오기 처리량 벤치마크 (가상 엑셀 생성 -> 업로드 API -> 가져오기 작업 실행)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--rows',
+            type=int,
+            nargs='+',
+            default=[1000, 10000, 100000],
+            help='측정할 행 수 (기본 1000 10000 100000)',
+        )
+        parser.add_argument(
+            '--mode',
+            choices=IMPORT_MODES,
+            default=IMPORT_MODE_INSERT,
+            help=f'가져오기 방식 (기본 {IMPORT_MODE_INSERT})',
+        )
+        parser.add_argument(
+            '--seed',
+            type=int,
+            default=0,
+            help='가상 데이터 난수 시드 (기본 0)',
+        )
+        parser.add_argument(
+            '--save',
+            metavar='PATH',
+            help='결과를 기준값(JSON)으로 저장할 경로',
+        )
+        parser.add_argument(
+            '--compare',
+            metavar='PATH',
+            help='비교할 기준값(JSON) 경로',
+        )
+
+    def handle(self, *args, **options):
+        baseline = None
+        if options['compare']:
+            try:
+                with open(options['compare'], encoding='utf-8') as f:
+                    baseline = json.load(f)
+            except (OSError, ValueError) as e:
+                raise CommandError(f'기준값 파일을 읽을 수 없습니다: {e}')
+
+        self.stdout.write('테스트 DB 생성 중 (운영 DB/저장소/캐시는 사용하지 않음)')
+        setup_test_environment()
+        old_name = connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+        try:
+            with tempfile.TemporaryDirectory() as media_root, override_settings(
+                STORAGES={
+                    **settings.STORAGES,
+                    'default': {
+                        'BACKEND': 'django.core.files.storage.FileSystemStorage',
+                        'OPTIONS': {'location': media_root},
+                    },
+                    IMPORT_STORAGE: {
+                        'BACKEND': 'django.core.files.storage.FileSystemStorage',
+                        'OPTIONS': {'location': media_root},
+                    },
+                },
+                CACHES={
+                    'default': {
+                        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+                        'LOCATION': 'client-import-benchmark',
+                    },
+                },
+            ):
+                results = {}
+                for count in options['rows']:
+                    result = self.run_size(count, options['mode'], options['seed'])
+                    results[str(count)] = result
+                    self.report(count, result, (baseline or {}).get('results', {}).get(str(count)))
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+            teardown_test_environment()
+
+        if options['save']:
+            with open(options['save'], 'w', encoding='utf-8') as f:
+                json.dump({
+                    'created_at': timezone.now().isoformat(),
+                    'mode': options['mode'],
+                    'seed': options['seed'],
+                    'results': results,
+                }, f, ensure_ascii=False, indent=2)
+            self.stdout.write(f'\n기준값 저장: {options["save"]}')
+        self.stdout.write(self.style.SUCCESS('\n벤치마크 완료'))
+
+    def run_size(self, count, mode, seed):
+        """행 수 하나 측정 (갤러리를 새로 만들어 이전 측정의 고객과 섞이지 않게 함)"""
+        content = synthetic_workbook(count, seed)
+        gallery = Gallery.objects.create(
+            name=f'벤치마크 {count}', address='-', phone='-', email='benchmark@example.com'
+        )
+        user = User.objects.create_user(username=f'benchmark{gallery.pk}', password=None, gallery=gallery)
+        mappings = {}
+        for order, (header, column_type) in enumerate(TYPED_COLUMNS):
+            column = ClientColumn.objects.create(
+                gallery=gallery, header=header, accessor=header, type=column_type, order=order
+            )
+            mappings[header] = str(column.pk)
+        for header in ('이메일', '구매 작가명', '구매 작가명_1', 'column10', '메모'):
+            mappings[header] = f'new_{header}'
+
+        client = APIClient()
+        client.force_authenticate(user)
+
+        tracemalloc.start()
+        with CaptureQueriesContext(connection) as queries, contextlib.redirect_stdout(io.StringIO()):
+            started = time.perf_counter()
+            response = client.post(UPLOAD_URL, {
+                'file': SimpleUploadedFile('benchmark.xlsx', content),
+                'column_mappings': json.dumps(mappings, ensure_ascii=False),
+                'import_mode': mode,
+            }, format='multipart')
+            if response.status_code != 202:
+                tracemalloc.stop()
+                raise CommandError(f'업로드 실패 ({response.status_code}): {response.data}')
+            job = claim_next_job()
+            run_job(job)
+            elapsed = time.perf_counter() - started
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+
+        if job.status != BackgroundJob.STATUS_SUCCEEDED:
+            raise CommandError(f'가져오기 작업 실패: {job.error}')
+        return {
+            'rows': count,
+            'file_bytes': len(content),
+            'seconds': round(elapsed, 3),
+            'rows_per_sec': round(count / elapsed, 1) if elapsed else None,
+            'peak_memory_mb': round(peak / 1024 / 1024, 2),
+            'queries': len(queries),
+            'created_count': job.result.get('created_count'),
+            'updated_count': job.result.get('updated_count'),
+            'failed_count': job.result.get('failed_count'),
+        }
+
+    def report(self, count, result, baseline):
+        self.stdout.write(
+            f"\n{count:,}행: {result['seconds']}초, {result['rows_per_sec']:,}행/초, "
+            f"최대 메모리 {result['peak_memory_mb']}MB, 쿼리 {result['queries']:,}개 "
+            f"(생성 {result['created_count']}, 실패 {result['failed_count']})"
+        )
+        if not baseline:
+            return
+        for field, label in (('rows_per_sec', '행/초'), ('peak_memory_mb', '최대 메모리'), ('queries', '쿼리')):
+            before, after = baseline.get(field), result[field]
+            if before:
+                self.stdout.write(f'  {label}: {before} -> {after} ({(after - before) / before:+.1%})')
@@ -0,0 +1,45 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from accounts.models import Gallery
+from clients.column_keys import KEY_MODE_COLUMN_ID, KEY_MODES, convert_gallery_data_keys
+
+
+class Command(BaseCommand):
+    help = '고객 data 저장 키 방식 전환 (컬럼 accessor 키 <-> 컬럼 ID 키)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--gallery',
+            type=int,
+            action='append',
+            default=[],
+            help='전환할 갤러리 ID (여러 번 지정 가능)',
+        )
+        parser.add_argument(
+            '--all',
+            action='store_true',
+            help='모든 갤러리 전환',
+        )
+        parser.add_argument(
+            '--mode',
+            choices=KEY_MODES,
+            default=KEY_MODE_COLUMN_ID,
+            help=f'전환할 저장 방식 (기본 {KEY_MODE_COLUMN_ID})',
+        )
+
+    def handle(self, *args, **options):
+        if not options['gallery'] and not options['all']:
+            raise CommandError('--gallery 또는 --all을 지정해주세요.')
+
+        galleries = Gallery.objects.order_by('id')
+        if options['gallery']:
+            galleries = galleries.filter(id__in=options['gallery'])
+
+        mode = options['mode']
+        total = 0
+        for gallery in galleries:
+            updated = convert_gallery_data_keys(gallery.id, mode)
+            total += updated
+            self.stdout.write(f'갤러리 {gallery.id} ({gallery.name}): {updated}명')
+
+        self.stdout.write(self.style.SUCCESS(f'\n저장 방식 {mode} 전환 완료: 고객 {total}명 변경'))
@@ -0,0 +1,143 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db.models import Count
+
+from clients.column_keys import KEY_MODE_COLUMN_ID, column_key
+from clients.filters import (
+    data_key_index_name,
+    drop_data_key_index,
+    ensure_data_key_index,
+    existing_data_key_indexes,
+    is_indexable_accessor,
+)
+from clients.models import Client, ClientColumn
+
+
+class Command(BaseCommand):
+    help = (
+        '자주 쓰는 ClientColumn accessor의 data 식 인덱스 생성 (서버사이드 필터/정렬용)\n'
+        'accessor 키 갤러리는 테이블 전체 (gallery_id, 값) 인덱스, 컬럼 ID 키 갤러리는 고객이 많은 갤러리만 '
+        '갤러리별 부분 인덱스를 만듭니다.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--min-galleries',
+            type=int,
+            default=settings.CLIENT_DATA_INDEX_MIN_GALLERIES,
+            help=(
+                '이 수 이상의 갤러리에서 사용하는 accessor만 인덱스 생성 '
+                f'(기본 {settings.CLIENT_DATA_INDEX_MIN_GALLERIES}, CLIENT_DATA_INDEX_ACCESSORS는 항상 포함)'
+            ),
+        )
+        parser.add_argument(
+            '--min-clients',
+            type=int,
+            default=settings.CLIENT_DATA_INDEX_MIN_CLIENTS,
+            help=(
+                '컬럼 ID 키 갤러리는 고객 수가 이 이상일 때만 부분 인덱스 생성 '
+                f'(기본 {settings.CLIENT_DATA_INDEX_MIN_CLIENTS})'
+            ),
+        )
+        parser.add_argument(
+            '--accessor',
+            action='append',
+            default=[],
+            help='특정 accessor만 인덱스 생성 (여러 번 지정 가능, 갤러리 수 기준 무시)',
+        )
+        parser.add_argument(
+            '--prune',
+            action='store_true',
+            help='대상이 아닌 기존 data 식 인덱스 삭제',
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='실제 생성/삭제 없이 대상 인덱스만 표시',
+        )
+
+    def handle(self, *args, **options):
+        accessors = self.hot_accessors(options)
+        targets = self.index_targets(accessors, options['min_clients'])
+        self.stdout.write(f'대상 accessor: {len(accessors)}개, 인덱스: {len(targets)}개')
+
+        created = 0
+        skipped = 0
+        wanted = set()
+        for key, gallery_id in targets:
+            label = key if gallery_id is None else f'{key} (갤러리 {gallery_id})'
+            if not is_indexable_accessor(key):
+                skipped += 1
+                self.stdout.write(self.style.WARNING(f'- 건너뜀 (인덱스 불가 문자 포함): {label!r}'))
+                continue
+
+            wanted.add(data_key_index_name(key, gallery_id))
+            if options['dry_run']:
+                self.stdout.write(f'- {data_key_index_name(key, gallery_id)}: {label}')
+                continue
+
+            index_name = ensure_data_key_index(key, gallery_id=gallery_id)
+            if index_name:
+                created += 1
+                self.stdout.write(f'- {index_name}: {label}')
+            else:
+                skipped += 1
+
+        dropped = 0
+        if options['prune']:
+            for index_name in existing_data_key_indexes():
+                if index_name in wanted:
+                    continue
+                dropped += 1
+                self.stdout.write(f'- 삭제: {index_name}')
+                if not options['dry_run']:
+                    drop_data_key_index(index_name)
+
+        if options['dry_run']:
+            self.stdout.write(self.style.WARNING('\n--dry-run 모드: 실제 변경은 수행되지 않습니다.'))
+            return
+
+        self.stdout.write(self.style.SUCCESS(
+            f'\n인덱스 확인/생성 완료: {created}개, 건너뜀: {skipped}개, 삭제: {dropped}개'
+        ))
+
+    def hot_accessors(self, options):
+        """인덱스를 만들 accessor (지정한 것, 또는 설정 목록 + 여러 갤러리가 함께 쓰는 것)"""
+        if options['accessor']:
+            return sorted(set(options['accessor']))
+        shared = (
+            ClientColumn.objects
+            .values('accessor')
+            .annotate(gallery_count=Count('gallery', distinct=True))
+            .filter(gallery_count__gte=options['min_galleries'])
+            .values_list('accessor', flat=True)
+        )
+        return sorted(set(settings.CLIENT_DATA_INDEX_ACCESSORS) | set(shared))
+
+    def index_targets(self, accessors, min_clients):
+        """
+        [(저장 키, 갤러리 ID 또는 None)]
+
+        accessor 키 갤러리에서 쓰는 accessor는 테이블 전체 인덱스 하나,
+        컬럼 ID 키 갤러리의 컬럼('#12')은 고객 수가 min_clients 이상인 갤러리에만 부분 인덱스를 만듭니다.
+        """
+        columns = ClientColumn.objects.filter(accessor__in=accessors)
+        targets = [
+            (accessor, None) for accessor in
+            columns.exclude(gallery__client_data_key_mode=KEY_MODE_COLUMN_ID)
+            .order_by('accessor').values_list('accessor', flat=True).distinct()
+        ]
+        large_galleries = (
+            Client.objects
+            .filter(gallery__client_data_key_mode=KEY_MODE_COLUMN_ID)
+            .values('gallery_id')
+            .annotate(client_count=Count('id'))
+            .filter(client_count__gte=min_clients)
+            .values('gallery_id')
+        )
+        targets += [
+            (column_key(column_id), gallery_id) for column_id, gallery_id in
+            columns.filter(gallery_id__in=large_galleries)
+            .order_by('gallery_id', 'id').values_list('id', 'gallery_id')
+        ]
+        return targets
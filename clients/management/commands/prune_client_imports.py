@@ -0,0 +1,12 @@
+from django.core.management.base import BaseCommand
+
+from clients.importer import import_upload_retention, prune_import_uploads
+
+
+class Command(BaseCommand):
+    help = '보관 기간(CLIENT_IMPORT_UPLOAD_RETENTION_HOURS)이 지난 고객 가져오기 업로드 파일 정리'
+
+    def handle(self, *args, **options):
+        deleted = prune_import_uploads()
+        hours = int(import_upload_retention().total_seconds() // 3600)
+        self.stdout.write(self.style.SUCCESS(f'업로드 파일 정리 완료: {deleted}개 (보관 기간 {hours}시간)'))
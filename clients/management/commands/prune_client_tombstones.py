@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+
+from clients.sync import prune_tombstones, tombstone_retention
+
+
+class Command(BaseCommand):
+    help = '보관 기간(CLIENT_TOMBSTONE_RETENTION_DAYS)이 지난 고객 삭제 기록 정리'
+
+    def handle(self, *args, **options):
+        deleted = prune_tombstones()
+        self.stdout.write(self.style.SUCCESS(
+            f'삭제 기록 정리 완료: {deleted}건 (보관 기간 {tombstone_retention().days}일)'
+        ))
@@ -0,0 +1,56 @@
+from django.core.management.base import BaseCommand
+
+from clients.models import Client, ClientSearchToken
+from clients.search import index_clients
+
+
+class Command(BaseCommand):
+    help = '고객 검색 인덱스(ClientSearchToken) 재생성'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--gallery',
+            type=int,
+            help='특정 갤러리 ID만 재생성',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=500,
+            help='한 번에 처리할 고객 수 (기본 500)',
+        )
+        parser.add_argument(
+            '--reset',
+            action='store_true',
+            help='기존 토큰을 모두 삭제한 뒤 재생성',
+        )
+
+    def handle(self, *args, **options):
+        clients = Client.objects.all()
+        tokens = ClientSearchToken.objects.all()
+        if options['gallery']:
+            clients = clients.filter(gallery_id=options['gallery'])
+            tokens = tokens.filter(gallery_id=options['gallery'])
+
+        if options['reset']:
+            deleted, _ = tokens.delete()
+            self.stdout.write(f'기존 토큰 삭제: {deleted}개')
+
+        total = clients.count()
+        self.stdout.write(f'대상 고객 수: {total}명')
+
+        batch_size = options['batch_size']
+        processed = 0
+        batch = []
+        for client in clients.order_by('id').iterator(chunk_size=batch_size):
+            batch.append(client)
+            if len(batch) >= batch_size:
+                index_clients(batch)
+                processed += len(batch)
+                batch = []
+                self.stdout.write(f'... {processed}/{total}')
+        if batch:
+            index_clients(batch)
+            processed += len(batch)
+
+        self.stdout.write(self.style.SUCCESS(f'\n검색 인덱스 재생성 완료: {processed}명'))
@@ -0,0 +1,26 @@
+from django.core.management.base import BaseCommand
+
+from accounts.models import Gallery
+from clients.tag_index import build_gallery_index
+
+
+class Command(BaseCommand):
+    help = '태그 소속 비트맵 인덱스(TagMembershipBitmap) 재생성'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--gallery',
+            type=int,
+            help='특정 갤러리 ID만 재생성',
+        )
+
+    def handle(self, *args, **options):
+        gallery_ids = Gallery.objects.order_by('id').values_list('id', flat=True)
+        if options['gallery']:
+            gallery_ids = gallery_ids.filter(id=options['gallery'])
+
+        for gallery_id in gallery_ids:
+            tag_count = build_gallery_index(gallery_id)
+            self.stdout.write(f'갤러리 {gallery_id}: 태그 {tag_count}개')
+
+        self.stdout.write(self.style.SUCCESS('\n태그 비트맵 재생성 완료'))
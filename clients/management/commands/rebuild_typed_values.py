@@ -0,0 +1,28 @@
+from django.core.management.base import BaseCommand
+
+from clients.models import ClientColumn
+from clients.typed_values import TYPED_COLUMN_TYPES, rebuild_typed_column
+
+
+class Command(BaseCommand):
+    help = '숫자/날짜/참거짓 컬럼의 타입 인덱스(ClientTypedValue) 재생성'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--gallery',
+            type=int,
+            help='특정 갤러리 ID만 재생성',
+        )
+
+    def handle(self, *args, **options):
+        columns = ClientColumn.objects.filter(type__in=TYPED_COLUMN_TYPES).order_by('gallery_id', 'id')
+        if options['gallery']:
+            columns = columns.filter(gallery_id=options['gallery'])
+
+        total = 0
+        for column in columns:
+            created = rebuild_typed_column(column.gallery_id, column.accessor, column.type)
+            total += created
+            self.stdout.write(f'갤러리 {column.gallery_id} / {column.header} ({column.type}): {created}건')
+
+        self.stdout.write(self.style.SUCCESS(f'\n타입 인덱스 재생성 완료: {total}건'))
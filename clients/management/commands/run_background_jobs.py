@@ -0,0 +1,85 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from clients.importer import prune_import_uploads
+from clients.jobs import claim_next_job, reclaim_stale_jobs, run_job
+
+
+class Command(BaseCommand):
+    help = '백그라운드 작업(BackgroundJob) 처리 worker'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--once',
+            action='store_true',
+            help='대기 중인 작업을 모두 처리한 뒤 종료',
+        )
+        parser.add_argument(
+            '--sleep',
+            type=float,
+            default=2.0,
+            help='대기 중인 작업이 없을 때 다시 확인하기까지 기다리는 시간(초, 기본 2)',
+        )
+        parser.add_argument(
+            '--reclaim-interval',
+            type=float,
+            default=60.0,
+            help='worker 중단으로 멈춘 실행 중 작업을 확인하는 간격(초, 기본 60, 0이면 확인하지 않음)',
+        )
+        parser.add_argument(
+            '--prune-interval',
+            type=float,
+            default=3600.0,
+            help='남은 가져오기 업로드 파일을 정리하는 간격(초, 기본 3600, 0이면 정리하지 않음)',
+        )
+
+    def handle(self, *args, **options):
+        self.stdout.write('백그라운드 작업 worker 시작')
+        last_pruned = None
+        last_reclaimed = None
+        while True:
+            close_old_connections()
+            if options['reclaim_interval'] and (
+                last_reclaimed is None or time.monotonic() - last_reclaimed >= options['reclaim_interval']
+            ):
+                last_reclaimed = time.monotonic()
+                self.reclaim_jobs()
+            job = claim_next_job()
+            if job is None:
+                if options['prune_interval'] and (
+                    last_pruned is None or time.monotonic() - last_pruned >= options['prune_interval']
+                ):
+                    last_pruned = time.monotonic()
+                    self.prune_uploads()
+                if options['once']:
+                    break
+                time.sleep(options['sleep'])
+                continue
+
+            self.stdout.write(f'실행: {job}')
+            job = run_job(job)
+            self.stdout.write(f'종료: {job} ({job.progress_done}/{job.progress_total})')
+
+        self.stdout.write(self.style.SUCCESS('\n대기 중인 작업 없음 - 종료'))
+
+    def reclaim_jobs(self):
+        """다른 worker가 중단되며 남긴 실행 중 작업 정리 (실패해도 worker는 계속 실행)"""
+        try:
+            jobs = reclaim_stale_jobs()
+        except Exception as e:
+            self.stderr.write(f'멈춘 작업 정리 실패: {e}')
+            return
+        for job in jobs:
+            self.stdout.write(f'멈춘 작업 정리: {job}')
+
+    def prune_uploads(self):
+        """작업 없이 남은 가져오기 업로드 파일 정리 (실패해도 worker는 계속 실행)"""
+        try:
+            deleted = prune_import_uploads()
+        except Exception as e:
+            self.stderr.write(f'업로드 파일 정리 실패: {e}')
+            return
+        if deleted:
+            self.stdout.write(f'남은 업로드 파일 {deleted}개 삭제')
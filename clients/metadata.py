@@ -0,0 +1,117 @@
+"""
+갤러리 메타데이터 캐시 (컬럼 정의, accessor 맵, 태그 사전)
+
+고객 목록/저장/엑셀 업로드/컬럼 목록 요청마다 ClientColumn과 Tag를 다시 읽지 않도록
+갤러리별 메타데이터를 두 단계로 캐시합니다.
+
+    프로세스 메모리  {gallery_id: (meta_version, 확인 시각, GalleryMetadata)}
+    공유 캐시       clients:gallery_meta:<gallery_id>:<meta_version>
+
+키에 GalleryDataVersion.meta_version이 들어가므로 컬럼/태그/저장 방식이 바뀌거나
+data 키 변경 작업이 등록/종료되어 버전이 오르면
+이전 캐시는 더 이상 읽히지 않습니다. 메모리 캐시는 RECHECK_SECONDS마다 버전만 다시 확인하므로
+다른 프로세스의 변경은 최대 그 시간만큼 늦게 반영되고, 같은 프로세스의 변경은 바로 반영됩니다.
+
+트랜잭션 안에서는 커밋되지 않은 버전으로 캐시를 채우지 않도록 캐시를 읽기만 합니다.
+"""
+import time
+from collections import OrderedDict
+
+from django.core.cache import cache
+from django.db import connection
+
+from accounts.models import Gallery
+
+from .data_keys import pending_renames
+from .models import ClientColumn, Tag
+from .versioning import get_meta_version
+
+RECHECK_SECONDS = 2
+CACHE_TIMEOUT = 60 * 60
+MAX_LOCAL_GALLERIES = 500
+
+_local = OrderedDict()
+
+
+class GalleryMetadata:
+    """갤러리 하나의 컬럼/태그 정보 (읽기 전용으로 사용)"""
+
+    def __init__(self, gallery_id, key_mode=None, columns=(), tags=(), renames=()):
+        self.gallery_id = gallery_id
+        self.key_mode = key_mode
+        # [{'id', 'header', 'accessor', 'type', 'order'}] (order, id 순)
+        self.columns = list(columns)
+        self.column_types = {column['accessor']: column['type'] for column in self.columns}
+        self.columns_by_id = {column['id']: column for column in self.columns}
+        # [{'id', 'name', 'color'}] (이름 순)
+        self.tags = list(tags)
+        self.tag_ids = {tag['name']: tag['id'] for tag in self.tags}
+        self.tag_names = {tag['id']: tag['name'] for tag in self.tags}
+        # 백그라운드 작업이 옮기는 중인 data 키 [(이전 키, 새 키)] (요청 순)
+        self.renames = [tuple(rename) for rename in renames]
+        self._memo = {}
+
+    def memo(self, name, factory):
+        """메타데이터에서 파생한 값을 캐시와 같은 수명으로 보관 (예: DataKeyMap)"""
+        if name not in self._memo:
+            self._memo[name] = factory(self)
+        return self._memo[name]
+
+
+EMPTY_METADATA = GalleryMetadata(None)
+
+
+def _cache_key(gallery_id, version):
+    return f'clients:gallery_meta:{gallery_id}:{version}'
+
+
+def _load(gallery_id):
+    """DB에서 읽은 (저장 방식, 컬럼 목록, 태그 목록, 진행 중인 키 변경) - 공유 캐시에 저장하는 형태"""
+    key_mode = Gallery.objects.filter(pk=gallery_id).values_list('client_data_key_mode', flat=True).first()
+    columns = list(
+        ClientColumn.objects.filter(gallery_id=gallery_id)
+        .order_by('order', 'id')
+        .values('id', 'header', 'accessor', 'type', 'order')
+    )
+    tags = list(Tag.objects.filter(gallery_id=gallery_id).order_by('name').values('id', 'name', 'color'))
+    return key_mode, columns, tags, pending_renames(gallery_id)
+
+
+def _remember(gallery_id, version, metadata):
+    _local[gallery_id] = (version, time.monotonic(), metadata)
+    _local.move_to_end(gallery_id)
+    while len(_local) > MAX_LOCAL_GALLERIES:
+        _local.popitem(last=False)
+
+
+def get_gallery_metadata(gallery_id):
+    """갤러리 메타데이터 (메모리 -> 공유 캐시 -> DB 순으로 조회)"""
+    if not gallery_id:
+        return EMPTY_METADATA
+    in_transaction = connection.in_atomic_block
+
+    entry = _local.get(gallery_id)
+    if entry and not in_transaction and time.monotonic() - entry[1] < RECHECK_SECONDS:
+        return entry[2]
+
+    version = get_meta_version(gallery_id)
+    if entry and entry[0] == version:
+        if not in_transaction:
+            _remember(gallery_id, version, entry[2])
+        return entry[2]
+
+    key = _cache_key(gallery_id, version)
+    raw = cache.get(key)
+    if raw is None:
+        raw = _load(gallery_id)
+        if not in_transaction:
+            cache.set(key, raw, CACHE_TIMEOUT)
+    metadata = GalleryMetadata(gallery_id, *raw)
+    if not in_transaction:
+        _remember(gallery_id, version, metadata)
+    return metadata
+
+
+def forget_gallery_metadata(gallery_id):
+    """이 프로세스의 메모리 캐시 삭제 (공유 캐시는 버전이 바뀌면 자연히 무시됨)"""
+    _local.pop(gallery_id, None)
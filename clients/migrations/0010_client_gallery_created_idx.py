@@ -0,0 +1,17 @@
+# Generated by Django 5.2 on 2026-10-17 10:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('clients', '0009_clientcolumn'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='client',
+            index=models.Index(fields=['gallery', 'created_at', 'id'], name='client_gallery_created_idx'),
+        ),
+    ]
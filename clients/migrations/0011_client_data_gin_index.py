@@ -0,0 +1,29 @@
+# Generated by Django 5.2 on 2026-10-17 11:03
+
+from django.db import migrations
+
+
+def create_gin_index(apps, schema_editor):
+    # JSONB 키 존재/포함 검색용 GIN 인덱스 (PostgreSQL 전용)
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute(
+        'CREATE INDEX IF NOT EXISTS client_data_gin ON clients_client USING GIN (data)'
+    )
+
+
+def drop_gin_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute('DROP INDEX IF EXISTS client_data_gin')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('clients', '0010_client_gallery_created_idx'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_gin_index, drop_gin_index),
+    ]
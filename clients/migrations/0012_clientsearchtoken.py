@@ -0,0 +1,30 @@
+# Generated by Django 5.2 on 2026-10-17 11:41
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0011_gallery_logo'),
+        ('clients', '0011_client_data_gin_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ClientSearchToken',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('token', models.CharField(max_length=16, verbose_name='토큰')),
+                ('client', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='search_tokens', to='clients.client', verbose_name='고객')),
+                ('gallery', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='+', to='accounts.gallery', verbose_name='소속 갤러리')),
+            ],
+            options={
+                'verbose_name': '고객 검색 토큰',
+                'verbose_name_plural': '고객 검색 토큰들',
+                'unique_together': {('client', 'token')},
+                'indexes': [models.Index(fields=['gallery', 'token'], name='client_search_token_idx')],
+            },
+        ),
+    ]
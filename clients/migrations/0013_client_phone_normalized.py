@@ -0,0 +1,22 @@
+# Generated by Django 5.2 on 2026-10-17 12:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('clients', '0012_clientsearchtoken'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='client',
+            name='phone_normalized',
+            field=models.CharField(blank=True, editable=False, max_length=20, null=True, verbose_name='정규화 연락처'),
+        ),
+        migrations.AddIndex(
+            model_name='client',
+            index=models.Index(fields=['gallery', 'phone_normalized'], name='client_gallery_phone_idx'),
+        ),
+    ]
@@ -0,0 +1,27 @@
+# Generated by Django 5.2 on 2026-10-17 13:02
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0011_gallery_logo'),
+        ('clients', '0013_client_phone_normalized'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='GalleryDataVersion',
+            fields=[
+                ('gallery', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='data_version', serialize=False, to='accounts.gallery', verbose_name='갤러리')),
+                ('version', models.PositiveBigIntegerField(default=0, verbose_name='데이터 버전')),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': '갤러리 데이터 버전',
+                'verbose_name_plural': '갤러리 데이터 버전들',
+            },
+        ),
+    ]
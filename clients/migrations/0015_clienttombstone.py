@@ -0,0 +1,31 @@
+# Generated by Django 5.2 on 2026-10-17 13:48
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('clients', '0014_gallerydataversion'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ClientTombstone',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('gallery_id', models.BigIntegerField(blank=True, null=True, verbose_name='소속 갤러리 ID')),
+                ('client_id', models.BigIntegerField(verbose_name='삭제된 고객 ID')),
+                ('deleted_at', models.DateTimeField(auto_now_add=True, verbose_name='삭제 시각')),
+            ],
+            options={
+                'verbose_name': '삭제된 고객',
+                'verbose_name_plural': '삭제된 고객들',
+                'indexes': [models.Index(fields=['gallery_id', 'deleted_at'], name='client_tombstone_idx')],
+            },
+        ),
+        migrations.AddIndex(
+            model_name='client',
+            index=models.Index(fields=['gallery', 'updated_at'], name='client_gallery_updated_idx'),
+        ),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 5.2 on 2026-10-17 15:20
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0011_gallery_logo'),
+        ('clients', '0015_clienttombstone'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TagMembershipBitmap',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('bitmap', models.BinaryField(default=bytes, verbose_name='비트맵')),
+                ('cardinality', models.PositiveIntegerField(default=0, verbose_name='고객 수')),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('gallery', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='accounts.gallery', verbose_name='소속 갤러리')),
+                ('tag', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='+', to='clients.tag', verbose_name='태그')),
+            ],
+            options={
+                'verbose_name': '태그 비트맵',
+                'verbose_name_plural': '태그 비트맵들',
+                'constraints': [models.UniqueConstraint(fields=('gallery', 'tag'), name='tag_bitmap_gallery_tag_uniq'), models.UniqueConstraint(condition=models.Q(('tag__isnull', True)), fields=('gallery',), name='tag_bitmap_gallery_all_uniq')],
+            },
+        ),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 5.2 on 2026-10-17 16:05
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0011_gallery_logo'),
+        ('clients', '0016_tagmembershipbitmap'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ClientTypedValue',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('accessor', models.CharField(max_length=100, verbose_name='접근자')),
+                ('num_value', models.FloatField(blank=True, null=True, verbose_name='숫자 값')),
+                ('date_value', models.DateField(blank=True, null=True, verbose_name='날짜 값')),
+                ('bool_value', models.BooleanField(blank=True, null=True, verbose_name='참/거짓 값')),
+                ('client', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='typed_values', to='clients.client', verbose_name='고객')),
+                ('gallery', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='+', to='accounts.gallery', verbose_name='소속 갤러리')),
+            ],
+            options={
+                'verbose_name': '고객 타입 값',
+                'verbose_name_plural': '고객 타입 값들',
+                'indexes': [models.Index(fields=['gallery', 'accessor', 'num_value'], name='client_typed_num_idx'), models.Index(fields=['gallery', 'accessor', 'date_value'], name='client_typed_date_idx')],
+                'unique_together': {('client', 'accessor')},
+            },
+        ),
+    ]
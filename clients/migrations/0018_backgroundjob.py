@@ -0,0 +1,42 @@
+# Generated by Django 5.2 on 2026-10-17 16:40
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0011_gallery_logo'),
+        ('clients', '0017_clienttypedvalue'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BackgroundJob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(max_length=50, verbose_name='작업 종류')),
+                ('params', models.JSONField(blank=True, default=dict, verbose_name='작업 파라미터')),
+                ('status', models.CharField(choices=[('pending', '대기'), ('running', '실행 중'), ('succeeded', '완료'), ('failed', '실패'), ('cancelled', '취소')], default='pending', max_length=20, verbose_name='상태')),
+                ('progress_total', models.PositiveIntegerField(default=0, verbose_name='전체 건수')),
+                ('progress_done', models.PositiveIntegerField(default=0, verbose_name='처리 건수')),
+                ('result', models.JSONField(blank=True, default=dict, verbose_name='결과')),
+                ('error', models.TextField(blank=True, default='', verbose_name='오류')),
+                ('cancel_requested', models.BooleanField(default=False, verbose_name='취소 요청')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('started_at', models.DateTimeField(blank=True, null=True)),
+                ('finished_at', models.DateTimeField(blank=True, null=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('created_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to=settings.AUTH_USER_MODEL, verbose_name='요청자')),
+                ('gallery', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='background_jobs', to='accounts.gallery', verbose_name='소속 갤러리')),
+            ],
+            options={
+                'verbose_name': '백그라운드 작업',
+                'verbose_name_plural': '백그라운드 작업들',
+                'indexes': [models.Index(fields=['status', 'created_at'], name='background_job_queue_idx'), models.Index(fields=['gallery', 'kind', 'created_at'], name='background_job_gallery_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2 on 2026-10-17 17:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('clients', '0018_backgroundjob'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='gallerydataversion',
+            name='meta_version',
+            field=models.PositiveBigIntegerField(default=0, verbose_name='메타데이터 버전'),
+        ),
+    ]
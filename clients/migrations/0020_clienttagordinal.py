@@ -0,0 +1,35 @@
+# Generated by Django 5.2 on 2026-10-17 18:40
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def drop_tag_bitmaps(apps, schema_editor):
+    """기존 비트맵은 고객 ID를 비트 위치로 썼으므로 삭제 (첫 검색 때 순번 기준으로 다시 생성)"""
+    apps.get_model('clients', 'TagMembershipBitmap').objects.all().delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0011_gallery_logo'),
+        ('clients', '0019_gallerydataversion_meta_version'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ClientTagOrdinal',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('client_id', models.BigIntegerField(unique=True, verbose_name='고객 ID')),
+                ('ordinal', models.PositiveIntegerField(verbose_name='순번')),
+                ('gallery', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='accounts.gallery', verbose_name='소속 갤러리')),
+            ],
+            options={
+                'verbose_name': '고객 비트맵 순번',
+                'verbose_name_plural': '고객 비트맵 순번들',
+                'constraints': [models.UniqueConstraint(fields=('gallery', 'ordinal'), name='client_tag_ordinal_uniq')],
+            },
+        ),
+        migrations.RunPython(drop_tag_bitmaps, migrations.RunPython.noop),
+    ]
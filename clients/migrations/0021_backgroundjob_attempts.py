@@ -0,0 +1,18 @@
+# Generated by Django 5.2 on 2026-10-17 19:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('clients', '0020_clienttagordinal'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='backgroundjob',
+            name='attempts',
+            field=models.PositiveSmallIntegerField(default=0, verbose_name='실행 횟수'),
+        ),
+    ]
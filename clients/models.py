@@ -1,5 +1,11 @@
+import logging
+
+from django.conf import settings
 from django.db import models
 from accounts.models import Gallery
+from .phone import normalize_client_phone
+
+logger = logging.getLogger(__name__)
 
 # Create your models here.
 
@@ -40,6 +46,8 @@ class Client(models.Model):
     # 기본 필드 (고정)
     name = models.CharField(max_length=100, blank=True, null=True, verbose_name="고객명")
     phone = models.CharField(max_length=20, blank=True, null=True, verbose_name="연락처")
+    # E.164 정규화 연락처 (phone이 비어있으면 data의 연락처 계열 키 사용, save 시 자동 계산)
+    phone_normalized = models.CharField(max_length=20, blank=True, null=True, editable=False, verbose_name="정규화 연락처")
     
     # 태그 필드 (ManyToMany 관계)
     tags = models.ManyToManyField(Tag, blank=True, verbose_name="태그")
@@ -51,26 +59,25 @@ class Client(models.Model):
     
     def save(self, *args, **kwargs):
         is_new = self.pk is None  # 새로 생성되는 객체인지 확인
+        self.phone_normalized = normalize_client_phone(self.phone, self.accessor_data())
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and {'phone', 'data'} & set(update_fields):
+            kwargs['update_fields'] = set(update_fields) | {'phone_normalized'}
         super().save(*args, **kwargs)
         
-        # 새로 생성된 객체이고 태그가 없으면 기본 태그 할당
-        if is_new and not self.tags.exists():
+        # 새로 생성된 객체는 태그가 없으므로 기본 태그 할당 (캐시된 태그 ID로 INSERT 한 번)
+        if is_new:
             try:
-                default_tag, created = Tag.objects.get_or_create(
-                    gallery=self.gallery,
-                    name='일반고객',
-                    defaults={'color': '#6B7280'}
-                )
-                self.tags.add(default_tag)
-                
-                if created:
-                    print(f"✅ '일반고객' 태그가 생성되었습니다: {default_tag}")
-                print(f"✅ {self.name}에게 기본 태그 '{default_tag.name}'가 할당되었습니다.")
-                
-            except Exception as e:
-                print(f"⚠️ 기본 태그 할당 실패: {e}")
+                from .services import assign_default_tag
+                assign_default_tag(self.gallery_id, [self.pk])
+            except Exception:
                 # 태그 할당이 실패해도 Client 생성은 계속 진행
-                pass
+                logger.exception("기본 태그 할당 실패: client_id=%s", self.pk)
+    
+    def accessor_data(self):
+        """accessor 키 기준 data (컬럼 ID 키로 저장하는 갤러리는 변환, clients.column_keys)"""
+        from .column_keys import get_data_key_map
+        return get_data_key_map(self.gallery_id).to_accessors(self.data)
     
     def __str__(self):
         return self.name or f"Client {self.id}"
@@ -78,6 +85,14 @@ class Client(models.Model):
     class Meta:
         verbose_name = "고객"
         verbose_name_plural = "고객들"
+        indexes = [
+            # 목록 키셋 페이지네이션 (gallery, created_at, id)
+            models.Index(fields=['gallery', 'created_at', 'id'], name='client_gallery_created_idx'),
+            # 연락처 조회/중복 검사/SMS 수신자 조회
+            models.Index(fields=['gallery', 'phone_normalized'], name='client_gallery_phone_idx'),
+            # 델타 동기화 (updated_at 이후 변경분 조회)
+            models.Index(fields=['gallery', 'updated_at'], name='client_gallery_updated_idx'),
+        ]
 
 
 class ClientColumn(models.Model):
@@ -102,3 +117,256 @@ class ClientColumn(models.Model):
     
     def __str__(self):
         return f"{self.header} ({self.gallery.name if self.gallery else 'No Gallery'})"
+
+
+class ClientTombstone(models.Model):
+    """
+    삭제된 고객 기록 (델타 동기화에서 삭제 ID 전달용)
+
+    갤러리 연쇄 삭제 시에도 기록이 남을 수 있도록 FK가 아닌 정수 ID로 저장합니다.
+    """
+    gallery_id = models.BigIntegerField(null=True, blank=True, verbose_name="소속 갤러리 ID")
+    client_id = models.BigIntegerField(verbose_name="삭제된 고객 ID")
+    deleted_at = models.DateTimeField(auto_now_add=True, verbose_name="삭제 시각")
+
+    class Meta:
+        verbose_name = "삭제된 고객"
+        verbose_name_plural = "삭제된 고객들"
+        indexes = [
+            models.Index(fields=['gallery_id', 'deleted_at'], name='client_tombstone_idx'),
+        ]
+
+    def __str__(self):
+        return f"Client {self.client_id} (deleted {self.deleted_at})"
+
+
+class GalleryDataVersion(models.Model):
+    """갤러리별 데이터 버전 (고객/태그/컬럼/작품 변경 시 증가, 목록 ETag 생성용)"""
+    gallery = models.OneToOneField(
+        Gallery,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='data_version',
+        verbose_name="갤러리"
+    )
+    version = models.PositiveBigIntegerField(default=0, verbose_name="데이터 버전")
+    # 컬럼/태그/저장 방식 변경 시에만 증가 (갤러리 메타데이터 캐시 키, clients.metadata)
+    meta_version = models.PositiveBigIntegerField(default=0, verbose_name="메타데이터 버전")
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = "갤러리 데이터 버전"
+        verbose_name_plural = "갤러리 데이터 버전들"
+
+    def __str__(self):
+        return f"{self.gallery_id}: v{self.version}"
+
+
+class ClientSearchToken(models.Model):
+    """고객 검색 인덱스 토큰 (한글 n-gram/초성, clients.search 참고)"""
+    gallery = models.ForeignKey(
+        Gallery,
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        related_name='+',
+        verbose_name="소속 갤러리"
+    )
+    client = models.ForeignKey(
+        Client,
+        on_delete=models.CASCADE,
+        related_name='search_tokens',
+        verbose_name="고객"
+    )
+    token = models.CharField(max_length=16, verbose_name="토큰")
+
+    class Meta:
+        verbose_name = "고객 검색 토큰"
+        verbose_name_plural = "고객 검색 토큰들"
+        unique_together = ['client', 'token']
+        indexes = [
+            models.Index(fields=['gallery', 'token'], name='client_search_token_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.token} ({self.client_id})"
+
+
+class TagMembershipBitmap(models.Model):
+    """
+    갤러리별 태그 소속 비트맵 (clients.tag_index 참고)
+
+    bit i = 갤러리 내 순번(ClientTagOrdinal) i 인 고객이 태그를 가짐.
+    tag가 NULL인 행은 갤러리의 전체 고객(NOT 연산의 기준 집합)입니다.
+    bitmap은 little-endian 바이트를 zlib으로 압축한 값입니다.
+    """
+    gallery = models.ForeignKey(
+        Gallery,
+        on_delete=models.CASCADE,
+        related_name='+',
+        verbose_name="소속 갤러리"
+    )
+    tag = models.ForeignKey(
+        Tag,
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        related_name='+',
+        verbose_name="태그"
+    )
+    bitmap = models.BinaryField(default=bytes, verbose_name="비트맵")
+    cardinality = models.PositiveIntegerField(default=0, verbose_name="고객 수")
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = "태그 비트맵"
+        verbose_name_plural = "태그 비트맵들"
+        constraints = [
+            models.UniqueConstraint(fields=['gallery', 'tag'], name='tag_bitmap_gallery_tag_uniq'),
+            models.UniqueConstraint(
+                fields=['gallery'],
+                condition=models.Q(tag__isnull=True),
+                name='tag_bitmap_gallery_all_uniq',
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.gallery_id}/{self.tag_id or 'all'}: {self.cardinality}"
+
+
+class ClientTagOrdinal(models.Model):
+    """
+    태그 비트맵에서 쓰는 고객의 갤러리 내 순번 (0부터 차례로 부여)
+
+    전역 고객 ID 대신 순번을 비트 위치로 써서 비트맵이 갤러리 고객 수만큼만 커지게 합니다.
+    삭제된 고객의 순번은 비트맵 재생성(build_gallery_index) 전까지 재사용하지 않도록 행을 남겨 두므로
+    고객 FK가 아닌 정수 ID로 저장합니다.
+    """
+    gallery = models.ForeignKey(
+        Gallery,
+        on_delete=models.CASCADE,
+        related_name='+',
+        verbose_name="소속 갤러리"
+    )
+    client_id = models.BigIntegerField(unique=True, verbose_name="고객 ID")
+    ordinal = models.PositiveIntegerField(verbose_name="순번")
+
+    class Meta:
+        verbose_name = "고객 비트맵 순번"
+        verbose_name_plural = "고객 비트맵 순번들"
+        constraints = [
+            models.UniqueConstraint(fields=['gallery', 'ordinal'], name='client_tag_ordinal_uniq'),
+        ]
+
+    def __str__(self):
+        return f"{self.gallery_id}/{self.ordinal}: {self.client_id}"
+
+
+class ClientTypedValue(models.Model):
+    """
+    타입 컬럼 값 인덱스 (clients.typed_values 참고)
+
+    number/date/boolean 컬럼의 data 값을 타입별 컬럼에 저장해 범위 필터/정렬/집계에 사용합니다.
+    고객 1명 x 컬럼 1개당 1행이며, 값이 없거나 변환할 수 없으면 행이 없습니다.
+    """
+    gallery = models.ForeignKey(
+        Gallery,
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        related_name='+',
+        verbose_name="소속 갤러리"
+    )
+    client = models.ForeignKey(
+        Client,
+        on_delete=models.CASCADE,
+        related_name='typed_values',
+        verbose_name="고객"
+    )
+    accessor = models.CharField(max_length=100, verbose_name="접근자")
+    num_value = models.FloatField(null=True, blank=True, verbose_name="숫자 값")
+    date_value = models.DateField(null=True, blank=True, verbose_name="날짜 값")
+    bool_value = models.BooleanField(null=True, blank=True, verbose_name="참/거짓 값")
+
+    class Meta:
+        verbose_name = "고객 타입 값"
+        verbose_name_plural = "고객 타입 값들"
+        unique_together = ['client', 'accessor']
+        indexes = [
+            models.Index(fields=['gallery', 'accessor', 'num_value'], name='client_typed_num_idx'),
+            models.Index(fields=['gallery', 'accessor', 'date_value'], name='client_typed_date_idx'),
+        ]
+
+    def __str__(self):
+        value = self.num_value if self.num_value is not None else self.date_value
+        if value is None:
+            value = self.bool_value
+        return f"{self.client_id}.{self.accessor}={value}"
+
+
+class BackgroundJob(models.Model):
+    """
+    요청 안에서 끝내기 어려운 대량 작업 (clients.jobs 참고)
+
+    run_background_jobs 관리 명령(worker 프로세스)이 대기 중인 작업을 하나씩 가져가 실행하고
+    progress_done / progress_total 로 진행 상황을 기록합니다. 실행 중 작업의 updated_at은 진행 기록마다
+    갱신되므로(heartbeat), 오래 갱신되지 않은 실행 중 작업은 worker가 중단된 것으로 보고 다시 처리합니다.
+    """
+    STATUS_PENDING = 'pending'
+    STATUS_RUNNING = 'running'
+    STATUS_SUCCEEDED = 'succeeded'
+    STATUS_FAILED = 'failed'
+    STATUS_CANCELLED = 'cancelled'
+    STATUS_CHOICES = [
+        (STATUS_PENDING, '대기'),
+        (STATUS_RUNNING, '실행 중'),
+        (STATUS_SUCCEEDED, '완료'),
+        (STATUS_FAILED, '실패'),
+        (STATUS_CANCELLED, '취소'),
+    ]
+    FINISHED_STATUSES = (STATUS_SUCCEEDED, STATUS_FAILED, STATUS_CANCELLED)
+
+    gallery = models.ForeignKey(
+        Gallery,
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        related_name='background_jobs',
+        verbose_name="소속 갤러리"
+    )
+    created_by = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='+',
+        verbose_name="요청자"
+    )
+    kind = models.CharField(max_length=50, verbose_name="작업 종류")
+    params = models.JSONField(default=dict, blank=True, verbose_name="작업 파라미터")
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default=STATUS_PENDING, verbose_name="상태")
+    progress_total = models.PositiveIntegerField(default=0, verbose_name="전체 건수")
+    progress_done = models.PositiveIntegerField(default=0, verbose_name="처리 건수")
+    result = models.JSONField(default=dict, blank=True, verbose_name="결과")
+    error = models.TextField(blank=True, default='', verbose_name="오류")
+    cancel_requested = models.BooleanField(default=False, verbose_name="취소 요청")
+    attempts = models.PositiveSmallIntegerField(default=0, verbose_name="실행 횟수")
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = "백그라운드 작업"
+        verbose_name_plural = "백그라운드 작업들"
+        indexes = [
+            models.Index(fields=['status', 'created_at'], name='background_job_queue_idx'),
+            models.Index(fields=['gallery', 'kind', 'created_at'], name='background_job_gallery_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.kind} #{self.pk} ({self.status})"
+
+    @property
+    def is_finished(self):
+        return self.status in self.FINISHED_STATUSES
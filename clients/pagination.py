@@ -0,0 +1,161 @@
+"""
+고객 목록 키셋(커서) 페이지네이션 및 JSON Lines 스트리밍
+"""
+import base64
+
+from django.db.models import Q
+from django.http import StreamingHttpResponse
+from django.utils.dateparse import parse_datetime
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.encoders import JSONEncoder
+from rest_framework.utils.urls import replace_query_param
+
+
+class ClientKeysetPagination(BasePagination):
+    """
+    (created_at, id) 기준 키셋 페이지네이션
+
+    OFFSET 대신 마지막으로 내려준 행의 (created_at, id) 이후부터 조회하므로
+    갤러리의 고객 수와 관계없이 페이지당 조회 비용이 일정합니다.
+    기존 프론트엔드 호환을 위해 cursor 또는 page_size 파라미터가 있을 때만 동작합니다.
+
+    sort 파라미터로 정렬이 지정된 쿼리셋은 임의 정렬키에 대한 키셋을 만들 수 없으므로
+    오프셋 커서로 대체합니다.
+    """
+    cursor_query_param = 'cursor'
+    page_size_query_param = 'page_size'
+    page_size = 100
+    max_page_size = 1000
+    ordering = ('created_at', 'id')
+    invalid_cursor_message = '잘못된 커서입니다.'
+
+    def is_requested(self, request):
+        params = request.query_params
+        return self.cursor_query_param in params or self.page_size_query_param in params
+
+    def get_page_size(self, request):
+        try:
+            size = int(request.query_params.get(self.page_size_query_param, self.page_size))
+        except (TypeError, ValueError):
+            return self.page_size
+        if size <= 0:
+            return self.page_size
+        return min(size, self.max_page_size)
+
+    def encode_cursor(self, raw):
+        return base64.urlsafe_b64encode(raw.encode('utf-8')).decode('ascii')
+
+    def decode_cursor(self, request):
+        """
+        키셋 커서는 ('k', created_at, id), 오프셋 커서는 ('o', offset) 반환
+        """
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None
+        try:
+            raw = base64.urlsafe_b64decode(encoded.encode('ascii')).decode('utf-8')
+            if raw.startswith('o|'):
+                offset = int(raw[2:])
+                if offset < 0:
+                    raise ValueError(raw)
+                return ('o', offset)
+            created_at_str, pk_str = raw.rsplit('|', 1)
+            created_at = parse_datetime(created_at_str)
+            pk = int(pk_str)
+        except (TypeError, ValueError, UnicodeError):
+            raise NotFound(self.invalid_cursor_message)
+        if created_at is None:
+            raise NotFound(self.invalid_cursor_message)
+        return ('k', created_at, pk)
+
+    def paginate_queryset(self, queryset, request, view=None):
+        if not self.is_requested(request):
+            return None
+
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        position = self.decode_cursor(request)
+
+        # 정렬이 이미 지정된 경우 (sort 파라미터) 오프셋 커서 사용
+        self.offset = None
+        if queryset.query.order_by:
+            if position is not None and position[0] != 'o':
+                raise NotFound(self.invalid_cursor_message)
+            self.offset = position[1] if position else 0
+            start = self.offset
+        else:
+            if position is not None and position[0] != 'k':
+                raise NotFound(self.invalid_cursor_message)
+            start = 0
+            queryset = queryset.order_by(*self.ordering)
+            if position is not None:
+                _, created_at, pk = position
+                queryset = queryset.filter(
+                    Q(created_at__gt=created_at) | Q(created_at=created_at, id__gt=pk)
+                )
+
+        # 한 건 더 읽어서 다음 페이지 존재 여부 판단 (COUNT 쿼리 없음)
+        results = list(queryset[start:start + self.page_size + 1])
+        self.has_next = len(results) > self.page_size
+        self.page = results[:self.page_size]
+        return self.page
+
+    def get_next_link(self):
+        if not self.has_next or not self.page:
+            return None
+        if self.offset is not None:
+            raw = f"o|{self.offset + len(self.page)}"
+        else:
+            last = self.page[-1]
+            raw = f"{last.created_at.isoformat()}|{last.pk}"
+        url = self.request.build_absolute_uri()
+        return replace_query_param(url, self.cursor_query_param, self.encode_cursor(raw))
+
+    def get_paginated_response(self, data):
+        return Response({
+            'next': self.get_next_link(),
+            'page_size': self.page_size,
+            'results': data,
+        })
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'required': ['results'],
+            'properties': {
+                'next': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'page_size': {'type': 'integer'},
+                'results': schema,
+            },
+        }
+
+
+def stream_jsonl_response(queryset, serializer_class, context=None, chunk_size=500):
+    """
+    쿼리셋을 JSON Lines(한 줄에 고객 1명)로 스트리밍
+
+    chunk_size 단위로 DB에서 읽고 직렬화한 뒤 바로 내보내므로
+    응답 전체를 메모리에 올리지 않습니다. (prefetch_related도 청크 단위로 적용)
+    """
+    def generate():
+        encoder = JSONEncoder(ensure_ascii=False)
+        chunk = []
+        for instance in queryset.iterator(chunk_size=chunk_size):
+            chunk.append(instance)
+            if len(chunk) >= chunk_size:
+                yield from _serialize_chunk(chunk, serializer_class, context, encoder)
+                chunk = []
+        if chunk:
+            yield from _serialize_chunk(chunk, serializer_class, context, encoder)
+
+    response = StreamingHttpResponse(generate(), content_type='application/x-ndjson; charset=utf-8')
+    response['X-Accel-Buffering'] = 'no'  # 프록시 버퍼링 방지
+    return response
+
+
+def _serialize_chunk(instances, serializer_class, context, encoder):
+    serializer = serializer_class(instances, many=True, context=context or {})
+    for row in serializer.data:
+        yield encoder.encode(row) + '\n'
@@ -0,0 +1,59 @@
+"""
+전화번호 정규화 (E.164)
+"""
+import re
+
+# data 필드에서 연락처를 찾을 때 확인하는 키 (우선순위 순)
+PHONE_FALLBACK_KEYS = ('연락처', '전화번호', '휴대폰', '핸드폰', 'phone')
+
+MIN_DIGITS = 8
+MAX_DIGITS = 15  # E.164 최대 자릿수
+
+_NON_DIGIT_RE = re.compile(r'\D')
+
+
+def normalize_phone(phone_number):
+    """
+    전화번호를 E.164 형식으로 변환 ('010-1234-5678' -> '+821012345678')
+
+    국내 번호(0으로 시작)는 +82로, 82로 시작하면 국가번호로 간주합니다.
+    숫자가 너무 짧거나 길면 None을 반환합니다.
+    """
+    if phone_number is None:
+        return None
+    raw = str(phone_number).strip()
+    if not raw:
+        return None
+
+    digits = _NON_DIGIT_RE.sub('', raw)
+    if raw.startswith('+'):
+        normalized = digits
+    elif digits.startswith('82'):
+        normalized = digits
+    elif digits.startswith('0'):
+        normalized = f'82{digits[1:]}'  # 010 -> 8210, 02 -> 822
+    elif digits.startswith('1') and len(digits) == 11:
+        normalized = digits  # 미국 번호 (테스트용)
+    elif len(digits) in (9, 10) and digits.startswith('1'):
+        normalized = f'82{digits}'  # 앞자리 0이 빠진 휴대폰 번호 (엑셀 숫자 셀)
+    else:
+        normalized = digits
+
+    if not MIN_DIGITS <= len(normalized) <= MAX_DIGITS:
+        return None
+    return f'+{normalized}'
+
+
+def phone_source(phone, data):
+    """phone 필드가 비어있으면 data의 연락처 계열 키에서 원본 번호를 찾음"""
+    if phone and str(phone).strip():
+        return phone
+    if data:
+        for candidate in PHONE_FALLBACK_KEYS:
+            if data.get(candidate):
+                return data[candidate]
+    return None
+
+
+def normalize_client_phone(phone, data):
+    return normalize_phone(phone_source(phone, data))
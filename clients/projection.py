@@ -0,0 +1,126 @@
+"""
+고객 목록 필드 선택 (?fields= / ?data_keys=)
+
+    ?fields=id,name,phone          응답에 포함할 기본 필드
+    ?data_keys=구매 작가명,등록일    응답에 포함할 data 키 (data 컬럼 전체 대신 키만 DB에서 추출)
+
+요청한 필드만 .only()로 읽고, data 키는 JSON 키 추출식으로 가져오므로
+응답 크기와 직렬화 비용이 요청한 컬럼 수에 비례합니다.
+"""
+from django.db.models.fields.json import KeyTransform
+from rest_framework.exceptions import ValidationError
+
+from .column_keys import ACCESSOR_KEY_MAP, get_data_key_map
+from .phone import PHONE_FALLBACK_KEYS
+from .serializers import CLIENT_FIELD_ORDER as CLIENT_FIELDS, NAME_FALLBACK_KEYS
+
+# 응답 필드 -> 모델 필드 (.only()용), tags는 prefetch로 처리
+MODEL_FIELDS = {
+    'id': 'id',
+    'gallery_id': 'gallery',
+    'name': 'name',
+    'phone': 'phone',
+    'phone_normalized': 'phone_normalized',
+    'data': 'data',
+    'created_at': 'created_at',
+    'updated_at': 'updated_at',
+}
+MAX_DATA_KEYS = 50
+
+
+def _split_param(value):
+    return [part.strip() for part in value.split(',') if part.strip()]
+
+
+class ClientProjection:
+    """요청된 필드/data 키 정보 (serializer context['projection']으로 전달)"""
+
+    def __init__(self, fields, data_keys=None, key_map=ACCESSOR_KEY_MAP):
+        self.fields = fields  # CLIENT_FIELDS 순서의 튜플
+        self.field_set = frozenset(fields)
+        self.data_keys = data_keys  # None이면 data 전체
+        self.key_map = key_map  # accessor -> 저장 키 (clients.column_keys)
+        self.aliases = {}
+
+    @classmethod
+    def from_request(cls, request):
+        """fields/data_keys 파라미터가 없으면 None (기존 전체 응답)"""
+        params = request.query_params
+        if 'fields' not in params and 'data_keys' not in params:
+            return None
+
+        if 'fields' in params:
+            requested = _split_param(params['fields'])
+            unknown = set(requested) - set(CLIENT_FIELDS)
+            if unknown:
+                raise ValidationError({'detail': f"알 수 없는 필드입니다: {', '.join(sorted(unknown))}"})
+            fields = tuple(field for field in CLIENT_FIELDS if field in requested or field == 'id')
+        else:
+            fields = CLIENT_FIELDS
+
+        data_keys = None
+        if 'data_keys' in params:
+            data_keys = list(dict.fromkeys(_split_param(params['data_keys'])))
+            if len(data_keys) > MAX_DATA_KEYS:
+                raise ValidationError({'detail': f'data_keys는 최대 {MAX_DATA_KEYS}개까지 지정할 수 있습니다.'})
+        return cls(fields, data_keys, get_data_key_map(getattr(request.user, 'gallery_id', None)))
+
+    @property
+    def loads_full_data(self):
+        """data 컬럼 전체를 읽어야 하는지 (data 전체 요청 + data_keys 미지정)"""
+        return self.data_keys is None and 'data' in self.field_set
+
+    @property
+    def merges_data(self):
+        """data 키를 최상위로 병합하는지 (data 또는 data_keys 요청 시)"""
+        return 'data' in self.field_set or self.data_keys is not None
+
+    def extracted_keys(self):
+        """DB에서 개별 추출할 data 키 (요청 키 + 이름/연락처 보완용 키)"""
+        keys = list(self.data_keys or [])
+        if 'name' in self.field_set:
+            keys.extend(NAME_FALLBACK_KEYS)
+        if 'phone' in self.field_set:
+            keys.extend(PHONE_FALLBACK_KEYS)
+        return list(dict.fromkeys(keys))
+
+    def apply(self, queryset):
+        only = [MODEL_FIELDS[field] for field in self.fields if field in MODEL_FIELDS and field != 'data']
+        if 'tags' not in self.field_set:
+            queryset = queryset.prefetch_related(None)
+        if self.loads_full_data:
+            return queryset.only(*only, 'data')
+
+        # {data 키: [별칭...]} (키 변경 작업이 진행 중이면 이전 키도 추출해 새 키 값이 없을 때 사용)
+        self.aliases = {}
+        annotations = {}
+        for i, key in enumerate(self.extracted_keys()):
+            storage_key = self.key_map.storage_key(key)
+            aliases = self.aliases[key] = []
+            for j, source_key in enumerate([storage_key, *self.key_map.fallback_keys(storage_key)]):
+                alias = f'projected_data_{i}_{j}' if j else f'projected_data_{i}'
+                aliases.append(alias)
+                annotations[alias] = KeyTransform(source_key, 'data')
+        queryset = queryset.only(*only)
+        if annotations:
+            queryset = queryset.annotate(**annotations)
+        return queryset
+
+    def extract_data(self, instance):
+        """인스턴스에서 data dict 구성 (전체 로드 시 data, 아니면 추출한 키만)"""
+        if self.loads_full_data:
+            return self.key_map.to_accessors(instance.data) or {}
+        data = {}
+        for key, aliases in self.aliases.items():
+            for alias in aliases:
+                value = getattr(instance, alias, None)
+                if value is not None:
+                    data[key] = value
+                    break
+        return data
+
+    def requested_data(self, data):
+        """응답에 노출할 data 키만 (보완용으로만 추출한 키 제외)"""
+        if self.data_keys is None:
+            return data
+        return {key: data[key] for key in self.data_keys if key in data}
@@ -0,0 +1,233 @@
+"""
+고객 검색 인덱스 (한글 n-gram + 초성)
+
+고객명, 연락처 숫자, data의 텍스트 값을 토큰으로 쪼개 ClientSearchToken에 저장하고
+검색어의 토큰을 모두 가진 고객만 후보로 골라 실제 문자열로 한 번 더 확인합니다.
+
+토큰 종류
+    u:<음절>      한글 음절 1글자 (한 글자 검색용)
+    g:<2글자>     숫자가 아닌 구간의 bigram
+    d:<4자리>     숫자 구간의 4-gram (전화번호 뒷자리 등)
+    c:<초성2개>   초성 문자열의 bigram (ㄱㅁㅅ 같은 초성 검색용)
+"""
+import logging
+import re
+import unicodedata
+
+from django.db import transaction
+from django.db.models import Count, Q
+
+from .models import Client, ClientSearchToken
+
+logger = logging.getLogger(__name__)
+
+CHOSUNG = (
+    'ㄱ', 'ㄲ', 'ㄴ', 'ㄷ', 'ㄸ', 'ㄹ', 'ㅁ', 'ㅂ', 'ㅃ', 'ㅅ',
+    'ㅆ', 'ㅇ', 'ㅈ', 'ㅉ', 'ㅊ', 'ㅋ', 'ㅌ', 'ㅍ', 'ㅎ',
+)
+CHOSUNG_SET = frozenset(CHOSUNG)
+HANGUL_BASE = 0xAC00
+HANGUL_LAST = 0xD7A3
+SYLLABLES_PER_CHOSUNG = 21 * 28
+
+DIGIT_GRAM = 4
+MAX_INDEXED_CHARS = 40  # 값 하나당 인덱싱하는 최대 글자 수 (긴 메모로 인한 토큰 폭증 방지)
+MAX_TOKEN_LENGTH = 16
+STALE_DELETE_BATCH = 500  # 낡은 토큰 DELETE 한 번에 묶는 (고객, 토큰) 쌍 수
+
+_WHITESPACE_RE = re.compile(r'\s+')
+_SEGMENT_RE = re.compile(r'\d+|\D+')
+# 연락처 형태 검색어 (compact 후: 숫자와 + - ( ) . 만)
+_PHONE_QUERY_RE = re.compile(r'\+?[\d\-().]+')
+
+
+def is_hangul_syllable(ch):
+    return HANGUL_BASE <= ord(ch) <= HANGUL_LAST
+
+
+def compact(text):
+    """NFC 정규화 + 소문자 + 공백 제거"""
+    text = unicodedata.normalize('NFC', str(text)).lower()
+    return _WHITESPACE_RE.sub('', text)
+
+
+def to_chosung(text):
+    """한글 음절의 초성만 이어붙인 문자열 ('김민수' -> 'ㄱㅁㅅ')"""
+    return ''.join(
+        CHOSUNG[(ord(ch) - HANGUL_BASE) // SYLLABLES_PER_CHOSUNG]
+        for ch in text if is_hangul_syllable(ch)
+    )
+
+
+def is_chosung_query(text):
+    return bool(text) and all(ch in CHOSUNG_SET for ch in text)
+
+
+def text_tokens(text):
+    """compact된 문자열 하나의 검색 토큰 집합"""
+    tokens = set()
+    for segment in _SEGMENT_RE.findall(text):
+        if segment.isdigit():
+            for i in range(len(segment) - DIGIT_GRAM + 1):
+                tokens.add('d:' + segment[i:i + DIGIT_GRAM])
+            continue
+        for i, ch in enumerate(segment):
+            if is_hangul_syllable(ch):
+                tokens.add('u:' + ch)
+            if i + 1 < len(segment):
+                tokens.add('g:' + segment[i:i + 2])
+    return tokens
+
+
+def chosung_tokens(chosung):
+    return {'c:' + chosung[i:i + 2] for i in range(len(chosung) - 1)}
+
+
+def searchable_values(client):
+    """검색 대상 문자열 목록 (compact 형태)"""
+    values = []
+    if client.name:
+        values.append(client.name)
+    # 입력된 형태(010...)와 E.164(+8210...) 모두로 검색되도록 둘 다 인덱싱
+    for phone in {client.phone, client.phone_normalized}:
+        if phone:
+            values.append(re.sub(r'\D', '', phone))
+    for value in (client.data or {}).values():
+        if value is None or isinstance(value, (dict, list, bool)):
+            continue
+        values.append(value)
+    return [c for c in (compact(v)[:MAX_INDEXED_CHARS] for v in values) if c]
+
+
+def client_tokens(client):
+    tokens = set()
+    for value in searchable_values(client):
+        tokens |= text_tokens(value)
+        tokens |= chosung_tokens(to_chosung(value))
+    return {token for token in tokens if len(token) <= MAX_TOKEN_LENGTH}
+
+
+def phone_query(needle):
+    """
+    연락처 형태 검색어를 인덱싱한 연락처 숫자 형태로 변환 (해당하지 않으면 None)
+
+    '1234-0005' -> '12340005', '+82 10-1234-0005' -> '01012340005'
+    """
+    if not _PHONE_QUERY_RE.fullmatch(needle):
+        return None
+    digits = re.sub(r'\D', '', needle)
+    if len(digits) < DIGIT_GRAM:
+        return None
+    # 국가번호로 시작하는 번호는 국내 형태로 (짧은 숫자는 뒷자리일 수 있으므로 + 또는 전체 번호 길이일 때만)
+    if digits.startswith('82') and (needle.startswith('+') or len(digits) >= 11):
+        digits = '0' + digits[2:]
+    return digits if digits != needle else None
+
+
+def query_tokens(query):
+    """검색어 토큰. 초성만으로 된 검색어는 초성 토큰 사용"""
+    if is_chosung_query(query):
+        return chosung_tokens(query)
+    return text_tokens(query)
+
+
+def index_clients(clients):
+    """
+    고객들의 검색 토큰을 증분 갱신 (기존 토큰과 비교해 추가/삭제분만 반영)
+
+    bulk_create처럼 save 시그널을 거치지 않는 경로에서도 호출합니다.
+    """
+    clients = [client for client in clients if client.pk]
+    if not clients:
+        return
+
+    wanted = {client.pk: client_tokens(client) for client in clients}
+    existing = {pk: set() for pk in wanted}
+    for client_id, token in ClientSearchToken.objects.filter(
+        client_id__in=list(wanted)
+    ).values_list('client_id', 'token'):
+        existing[client_id].add(token)
+
+    to_create = []
+    stale = []
+    gallery_ids = {client.pk: client.gallery_id for client in clients}
+    for client_id, tokens in wanted.items():
+        for token in tokens - existing[client_id]:
+            to_create.append(ClientSearchToken(
+                gallery_id=gallery_ids[client_id],
+                client_id=client_id,
+                token=token,
+            ))
+        stale.extend((client_id, token) for token in existing[client_id] - tokens)
+
+    with transaction.atomic():
+        # 낡은 토큰은 (고객, 토큰) 쌍을 묶어 DELETE 한 번으로 (쌍이 많으면 STALE_DELETE_BATCH 단위)
+        for start in range(0, len(stale), STALE_DELETE_BATCH):
+            by_client = {}
+            for client_id, token in stale[start:start + STALE_DELETE_BATCH]:
+                by_client.setdefault(client_id, []).append(token)
+            condition = Q()
+            for client_id, tokens in by_client.items():
+                condition |= Q(client_id=client_id, token__in=tokens)
+            ClientSearchToken.objects.filter(condition).delete()
+        if to_create:
+            ClientSearchToken.objects.bulk_create(to_create, batch_size=1000, ignore_conflicts=True)
+
+
+def index_client(client):
+    index_clients([client])
+
+
+def search_clients(gallery_id, query, mode='substring', limit=50):
+    """
+    갤러리 내 고객 검색
+
+    mode: 'substring'(부분 일치) 또는 'prefix'(값의 시작 일치)
+    연락처 형태 검색어('1234-0005', '+82 10-...')는 숫자만 남기고 82 국가번호를 0으로 바꿔서도 찾습니다.
+    반환값: 고객 리스트 (id 순), 검색어에서 토큰을 만들 수 없으면 None
+    """
+    needle = compact(query)
+    # 연락처 형태면 입력 그대로(날짜 등 data 값)와 연락처 숫자 형태 중 하나라도 일치하는 고객
+    needles = [needle]
+    phone_needle = phone_query(needle)
+    if phone_needle:
+        needles.append(phone_needle)
+    token_sets = [tokens for tokens in map(query_tokens, needles) if tokens]
+    if not token_sets:
+        return None
+
+    candidate_filter = Q()
+    for tokens in token_sets:
+        candidate_filter |= Q(id__in=(
+            ClientSearchToken.objects
+            .filter(gallery_id=gallery_id, token__in=tokens)
+            .values('client_id')
+            .annotate(matched=Count('token', distinct=True))
+            .filter(matched=len(tokens))
+            .values('client_id')
+        ))
+    candidates = (
+        Client.objects
+        .filter(candidate_filter, gallery_id=gallery_id)
+        .order_by('id')
+    )
+
+    # n-gram 교집합은 순서를 보장하지 않으므로 실제 문자열로 최종 확인
+    results = []
+    for client in candidates.iterator(chunk_size=200):
+        if any(_matches(client, value, mode, is_chosung_query(value)) for value in needles):
+            results.append(client)
+            if len(results) >= limit:
+                break
+    return results
+
+
+def _matches(client, needle, mode, chosung_mode):
+    for value in searchable_values(client):
+        haystack = to_chosung(value) if chosung_mode else value
+        if mode == 'prefix':
+            if haystack.startswith(needle):
+                return True
+        elif needle in haystack:
+            return True
+    return False
@@ -1,22 +1,64 @@
 from rest_framework import serializers
-from .models import Client, Tag
-from django.db import transaction
+from .column_keys import get_data_key_map
+from .models import BackgroundJob, Client, Tag
+from .phone import PHONE_FALLBACK_KEYS
+from .typed_values import coerce_data, get_column_types
+from django.db import models, transaction
+from django.db.models import prefetch_related_objects
 
 class TagSerializer(serializers.ModelSerializer):
     class Meta:
         model = Tag
         fields = ['id', 'name', 'color', 'created_at', 'updated_at']
 
+class BackgroundJobSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = BackgroundJob
+        fields = [
+            'id', 'kind', 'status', 'progress_total', 'progress_done', 'result', 'error',
+            'cancel_requested', 'created_at', 'started_at', 'finished_at',
+        ]
+
 # 태그 관련 재귀 정리 함수 제거됨 (불필요한 복잡성)
 
+# data 필드에서 기본 필드를 복원할 때 확인하는 키 (우선순위 순)
+NAME_FALLBACK_KEYS = ('고객명', 'customer_name', 'name')
+# 응답 기본 필드 순서
+CLIENT_FIELD_ORDER = (
+    'id', 'gallery_id', 'name', 'phone', 'phone_normalized',
+    'tags', 'data', 'created_at', 'updated_at',
+)
+# data 병합 시 최상위로 올리지 않는 키
+EXCLUDED_DATA_KEYS = frozenset(['name', 'phone', 'tags', '고객명', '연락처', '전화번호', '휴대폰', '핸드폰', 'customer_name'])
+
+
+class DynamicClientListSerializer(serializers.ListSerializer):
+    """
+    고객 목록 직렬화
+
+    태그는 prefetch 캐시만 사용하며, 캐시가 없으면 페이지 전체에 대해 한 번만 prefetch 합니다.
+    따라서 고객 수와 무관하게 페이지당 쿼리 수가 일정합니다. (고객 1회 + 태그 1회)
+    """
+
+    def to_representation(self, data):
+        instances = list(data.all() if isinstance(data, models.manager.BaseManager) else data)
+        projection = self.child.context.get('projection')
+        if projection is None or 'tags' in projection.field_set:
+            prefetch_related_objects(instances, 'tags')
+        tag_reps = {}
+        build_row = self.child.build_row
+        return [build_row(instance, tag_reps) for instance in instances]
+
+
 class DynamicClientSerializer(serializers.ModelSerializer):
     tags = TagSerializer(many=True, read_only=True)
     tag_ids = serializers.ListField(child=serializers.IntegerField(), write_only=True, required=False)
     
     class Meta:
         model = Client
-        fields = ['id', 'gallery_id', 'name', 'phone', 'tags', 'tag_ids', 'data', 'created_at', 'updated_at']
+        fields = ['id', 'gallery_id', 'name', 'phone', 'phone_normalized', 'tags', 'tag_ids', 'data', 'created_at', 'updated_at']
         read_only_fields = []
+        list_serializer_class = DynamicClientListSerializer
     
     @transaction.atomic
     def update(self, instance, validated_data):
@@ -71,52 +113,76 @@ class DynamicClientSerializer(serializers.ModelSerializer):
         return instance
 
     def to_representation(self, instance):
-        print(f"DynamicClientSerializer.to_representation called")
-        print(f"   - instance.id: {instance.id}")
-        print(f"   - instance.name: {instance.name}")
-        print(f"   - instance.gallery_id: {getattr(instance, 'gallery_id', None)}")
-        print(f"   - instance.tags.count(): {instance.tags.count()}")
-        print(f"   - instance.tags.all(): {[tag.name for tag in instance.tags.all()]}")
-        
-        # 태그를 다시 한번 확인
-        tags_check = instance.tags.all()
-        print(f"   - 태그 재확인: {[(tag.id, tag.name, tag.gallery_id) for tag in tags_check]}")
-        
-        rep = super().to_representation(instance)
-        print(f"   - basic rep tags: {rep.get('tags', 'NO_TAGS_KEY')}")
-        print(f"   - rep keys: {list(rep.keys())}")
-        
+        return self.build_row(instance, {})
+
+    def build_row(self, instance, tag_reps):
+        """
+        고객 1명을 응답 dict로 변환 (쿼리 없이 prefetch 캐시만 사용)
+
+        tag_reps: {tag_id: 직렬화된 태그} - 목록 직렬화 시 같은 태그를 한 번만 직렬화하도록 공유
+        context['projection']이 있으면 요청된 필드/data 키만 포함 (clients.projection 참고)
+        """
+        projection = self.context.get('projection')
+        if projection is None:
+            field_names = CLIENT_FIELD_ORDER
+            data = self.data_key_map(instance.gallery_id).to_accessors(instance.data) or {}
+            exposed_data = data
+        else:
+            field_names = projection.fields
+            data = projection.extract_data(instance)
+            exposed_data = projection.requested_data(data) if projection.merges_data else {}
+
+        fields = self.fields
+        rep = {}
+        for field_name in field_names:
+            if field_name == 'tags':
+                rep['tags'] = self.build_tags(instance, tag_reps)
+            elif field_name == 'data':
+                rep['data'] = exposed_data
+            elif field_name in ('created_at', 'updated_at'):
+                value = getattr(instance, field_name)
+                rep[field_name] = fields[field_name].to_representation(value) if value else None
+            elif field_name == 'id':
+                rep['id'] = instance.pk
+            else:
+                rep[field_name] = getattr(instance, field_name)
+        if not data:
+            return rep
+
         # 기본 필드가 비어있으면 data 필드에서 찾아서 채우기
-        if instance.data:
-            # name 필드가 비어있으면 data에서 찾기
-            if not rep.get('name') and instance.data:
-                name_candidates = ['고객명', 'customer_name', 'name']
-                for candidate in name_candidates:
-                    if candidate in instance.data and instance.data[candidate]:
-                        rep['name'] = str(instance.data[candidate]).strip()
-                        print(f"   - name 필드를 data에서 복원: {rep['name']} (from {candidate})")
-                        break
-            
-            # phone 필드가 비어있으면 data에서 찾기
-            if not rep.get('phone') and instance.data:
-                phone_candidates = ['연락처', '전화번호', '휴대폰', '핸드폰', 'phone']
-                for candidate in phone_candidates:
-                    if candidate in instance.data and instance.data[candidate]:
-                        rep['phone'] = str(instance.data[candidate]).strip()
-                        print(f"   - phone 필드를 data에서 복원: {rep['phone']} (from {candidate})")
-                        break
-        
+        if 'name' in rep and not rep['name']:
+            for candidate in NAME_FALLBACK_KEYS:
+                if data.get(candidate):
+                    rep['name'] = str(data[candidate]).strip()
+                    break
+        if 'phone' in rep and not rep['phone']:
+            for candidate in PHONE_FALLBACK_KEYS:
+                if data.get(candidate):
+                    rep['phone'] = str(data[candidate]).strip()
+                    break
+
         # data 필드의 내용을 최상위로 병합 (기본 필드는 덮어쓰지 않음)
-        if instance.data:
-            for key, value in instance.data.items():
-                # 기본 필드들과 이미 복원된 필드들은 제외하고 병합
-                excluded_fields = ['name', 'phone', 'tags', '고객명', '연락처', '전화번호', '휴대폰', '핸드폰', 'customer_name']
-                if key not in excluded_fields:
-                    rep[key] = value
-        
-        print(f"   - 최종 rep: {rep}")
+        for key, value in exposed_data.items():
+            if key not in EXCLUDED_DATA_KEYS:
+                rep[key] = value
         return rep
 
+    def data_key_map(self, gallery_id):
+        """갤러리 data 키 변환표 (목록 직렬화 중에는 한 번만 조회)"""
+        key_maps = self.__dict__.setdefault('_data_key_maps', {})
+        if gallery_id not in key_maps:
+            key_maps[gallery_id] = get_data_key_map(gallery_id)
+        return key_maps[gallery_id]
+
+    def build_tags(self, instance, tag_reps):
+        tags = []
+        for tag in instance.tags.all():
+            tag_rep = tag_reps.get(tag.pk)
+            if tag_rep is None:
+                tag_rep = tag_reps[tag.pk] = TagSerializer(tag).data
+            tags.append(tag_rep)
+        return tags
+
     def to_internal_value(self, data):
         # AI 매핑 시스템으로 이미 올바른 구조로 전송되므로 간단히 처리하되, 갤러리 주입
         validated_data = {
@@ -139,6 +205,11 @@ class DynamicClientSerializer(serializers.ModelSerializer):
         if gallery_id is not None:
             ret['gallery_id'] = gallery_id  # gallery_id 필드로 일관되게 할당
             print(f"[SERIALIZER DEBUG] Setting gallery_id to: {gallery_id}")
+            # 숫자/날짜/참거짓 컬럼 값은 타입에 맞게 변환해 저장
+            # 컬럼 ID 키로 저장하는 갤러리는 저장 키로 변환 (clients.column_keys)
+            if ret.get('data'):
+                ret['data'] = coerce_data(ret['data'], get_column_types(gallery_id))
+                ret['data'] = get_data_key_map(gallery_id).to_storage(ret['data'])
         else:
             print(f"❌ [SERIALIZER ERROR] 갤러리 정보 없음 - 사용자: {getattr(request, 'user', 'Unknown')}")
             from rest_framework.exceptions import ValidationError
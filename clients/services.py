@@ -0,0 +1,379 @@
+"""
+고객 대량 쓰기 서비스
+
+그리드에서 여러 행을 한 번에 수정할 때 행마다 PATCH를 보내는 대신
+생성/수정/삭제를 한 요청으로 받아 bulk_create / bulk_update / 연결 테이블 일괄 처리로 반영합니다.
+여러 고객의 태그 추가/제거/교체는 고객 수와 무관하게 연결 테이블에 대한 SQL 몇 문장으로 처리합니다.
+
+bulk 경로는 save()와 시그널을 거치지 않으므로 phone_normalized, updated_at,
+검색 인덱스, 삭제 기록, 갤러리 버전을 여기서 직접 처리합니다.
+"""
+from django.db import connection, transaction
+from django.db.models.constants import OnConflict
+from django.utils import timezone
+
+from .column_keys import get_data_key_map
+from .default_tag import get_default_tag_id
+from .models import Client, Tag
+from .phone import normalize_client_phone
+from .search import index_clients
+from .signals import bulk_client_delete
+from .sync import record_tombstones
+from .tag_index import apply_link_changes, mark_clients, refresh_tag_bitmaps
+from .typed_values import coerce_data, get_column_types, sync_typed_values
+from .versioning import bump_gallery_version
+
+MAX_BULK_OPERATIONS = 5000
+BULK_BATCH_SIZE = 500
+
+NAME_MAX_LENGTH = Client._meta.get_field('name').max_length
+PHONE_MAX_LENGTH = Client._meta.get_field('phone').max_length
+
+
+class BulkOperationError(ValueError):
+    """개별 작업 검증 실패 (해당 항목만 실패 처리)"""
+
+
+class ClientBulkWriteService:
+    """
+    고객 생성/수정/삭제 일괄 처리
+
+    operations: [
+        {"op": "create", "name": ..., "phone": ..., "data": {...}, "tag_ids": [...]},
+        {"op": "update", "id": 1, "name": ..., "data": {...}, "tag_ids": [...]},
+        {"op": "delete", "id": 2},
+    ]
+
+    update는 전달된 필드만 변경합니다. (data는 전달 시 통째로 교체, tag_ids는 전달 시 교체)
+    모든 변경은 하나의 트랜잭션에서 반영되며, 결과는 요청 순서대로 항목별로 반환됩니다.
+    """
+
+    def __init__(self, gallery_id):
+        self.gallery_id = gallery_id
+        self.Through = Client.tags.through
+
+    def execute(self, operations, atomic=False):
+        """
+        반환값: (results, error_count)
+
+        atomic=True면 검증 실패 항목이 하나라도 있을 때 아무것도 반영하지 않습니다.
+        """
+        results = [None] * len(operations)
+        creates, updates, deletes = [], [], []
+        self.column_types = get_column_types(self.gallery_id)
+        self.key_map = get_data_key_map(self.gallery_id)
+        valid_tag_ids = self._valid_tag_ids(operations)
+        existing_ids = self._existing_client_ids(operations)
+        seen_ids = set()
+
+        for index, operation in enumerate(operations):
+            try:
+                kind, payload = self._validate(operation, valid_tag_ids, existing_ids, seen_ids)
+            except BulkOperationError as e:
+                results[index] = {
+                    'index': index,
+                    'op': operation.get('op') if isinstance(operation, dict) else None,
+                    'id': operation.get('id') if isinstance(operation, dict) else None,
+                    'status': 'error',
+                    'error': str(e),
+                }
+                continue
+            {'create': creates, 'update': updates, 'delete': deletes}[kind].append((index, payload))
+
+        error_count = sum(1 for result in results if result is not None)
+        if atomic and error_count:
+            for index, result in enumerate(results):
+                if result is None:
+                    results[index] = {
+                        'index': index,
+                        'op': operations[index].get('op'),
+                        'id': operations[index].get('id'),
+                        'status': 'skipped',
+                    }
+            return results, error_count
+
+        with transaction.atomic():
+            touched = []
+            touched += self._apply_creates(creates, results)
+            touched += self._apply_updates(updates, results)
+            deleted = self._apply_deletes(deletes, results)
+            if touched:
+                index_clients(touched)
+                sync_typed_values(touched, self.column_types)
+            if touched or deleted:
+                bump_gallery_version(self.gallery_id)
+        return results, error_count
+
+    # 검증
+
+    def _valid_tag_ids(self, operations):
+        requested = set()
+        for operation in operations:
+            if isinstance(operation, dict) and isinstance(operation.get('tag_ids'), list):
+                requested.update(tag_id for tag_id in operation['tag_ids'] if isinstance(tag_id, int))
+        if not requested:
+            return set()
+        return set(
+            Tag.objects.filter(gallery_id=self.gallery_id, id__in=requested).values_list('id', flat=True)
+        )
+
+    def _existing_client_ids(self, operations):
+        requested = {
+            operation.get('id') for operation in operations
+            if isinstance(operation, dict) and operation.get('op') in ('update', 'delete')
+            and isinstance(operation.get('id'), int)
+        }
+        if not requested:
+            return set()
+        return set(
+            Client.objects.filter(gallery_id=self.gallery_id, id__in=requested).values_list('id', flat=True)
+        )
+
+    def _validate(self, operation, valid_tag_ids, existing_ids, seen_ids):
+        if not isinstance(operation, dict):
+            raise BulkOperationError('작업은 객체여야 합니다.')
+        kind = operation.get('op')
+        if kind not in ('create', 'update', 'delete'):
+            raise BulkOperationError("op는 create, update, delete 중 하나여야 합니다.")
+
+        if kind != 'create':
+            client_id = operation.get('id')
+            if not isinstance(client_id, int):
+                raise BulkOperationError('id가 필요합니다.')
+            if client_id not in existing_ids:
+                raise BulkOperationError('고객을 찾을 수 없습니다.')
+            if client_id in seen_ids:
+                raise BulkOperationError('같은 고객에 대한 작업이 중복되었습니다.')
+            seen_ids.add(client_id)
+            if kind == 'delete':
+                return kind, client_id
+
+        payload = {}
+        for field, max_length in (('name', NAME_MAX_LENGTH), ('phone', PHONE_MAX_LENGTH)):
+            if field not in operation:
+                continue
+            value = operation[field]
+            if value is not None and not isinstance(value, str):
+                value = str(value)
+            if value and len(value) > max_length:
+                raise BulkOperationError(f'{field}는 {max_length}자 이하여야 합니다.')
+            payload[field] = value
+        if 'data' in operation:
+            if not isinstance(operation['data'], dict):
+                raise BulkOperationError('data는 객체여야 합니다.')
+            payload['data'] = coerce_data(operation['data'], self.column_types)
+        if 'tag_ids' in operation:
+            tag_ids = operation['tag_ids']
+            if not isinstance(tag_ids, list) or not all(isinstance(tag_id, int) for tag_id in tag_ids):
+                raise BulkOperationError('tag_ids는 정수 목록이어야 합니다.')
+            unknown = set(tag_ids) - valid_tag_ids
+            if unknown:
+                raise BulkOperationError(f"존재하지 않는 태그입니다: {', '.join(map(str, sorted(unknown)))}")
+            payload['tag_ids'] = list(dict.fromkeys(tag_ids))
+        if kind == 'update':
+            payload['id'] = operation['id']
+        return kind, payload
+
+    # 반영
+
+    def _apply_creates(self, creates, results):
+        if not creates:
+            return []
+        clients = []
+        for _, payload in creates:
+            data = payload.get('data') or {}
+            phone = payload.get('phone') or ''
+            clients.append(Client(
+                gallery_id=self.gallery_id,
+                name=payload.get('name') or '',
+                phone=phone,
+                data=self.key_map.to_storage(data),
+                phone_normalized=normalize_client_phone(phone, data),
+            ))
+        # PostgreSQL/SQLite는 bulk_create 후 pk가 채워짐
+        Client.objects.bulk_create(clients, batch_size=BULK_BATCH_SIZE)
+
+        links = []
+        untagged_ids = []
+        for (index, payload), client in zip(creates, clients):
+            tag_ids = payload.get('tag_ids')
+            if tag_ids:
+                links.extend(self.Through(client_id=client.pk, tag_id=tag_id) for tag_id in tag_ids)
+            else:
+                untagged_ids.append(client.pk)
+            results[index] = {'index': index, 'op': 'create', 'id': client.pk, 'status': 'ok'}
+        self.Through.objects.bulk_create(links, batch_size=1000, ignore_conflicts=True)
+        mark_clients(self.gallery_id, [client.pk for client in clients])
+        apply_link_changes(self.gallery_id, added=[(link.tag_id, link.client_id) for link in links])
+        # save()와 동일하게 태그 없이 생성된 고객에는 기본 태그 할당
+        assign_default_tag(self.gallery_id, untagged_ids)
+        return clients
+
+    def _apply_updates(self, updates, results):
+        if not updates:
+            return []
+        payloads = {payload['id']: payload for _, payload in updates}
+        clients = {
+            client.pk: client
+            for client in Client.objects.filter(gallery_id=self.gallery_id, id__in=list(payloads))
+        }
+
+        now = timezone.now()
+        fields = {'updated_at'}
+        replace_tags = {}
+        for client_id, payload in payloads.items():
+            client = clients[client_id]
+            for field in ('name', 'phone'):
+                if field in payload:
+                    setattr(client, field, payload[field])
+                    fields.add(field)
+            if 'data' in payload:
+                client.data = self.key_map.to_storage(payload['data'])
+                fields.add('data')
+            if 'phone' in payload or 'data' in payload:
+                client.phone_normalized = normalize_client_phone(client.phone, self.key_map.to_accessors(client.data))
+                fields.add('phone_normalized')
+            if 'tag_ids' in payload:
+                replace_tags[client_id] = payload['tag_ids']
+            client.updated_at = now
+        Client.objects.bulk_update(list(clients.values()), sorted(fields), batch_size=BULK_BATCH_SIZE)
+
+        if replace_tags:
+            # 연결 행을 통째로 교체 (삭제 1회 + 삽입 1회)
+            links = self.Through.objects.filter(client_id__in=list(replace_tags))
+            old_links = set(links.values_list('tag_id', 'client_id'))
+            new_links = {
+                (tag_id, client_id)
+                for client_id, tag_ids in replace_tags.items()
+                for tag_id in tag_ids
+            }
+            links.delete()
+            self.Through.objects.bulk_create(
+                [self.Through(client_id=client_id, tag_id=tag_id) for tag_id, client_id in new_links],
+                batch_size=1000,
+                ignore_conflicts=True,
+            )
+            apply_link_changes(self.gallery_id, added=new_links - old_links, removed=old_links - new_links)
+
+        for index, payload in updates:
+            results[index] = {'index': index, 'op': 'update', 'id': payload['id'], 'status': 'ok'}
+        return list(clients.values())
+
+    def _apply_deletes(self, deletes, results):
+        if not deletes:
+            return []
+        client_ids = [client_id for _, client_id in deletes]
+        with bulk_client_delete():
+            Client.objects.filter(gallery_id=self.gallery_id, id__in=client_ids).delete()
+        record_tombstones(self.gallery_id, client_ids)
+        mark_clients(self.gallery_id, client_ids)
+        for index, client_id in deletes:
+            results[index] = {'index': index, 'op': 'delete', 'id': client_id, 'status': 'ok'}
+        return client_ids
+
+
+def insert_tag_links(clients, tag_ids):
+    """
+    고객 queryset x 태그 연결을 INSERT ... SELECT 한 문장으로 추가 (이미 있는 연결은 무시)
+
+    존재하는 태그만 조인되므로 그 사이 삭제된 태그 ID는 조용히 건너뜁니다. 반환값: 추가된 연결 수
+    """
+    through = Client.tags.through
+    select_sql, select_params = clients.order_by().values_list('id').query.sql_with_params()
+    tag_table = connection.ops.quote_name(Tag._meta.db_table)
+    placeholders = ', '.join(['%s'] * len(tag_ids))
+    insert = connection.ops.insert_statement(on_conflict=OnConflict.IGNORE)
+    suffix = connection.ops.on_conflict_suffix_sql([], OnConflict.IGNORE, None, None)
+    sql = (
+        f"{insert} {connection.ops.quote_name(through._meta.db_table)} (client_id, tag_id) "
+        f"SELECT c.id, t.id FROM ({select_sql}) c "
+        f"CROSS JOIN {tag_table} t WHERE t.id IN ({placeholders}) {suffix}"
+    )
+    with connection.cursor() as cursor:
+        cursor.execute(sql, [*select_params, *tag_ids])
+        return max(cursor.rowcount, 0)
+
+
+def assign_default_tag(gallery_id, client_ids):
+    """
+    새로 만든(태그가 없는) 고객들에게 기본 태그 할당 - bulk_create 후에 호출하는 훅
+
+    캐시된 기본 태그 ID로 BULK_BATCH_SIZE명당 INSERT ... SELECT 한 문장만 실행합니다.
+    캐시가 낡아 태그가 없으면(추가된 행 0) 한 번 다시 조회합니다.
+    m2m_changed 시그널을 거치지 않으므로 태그 비트맵은 여기서 갱신하고, 버전 증가는 호출하는 쪽이 합니다.
+    반환값: 기본 태그가 할당된 고객 수
+    """
+    client_ids = list(client_ids)
+    assigned = 0
+    tag_id = None
+    for start in range(0, len(client_ids), BULK_BATCH_SIZE):
+        chunk = client_ids[start:start + BULK_BATCH_SIZE]
+        clients = Client.objects.filter(id__in=chunk)
+        if tag_id is None:
+            tag_id = get_default_tag_id(gallery_id)
+            added = insert_tag_links(clients, [tag_id])
+            if not added:
+                tag_id = get_default_tag_id(gallery_id, refresh=True)
+                added = insert_tag_links(clients, [tag_id])
+        else:
+            added = insert_tag_links(clients, [tag_id])
+        assigned += added
+    if assigned:
+        apply_link_changes(gallery_id, added=[(tag_id, client_id) for client_id in client_ids])
+    return assigned
+
+
+class ClientTagBulkService:
+    """
+    선택된 고객들의 태그 일괄 추가/제거/교체
+
+    고객 선택은 queryset(서브쿼리)으로 받아 연결 테이블(clients_client_tags)에
+    INSERT ... SELECT / DELETE 한 문장씩으로 반영하므로 고객 수만큼 쿼리가 늘지 않습니다.
+    m2m_changed 시그널을 거치지 않으므로 updated_at 갱신과 버전 증가를 직접 합니다.
+    """
+
+    ACTIONS = ('add', 'remove', 'replace')
+
+    def __init__(self, gallery_id):
+        self.gallery_id = gallery_id
+        self.Through = Client.tags.through
+
+    def valid_tag_ids(self, tag_ids):
+        return list(
+            Tag.objects.filter(gallery_id=self.gallery_id, id__in=tag_ids)
+            .order_by('id').values_list('id', flat=True)
+        )
+
+    def apply(self, clients, action, tag_ids):
+        """
+        clients: 대상 고객 queryset (갤러리로 한정된 것이어야 함)
+        tag_ids: 갤러리 내 태그 ID 목록 (valid_tag_ids로 확인된 값)
+        반환값: {'added': 추가된 연결 수, 'removed': 제거된 연결 수, 'client_count': 대상 고객 수}
+        """
+        if action not in self.ACTIONS:
+            raise ValueError(f'알 수 없는 작업입니다: {action}')
+        client_ids = clients.order_by().values('id')
+        added = removed = 0
+
+        with transaction.atomic():
+            # 선택 조건이 태그에 의존할 수 있으므로(태그 없는 고객 등) 연결을 바꾸기 전에 갱신
+            client_count = Client.objects.filter(id__in=client_ids).update(updated_at=timezone.now())
+            if action == 'remove':
+                removed = self._delete_links(client_ids, tag_ids)
+            elif action == 'replace':
+                removed = self._delete_links(client_ids, tag_ids, keep=True)
+            if action in ('add', 'replace') and tag_ids:
+                added = insert_tag_links(clients, tag_ids)
+            if added or removed:
+                # replace는 tag_ids 외의 태그 연결도 제거하므로 갤러리 전체 태그를 다시 계산
+                refresh_tag_bitmaps(self.gallery_id, None if action == 'replace' else tag_ids)
+                bump_gallery_version(self.gallery_id)
+        return {'added': added, 'removed': removed, 'client_count': client_count}
+
+    def _delete_links(self, client_ids, tag_ids, keep=False):
+        """keep=False면 tag_ids 연결을 제거, keep=True면 tag_ids 외의 연결을 제거"""
+        links = self.Through.objects.filter(client_id__in=client_ids)
+        links = links.exclude(tag_id__in=tag_ids) if keep else links.filter(tag_id__in=tag_ids)
+        deleted, _ = links.delete()
+        return deleted
+
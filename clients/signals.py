@@ -0,0 +1,260 @@
+"""
+고객 관련 시그널 핸들러 (ClientsConfig.ready에서 연결)
+"""
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.db import transaction
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_delete, pre_save
+from django.dispatch import receiver
+from django.utils import timezone
+
+from .column_keys import claim_column_key, release_column_key
+from .default_tag import invalidate_default_tag
+from .metadata import forget_gallery_metadata
+from .models import Client, ClientColumn, Tag
+from .search import index_client
+from .sync import record_tombstone
+from .tag_index import apply_link_changes, mark_clients, refresh_tag_bitmaps
+from .typed_values import TYPED_COLUMN_TYPES, rebuild_typed_column, rename_typed_column, sync_typed_values
+from .versioning import bump_gallery_version
+
+# 대량 작업 중에는 건별 삭제 기록/버전 증가를 건너뜀 (작업 쪽에서 한 번에 처리)
+_bulk_delete_active = ContextVar('clients_bulk_delete_active', default=False)
+
+
+@contextmanager
+def bulk_client_delete():
+    """
+    고객 대량 삭제 구간
+
+    이 구간의 고객 삭제는 post_delete 핸들러가 건별로 삭제 기록을 만들거나 버전을 올리지 않습니다.
+    호출하는 쪽에서 ClientTombstone bulk_create와 bump_gallery_version을 직접 해야 합니다.
+    """
+    token = _bulk_delete_active.set(True)
+    try:
+        yield
+    finally:
+        _bulk_delete_active.reset(token)
+
+
+@receiver(post_save, sender=Client)
+def update_client_search_index(sender, instance, raw=False, update_fields=None, **kwargs):
+    """고객 저장 시 검색 인덱스 증분 갱신"""
+    if raw:
+        return
+    # 검색 대상이 아닌 필드만 바뀐 경우 건너뜀
+    if update_fields is not None and not set(update_fields) & {'name', 'phone', 'phone_normalized', 'data'}:
+        return
+    index_client(instance)
+
+
+@receiver(post_save, sender=Client)
+@receiver(post_save, sender=Tag)
+@receiver(post_save, sender=ClientColumn)
+def bump_version_on_save(sender, instance, raw=False, **kwargs):
+    """
+    고객/태그/컬럼 변경 시 갤러리 데이터 버전 증가 (목록 ETag 무효화)
+
+    태그/컬럼 변경은 메타데이터 버전도 올려 갤러리 메타데이터 캐시를 무효화합니다. (clients.metadata)
+    """
+    if raw:
+        return
+    bump_gallery_version(instance.gallery_id, metadata=sender is not Client)
+
+
+@receiver(post_delete, sender=Client)
+@receiver(post_delete, sender=Tag)
+@receiver(post_delete, sender=ClientColumn)
+def bump_version_on_delete(sender, instance, **kwargs):
+    """
+    삭제 시 버전 증가는 커밋 후 실행
+
+    갤러리 자체가 삭제되며 연쇄 삭제되는 경우 버전 행을 다시 만들지 않도록 합니다.
+    """
+    if sender is Client and _bulk_delete_active.get():
+        return
+    gallery_id = instance.gallery_id
+    metadata = sender is not Client
+    if metadata:
+        # 커밋 전 같은 트랜잭션의 조회가 삭제 전 메타데이터를 쓰지 않도록 메모리 캐시는 바로 삭제
+        forget_gallery_metadata(gallery_id)
+    transaction.on_commit(lambda: bump_gallery_version(gallery_id, metadata=metadata))
+
+
+@receiver(post_save, sender=ClientColumn)
+def claim_data_key_on_column_create(sender, instance, created, raw=False, **kwargs):
+    """컬럼 ID 키 갤러리에 컬럼이 생기면 accessor 키 값을 컬럼 ID 키로 옮김 (커밋 후)"""
+    if raw or not created:
+        return
+    gallery_id, column_id, accessor = instance.gallery_id, instance.pk, instance.accessor
+    transaction.on_commit(lambda: claim_column_key(gallery_id, column_id, accessor))
+
+
+@receiver(post_delete, sender=ClientColumn)
+def release_data_key_on_column_delete(sender, instance, **kwargs):
+    """
+    컬럼 ID 키 갤러리에서 컬럼이 삭제되면 값을 accessor 키로 되돌림 (커밋 후)
+
+    갤러리 연쇄 삭제인 경우 커밋 후에는 갤러리가 없으므로 아무것도 하지 않습니다.
+    """
+    gallery_id, column_id, accessor = instance.gallery_id, instance.pk, instance.accessor
+    transaction.on_commit(lambda: release_column_key(gallery_id, column_id, accessor))
+
+
+@receiver(m2m_changed, sender=Client.tags.through)
+def bump_version_on_tag_link(sender, instance, action, **kwargs):
+    """고객-태그 연결 변경 시 갤러리 데이터 버전 증가"""
+    if action in ('post_add', 'post_remove', 'post_clear'):
+        bump_gallery_version(instance.gallery_id)
+
+
+@receiver(post_delete, sender=Client)
+def record_client_tombstone(sender, instance, **kwargs):
+    """고객 삭제 기록 (델타 동기화의 deleted 목록)"""
+    if _bulk_delete_active.get():
+        return
+    record_tombstone(instance)
+
+
+@receiver(m2m_changed, sender=Client.tags.through)
+def touch_clients_on_tag_link(sender, instance, action, reverse, pk_set, **kwargs):
+    """
+    고객-태그 연결 변경 시 고객 updated_at 갱신 (델타 동기화에 포함되도록)
+
+    reverse=True면 instance는 Tag, pk_set은 고객 ID 집합입니다.
+    """
+    if reverse and action == 'pre_clear':
+        instance._cleared_client_ids = list(
+            Client.objects.filter(tags=instance).values_list('id', flat=True)
+        )
+        return
+    if action not in ('post_add', 'post_remove', 'post_clear'):
+        return
+
+    if not reverse:
+        client_ids = [instance.pk]
+    elif action == 'post_clear':
+        client_ids = getattr(instance, '_cleared_client_ids', [])
+    else:
+        client_ids = list(pk_set or [])
+    if client_ids:
+        Client.objects.filter(pk__in=client_ids).update(updated_at=timezone.now())
+
+
+@receiver(post_save, sender=Tag)
+def touch_clients_on_tag_update(sender, instance, created, raw=False, **kwargs):
+    """태그 이름/색상 변경 시 해당 태그를 가진 고객 updated_at 갱신"""
+    if raw or created:
+        return
+    Client.objects.filter(tags=instance).update(updated_at=timezone.now())
+
+
+@receiver(pre_delete, sender=Tag)
+def touch_clients_on_tag_delete(sender, instance, **kwargs):
+    """태그 삭제 전 해당 태그를 가진 고객 updated_at 갱신 (연결 행은 시그널 없이 삭제됨)"""
+    Client.objects.filter(tags=instance).update(updated_at=timezone.now())
+
+
+@receiver(m2m_changed, sender=Client.tags.through)
+def update_tag_bitmaps_on_link(sender, instance, action, reverse, pk_set, **kwargs):
+    """고객-태그 연결 변경을 태그 비트맵 인덱스에 반영 (clients.tag_index)"""
+    if action == 'pre_clear' and not reverse:
+        instance._cleared_tag_ids = list(instance.tags.values_list('id', flat=True))
+        return
+    if action not in ('post_add', 'post_remove', 'post_clear'):
+        return
+
+    gallery_id = instance.gallery_id
+    if action == 'post_clear':
+        if reverse:
+            refresh_tag_bitmaps(gallery_id, [instance.pk])
+        else:
+            apply_link_changes(gallery_id, removed=[
+                (tag_id, instance.pk) for tag_id in getattr(instance, '_cleared_tag_ids', [])
+            ])
+        return
+
+    if reverse:
+        links = [(instance.pk, client_id) for client_id in pk_set or ()]
+    else:
+        links = [(tag_id, instance.pk) for tag_id in pk_set or ()]
+    if action == 'post_add':
+        apply_link_changes(gallery_id, added=links)
+    else:
+        apply_link_changes(gallery_id, removed=links)
+
+
+@receiver(post_save, sender=Client)
+def add_client_to_tag_bitmap(sender, instance, created, raw=False, **kwargs):
+    """새 고객을 전체 고객 비트맵에 추가 (NOT 연산의 기준 집합, 커밋 후)"""
+    if raw or not created:
+        return
+    mark_clients(instance.gallery_id, [instance.pk])
+
+
+@receiver(post_delete, sender=Client)
+def remove_client_from_tag_bitmap(sender, instance, **kwargs):
+    """
+    삭제된 고객을 전체 고객 비트맵에서 제거 (커밋 후)
+
+    태그 비트맵에는 남지만 검색 결과는 전체 고객 비트맵으로 마스킹됩니다.
+    """
+    if _bulk_delete_active.get():
+        return
+    mark_clients(instance.gallery_id, [instance.pk])
+
+
+@receiver(post_save, sender=Tag)
+@receiver(post_delete, sender=Tag)
+def invalidate_default_tag_cache(sender, instance, created=False, raw=False, **kwargs):
+    """태그 이름 변경/삭제 시 갤러리 기본 태그 캐시 삭제 (clients.default_tag)"""
+    if raw or created:
+        return
+    invalidate_default_tag(instance.gallery_id)
+
+
+@receiver(post_save, sender=Client)
+def update_client_typed_values(sender, instance, raw=False, update_fields=None, **kwargs):
+    """고객 data 저장 시 타입 컬럼 인덱스 갱신 (clients.typed_values)"""
+    if raw:
+        return
+    if update_fields is not None and 'data' not in update_fields:
+        return
+    sync_typed_values([instance])
+
+
+@receiver(pre_save, sender=ClientColumn)
+def remember_column_definition(sender, instance, raw=False, **kwargs):
+    """변경 전 accessor/type 기록 (post_save에서 타입 인덱스 재생성 여부 판단)"""
+    if raw or not instance.pk:
+        instance._previous_definition = None
+        return
+    instance._previous_definition = (
+        ClientColumn.objects.filter(pk=instance.pk).values_list('accessor', 'type').first()
+    )
+
+
+@receiver(post_save, sender=ClientColumn)
+def rebuild_typed_values_on_column_change(sender, instance, created, raw=False, **kwargs):
+    """컬럼 타입/accessor가 바뀌면 해당 컬럼의 타입 인덱스 재생성"""
+    if raw:
+        return
+    previous = getattr(instance, '_previous_definition', None)
+    if previous == (instance.accessor, instance.type):
+        return
+    if previous and previous[1] == instance.type:
+        # accessor만 변경 (data 키는 clients.data_keys에서 이미 옮김, 컬럼 ID 키 갤러리는 옮길 필요 없음)
+        if instance.type in TYPED_COLUMN_TYPES:
+            rename_typed_column(instance.gallery_id, previous[0], instance.accessor)
+        return
+    if previous and previous[0] != instance.accessor:
+        rebuild_typed_column(instance.gallery_id, previous[0])
+    if instance.type in TYPED_COLUMN_TYPES or (previous and previous[1] in TYPED_COLUMN_TYPES):
+        rebuild_typed_column(instance.gallery_id, instance.accessor, instance.type)
+
+
+@receiver(post_delete, sender=ClientColumn)
+def delete_typed_values_on_column_delete(sender, instance, **kwargs):
+    if instance.type in TYPED_COLUMN_TYPES:
+        rebuild_typed_column(instance.gallery_id, instance.accessor)
@@ -0,0 +1,84 @@
+"""
+고객 델타 동기화 (?since=<cursor>)
+
+커서는 서버 시각을 인코딩한 값입니다. 커서 이후 생성/수정된 고객(updated_at)과
+삭제된 고객 ID(ClientTombstone)를 돌려주고, 다음 요청에 쓸 새 커서를 함께 내려줍니다.
+"""
+import base64
+from datetime import timedelta
+
+from django.conf import settings
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from .models import ClientTombstone
+
+# 커서 시각 직전에 시작해 늦게 커밋된 트랜잭션을 놓치지 않도록 겹쳐서 조회하는 구간
+SYNC_OVERLAP = timedelta(seconds=5)
+
+
+class InvalidSyncCursor(ValueError):
+    pass
+
+
+def tombstone_retention():
+    return timedelta(days=getattr(settings, 'CLIENT_TOMBSTONE_RETENTION_DAYS', 30))
+
+
+def encode_sync_cursor(moment):
+    return base64.urlsafe_b64encode(moment.isoformat().encode('utf-8')).decode('ascii')
+
+
+def decode_sync_cursor(cursor):
+    try:
+        moment = parse_datetime(base64.urlsafe_b64decode(cursor.encode('ascii')).decode('utf-8'))
+    except (TypeError, ValueError, UnicodeError):
+        raise InvalidSyncCursor(cursor)
+    if moment is None:
+        raise InvalidSyncCursor(cursor)
+    return moment
+
+
+def new_sync_cursor():
+    """지금 시각의 커서 (조회 전에 만들어야 조회 중 변경분을 다음 동기화에서 받음)"""
+    return encode_sync_cursor(timezone.now())
+
+
+def is_cursor_expired(since):
+    """커서가 삭제 기록 보관 기간보다 오래되었으면 전체 재동기화 필요"""
+    return since < timezone.now() - tombstone_retention()
+
+
+def changed_clients(queryset, since):
+    """since 이후 생성/수정된 고객 (겹침 구간 포함이므로 중복 수신 가능 - 클라이언트는 id로 upsert)"""
+    return queryset.filter(updated_at__gt=since - SYNC_OVERLAP).order_by('updated_at', 'id')
+
+
+def deleted_client_ids(gallery_id, since):
+    return list(
+        ClientTombstone.objects
+        .filter(gallery_id=gallery_id, deleted_at__gt=since - SYNC_OVERLAP)
+        .order_by('client_id')
+        .values_list('client_id', flat=True)
+        .distinct()
+    )
+
+
+def record_tombstone(client):
+    ClientTombstone.objects.create(gallery_id=client.gallery_id, client_id=client.pk)
+
+
+def record_tombstones(gallery_id, client_ids):
+    """대량 삭제용 삭제 기록 (시그널을 거치지 않는 경로)"""
+    ClientTombstone.objects.bulk_create(
+        [ClientTombstone(gallery_id=gallery_id, client_id=client_id) for client_id in client_ids],
+        batch_size=1000,
+    )
+
+
+def prune_tombstones():
+    """보관 기간이 지난 삭제 기록 정리. 삭제 건수 반환"""
+    deleted, _ = ClientTombstone.objects.filter(
+        deleted_at__lt=timezone.now() - tombstone_retention()
+    ).delete()
+    return deleted
@@ -0,0 +1,496 @@
+"""
+태그 소속 비트맵 인덱스 및 태그 불리언 검색
+
+    VIP AND NOT 휴면
+    (VIP OR "우수 고객") AND NOT #12
+    VIP && !휴면
+
+갤러리별로 태그마다 "이 태그를 가진 고객" 비트맵을 TagMembershipBitmap에 저장하고,
+검색식은 연결 테이블을 조회하지 않고 비트맵의 AND/OR/NOT 연산으로 계산합니다.
+비트맵은 파이썬 정수로 다루며 저장 시 zlib으로 압축합니다. 비트 위치는 전역 고객 ID가 아니라
+갤러리 내 순번(ClientTagOrdinal)이므로 비트맵 크기는 갤러리 고객 수에 비례합니다.
+
+인덱스는 갤러리에서 처음 검색할 때 만들어집니다. 이후 고객 저장/삭제, 태그 연결 변경 시그널과
+대량 작업 경로(clients.services, clients.importer)는 바뀐 고객을 표시만 하고(mark_clients),
+트랜잭션 커밋 후 갤러리별로 한 번 비트맵 행을 갱신합니다.
+전체 고객 비트맵(tag=NULL)으로 마스킹하므로 삭제된 고객의 비트가 태그 비트맵에 남아도 결과는 정확합니다.
+"""
+import logging
+import re
+import zlib
+from collections import defaultdict
+
+from django.db import transaction
+from django.db.models import Max, Q
+from django.utils import timezone
+
+from .metadata import get_gallery_metadata
+from .models import Client, ClientTagOrdinal, Tag, TagMembershipBitmap
+
+logger = logging.getLogger(__name__)
+
+MAX_QUERY_TOKENS = 200
+
+
+class TagQueryError(ValueError):
+    """검색식 문법 오류 또는 알 수 없는 태그"""
+
+
+# 비트맵 변환
+
+def encode_bitmap(bits):
+    return zlib.compress(bits.to_bytes((bits.bit_length() + 7) // 8, 'little'))
+
+
+def decode_bitmap(blob):
+    if not blob:
+        return 0
+    return int.from_bytes(zlib.decompress(bytes(blob)), 'little')
+
+
+def ids_to_bitmap(ids):
+    ids = list(ids)
+    if not ids:
+        return 0
+    buffer = bytearray(max(ids) // 8 + 1)
+    for client_id in ids:
+        buffer[client_id >> 3] |= 1 << (client_id & 7)
+    return int.from_bytes(buffer, 'little')
+
+
+def bitmap_to_ids(bits):
+    """비트맵에 켜진 비트 위치 목록 (오름차순)"""
+    ids = []
+    raw = bits.to_bytes((bits.bit_length() + 7) // 8, 'little')
+    for byte_index, byte in enumerate(raw):
+        if not byte:
+            continue
+        base = byte_index << 3
+        for bit in range(8):
+            if byte >> bit & 1:
+                ids.append(base + bit)
+    return ids
+
+
+# 인덱스 생성/갱신
+
+ORDINAL_CHUNK_SIZE = 1000
+
+
+def _chunks(values, size=ORDINAL_CHUNK_SIZE):
+    values = list(values)
+    for start in range(0, len(values), size):
+        yield values[start:start + size]
+
+
+def is_index_built(gallery_id):
+    return TagMembershipBitmap.objects.filter(gallery_id=gallery_id, tag__isnull=True).exists()
+
+
+def _bitmap_row(gallery_id, tag_id, bits):
+    return TagMembershipBitmap(
+        gallery_id=gallery_id,
+        tag_id=tag_id,
+        bitmap=encode_bitmap(bits),
+        cardinality=bits.bit_count(),
+    )
+
+
+def _set_bits(row, bits):
+    row.bitmap = encode_bitmap(bits)
+    row.cardinality = bits.bit_count()
+    row.updated_at = timezone.now()
+
+
+def _lock_universe(gallery_id):
+    """전체 고객 비트맵 행 잠금 (비트맵/순번 변경을 갤러리 단위로 직렬화). 인덱스가 없으면 None"""
+    return TagMembershipBitmap.objects.select_for_update().filter(
+        gallery_id=gallery_id, tag__isnull=True,
+    ).first()
+
+
+def _assign_ordinals(gallery_id, client_ids):
+    """
+    {고객 ID: 순번} (순번이 없는 고객은 갤러리의 다음 순번부터 ID 순으로 부여)
+
+    전체 고객 비트맵 행을 잠근 상태에서 호출해야 합니다.
+    """
+    client_ids = sorted(set(client_ids))
+    ordinals = {}
+    for chunk in _chunks(client_ids):
+        ordinals.update(
+            ClientTagOrdinal.objects.filter(client_id__in=chunk).values_list('client_id', 'ordinal')
+        )
+    missing = [client_id for client_id in client_ids if client_id not in ordinals]
+    if missing:
+        last = ClientTagOrdinal.objects.filter(gallery_id=gallery_id).aggregate(last=Max('ordinal'))['last']
+        start = 0 if last is None else last + 1
+        rows = [
+            ClientTagOrdinal(gallery_id=gallery_id, client_id=client_id, ordinal=start + offset)
+            for offset, client_id in enumerate(missing)
+        ]
+        ClientTagOrdinal.objects.bulk_create(rows, batch_size=ORDINAL_CHUNK_SIZE)
+        ordinals.update((row.client_id, row.ordinal) for row in rows)
+    return ordinals
+
+
+def _gallery_links(gallery_id, ordinals, tag_ids=None):
+    """{tag_id: [순번]} (ordinals에 없는 고객의 연결은 제외)"""
+    links = Client.tags.through.objects.filter(
+        client__gallery_id=gallery_id,
+        tag__gallery_id=gallery_id,
+    )
+    if tag_ids is not None:
+        links = links.filter(tag_id__in=tag_ids)
+    members = defaultdict(list)
+    for tag_id, client_id in links.values_list('tag_id', 'client_id').iterator(chunk_size=5000):
+        if client_id in ordinals:
+            members[tag_id].append(ordinals[client_id])
+    return members
+
+
+def _gallery_ordinals(gallery_id):
+    """갤러리 전체 고객의 {고객 ID: 순번} (순번이 없는 고객은 부여)"""
+    client_ids = Client.objects.filter(gallery_id=gallery_id).values_list('id', flat=True)
+    return _assign_ordinals(gallery_id, client_ids.iterator(chunk_size=5000))
+
+
+def build_gallery_index(gallery_id):
+    """
+    갤러리의 비트맵 인덱스 전체 재생성 (연결 테이블을 한 번 훑음)
+
+    기존 고객의 순번은 유지하고, 삭제된 고객의 순번 행은 모든 비트맵을 다시 만드므로 여기서 정리합니다.
+    """
+    with transaction.atomic():
+        TagMembershipBitmap.objects.select_for_update().get_or_create(gallery_id=gallery_id, tag=None)
+        ordinals = _gallery_ordinals(gallery_id)
+        ClientTagOrdinal.objects.filter(gallery_id=gallery_id).exclude(
+            client_id__in=Client.objects.filter(gallery_id=gallery_id).values('id'),
+        ).delete()
+        rows = [_bitmap_row(gallery_id, None, ids_to_bitmap(ordinals.values()))]
+        for tag_id, members in _gallery_links(gallery_id, ordinals).items():
+            rows.append(_bitmap_row(gallery_id, tag_id, ids_to_bitmap(members)))
+
+        TagMembershipBitmap.objects.filter(gallery_id=gallery_id).delete()
+        TagMembershipBitmap.objects.bulk_create(rows, batch_size=200)
+    return len(rows) - 1
+
+
+def refresh_tag_bitmaps(gallery_id, tag_ids=None):
+    """
+    지정한 태그(없으면 갤러리 전체 태그)의 비트맵을 연결 테이블에서 다시 계산
+
+    연결 테이블을 SQL로 일괄 변경해 어떤 연결이 바뀌었는지 모르는 대량 작업 후에 호출합니다.
+    인덱스가 아직 없는 갤러리는 첫 검색 때 만들어지므로 건너뜁니다.
+    """
+    if not gallery_id:
+        return
+    with transaction.atomic():
+        if _lock_universe(gallery_id) is None:
+            return
+        if tag_ids is None:
+            tag_ids = list(Tag.objects.filter(gallery_id=gallery_id).values_list('id', flat=True))
+        members = _gallery_links(gallery_id, _gallery_ordinals(gallery_id), tag_ids)
+        TagMembershipBitmap.objects.filter(gallery_id=gallery_id, tag_id__in=tag_ids).delete()
+        TagMembershipBitmap.objects.bulk_create(
+            [_bitmap_row(gallery_id, tag_id, ids_to_bitmap(ids)) for tag_id, ids in members.items()],
+            batch_size=200,
+        )
+
+
+def _apply_pending(gallery_id, client_ids, tag_ids):
+    """
+    고객/태그 변경을 비트맵에 반영 (갤러리당 비트맵 행마다 압축 해제/압축 1회)
+
+    바뀐 내용을 따라가지 않고 표시된 고객의 현재 상태(존재 여부, 태그 연결)를 다시 읽어 비트를 맞추므로
+    롤백된 변경이나 같은 고객에 대한 여러 번의 변경도 결과가 같습니다.
+    """
+    with transaction.atomic():
+        universe = _lock_universe(gallery_id)
+        if universe is None:
+            return
+        existing = set()
+        for chunk in _chunks(client_ids):
+            existing.update(
+                Client.objects.filter(gallery_id=gallery_id, id__in=chunk).values_list('id', flat=True)
+            )
+        ordinals = _assign_ordinals(gallery_id, existing)
+        deleted = set()
+        for chunk in _chunks(set(client_ids) - existing):
+            deleted.update(
+                ClientTagOrdinal.objects.filter(gallery_id=gallery_id, client_id__in=chunk)
+                .values_list('ordinal', flat=True)
+            )
+
+        members = defaultdict(set)
+        for chunk in _chunks(existing):
+            links = Client.tags.through.objects.filter(
+                client_id__in=chunk, tag__gallery_id=gallery_id,
+            ).values_list('tag_id', 'client_id')
+            for tag_id, client_id in links:
+                members[tag_id].add(ordinals[client_id])
+
+        # 표시된 고객의 비트를 모두 지운 뒤 현재 연결만 다시 세움
+        touched = ids_to_bitmap(ordinals.values())
+        rows = {
+            row.tag_id: row
+            for row in TagMembershipBitmap.objects.filter(
+                gallery_id=gallery_id, tag_id__in=set(tag_ids) | set(members),
+            )
+        }
+        new_rows = []
+        for tag_id in set(rows) | set(members):
+            row = rows.get(tag_id)
+            if row is None:
+                row = TagMembershipBitmap(gallery_id=gallery_id, tag_id=tag_id)
+                new_rows.append(row)
+            _set_bits(row, decode_bitmap(row.bitmap) & ~touched | ids_to_bitmap(members.get(tag_id, ())))
+
+        _set_bits(universe, decode_bitmap(universe.bitmap) & ~ids_to_bitmap(deleted) | touched)
+        TagMembershipBitmap.objects.bulk_update(
+            [universe, *rows.values()], ['bitmap', 'cardinality', 'updated_at'], batch_size=200,
+        )
+        TagMembershipBitmap.objects.bulk_create(new_rows, batch_size=200)
+
+
+class _PendingBitmaps:
+    """
+    한 트랜잭션 동안 표시된 고객/태그 (커밋 후 갤러리별로 한 번에 반영)
+
+    표시할 때마다 on_commit에 flush를 등록하지만 첫 flush가 모아 둔 것을 모두 가져가므로 나머지는
+    아무것도 하지 않습니다. hooks는 만들 때의 connection.run_on_commit 목록으로, Django는 커밋/롤백
+    (세이브포인트 롤백 포함) 때 이 목록을 새로 만들므로 목록이 바뀌었으면 이 표시는 버립니다.
+    """
+
+    def __init__(self, hooks):
+        self.hooks = hooks
+        self.client_ids = defaultdict(set)
+        self.tag_ids = defaultdict(set)
+
+    def flush(self):
+        client_ids, tag_ids = self.client_ids, self.tag_ids
+        self.client_ids, self.tag_ids = defaultdict(set), defaultdict(set)
+        for gallery_id, ids in client_ids.items():
+            try:
+                _apply_pending(gallery_id, ids, tag_ids[gallery_id])
+            except Exception:
+                # 비트맵은 연결 테이블에서 다시 만들 수 있으므로 원래 작업은 실패시키지 않음
+                logger.exception('태그 비트맵 갱신 실패 (gallery=%s, rebuild_tag_bitmaps로 복구)', gallery_id)
+
+
+def mark_clients(gallery_id, client_ids, tag_ids=()):
+    """
+    고객(생성/삭제/태그 변경)과 연결이 바뀐 태그를 비트맵 갱신 대상으로 표시
+
+    비트맵은 트랜잭션 커밋 후 갤러리별로 한 번만 갱신합니다. (트랜잭션 밖이면 바로 갱신)
+    """
+    client_ids = list(client_ids)
+    if not gallery_id or not client_ids:
+        return
+    connection = transaction.get_connection()
+    pending = getattr(connection, '_pending_tag_bitmaps', None)
+    if pending is None or pending.hooks is not connection.run_on_commit:
+        # 롤백된 트랜잭션의 표시가 다음 커밋에 섞이지 않도록 트랜잭션마다 새로 모음
+        pending = connection._pending_tag_bitmaps = _PendingBitmaps(connection.run_on_commit)
+    pending.client_ids[gallery_id].update(client_ids)
+    pending.tag_ids[gallery_id].update(tag_ids)
+    transaction.on_commit(pending.flush)
+
+
+def apply_link_changes(gallery_id, added=(), removed=()):
+    """(tag_id, client_id) 연결 추가/제거분을 비트맵 갱신 대상으로 표시"""
+    links = [*added, *removed]
+    mark_clients(
+        gallery_id,
+        {client_id for _, client_id in links},
+        {tag_id for tag_id, _ in links},
+    )
+
+
+def ordinals_to_client_ids(gallery_id, ordinals):
+    """비트맵 순번 목록 -> 고객 ID 목록 (오름차순)"""
+    client_ids = []
+    for chunk in _chunks(ordinals):
+        client_ids.extend(
+            ClientTagOrdinal.objects.filter(gallery_id=gallery_id, ordinal__in=chunk)
+            .values_list('client_id', flat=True)
+        )
+    return sorted(client_ids)
+
+
+def load_bitmaps(gallery_id, tag_ids):
+    """{tag_id: 비트맵, None: 전체 고객 비트맵}. 인덱스가 없으면 먼저 생성"""
+    if not is_index_built(gallery_id):
+        build_gallery_index(gallery_id)
+    bitmaps = {tag_id: 0 for tag_id in tag_ids}
+    rows = TagMembershipBitmap.objects.filter(
+        Q(tag__isnull=True) | Q(tag_id__in=list(tag_ids)),
+        gallery_id=gallery_id,
+    ).values_list('tag_id', 'bitmap')
+    for tag_id, blob in rows:
+        bitmaps[tag_id] = decode_bitmap(blob)
+    bitmaps.setdefault(None, 0)
+    return bitmaps
+
+
+# 검색식
+
+_TOKEN_RE = re.compile(r'\s*(\(|\)|&&|&|\|\||\||!|"[^"]*"|[^\s()&|!"]+)')
+_OPERATOR_WORDS = {'and': '&', 'or': '|', 'not': '!'}
+_OPERATOR_SYMBOLS = {'&&': '&', '&': '&', '||': '|', '|': '|', '!': '!'}
+
+
+def tokenize(query):
+    tokens = []
+    position = 0
+    query = query.strip()
+    while position < len(query):
+        match = _TOKEN_RE.match(query, position)
+        if not match:
+            raise TagQueryError(f'검색식을 해석할 수 없습니다: {query[position:]}')
+        position = match.end()
+        raw = match.group(1)
+        if raw in ('(', ')'):
+            tokens.append((raw, raw))
+        elif raw in _OPERATOR_SYMBOLS:
+            tokens.append(('op', _OPERATOR_SYMBOLS[raw]))
+        elif raw.lower() in _OPERATOR_WORDS:
+            tokens.append(('op', _OPERATOR_WORDS[raw.lower()]))
+        elif raw.startswith('"'):
+            tokens.append(('name', raw[1:-1].strip()))
+        elif raw.startswith('#') and raw[1:].isdigit():
+            tokens.append(('id', int(raw[1:])))
+        else:
+            tokens.append(('name', raw))
+        if len(tokens) > MAX_QUERY_TOKENS:
+            raise TagQueryError('검색식이 너무 깁니다.')
+    if not tokens:
+        raise TagQueryError('검색식이 비어 있습니다.')
+    return tokens
+
+
+class _Parser:
+    """
+    우선순위 NOT > AND > OR 의 재귀 하강 파서
+
+    결과 노드: ('tag', ('name'|'id', 값)), ('not', 노드), ('and'|'or', 노드, 노드)
+    """
+
+    def __init__(self, tokens):
+        self.tokens = tokens
+        self.position = 0
+
+    def peek(self):
+        return self.tokens[self.position] if self.position < len(self.tokens) else (None, None)
+
+    def take(self):
+        token = self.peek()
+        self.position += 1
+        return token
+
+    def parse(self):
+        node = self.parse_or()
+        if self.position != len(self.tokens):
+            raise TagQueryError(f'예상하지 못한 위치의 토큰입니다: {self.peek()[1]}')
+        return node
+
+    def parse_or(self):
+        node = self.parse_and()
+        while self.peek() == ('op', '|'):
+            self.take()
+            node = ('or', node, self.parse_and())
+        return node
+
+    def parse_and(self):
+        node = self.parse_not()
+        while self.peek() == ('op', '&'):
+            self.take()
+            node = ('and', node, self.parse_not())
+        return node
+
+    def parse_not(self):
+        if self.peek() == ('op', '!'):
+            self.take()
+            return ('not', self.parse_not())
+        return self.parse_atom()
+
+    def parse_atom(self):
+        kind, value = self.take()
+        if kind == '(':
+            node = self.parse_or()
+            if self.take()[0] != ')':
+                raise TagQueryError('괄호가 닫히지 않았습니다.')
+            return node
+        if kind in ('name', 'id'):
+            if kind == 'name' and not value:
+                raise TagQueryError('빈 태그명이 있습니다.')
+            return ('tag', (kind, value))
+        if kind is None:
+            raise TagQueryError('검색식이 완결되지 않았습니다.')
+        raise TagQueryError(f'예상하지 못한 위치의 토큰입니다: {value}')
+
+
+def parse_tag_query(query):
+    return _Parser(tokenize(query)).parse()
+
+
+def _tag_refs(node, refs):
+    if node[0] == 'tag':
+        refs.add(node[1])
+    else:
+        for child in node[1:]:
+            _tag_refs(child, refs)
+    return refs
+
+
+def _evaluate(node, bitmaps, tag_ids, universe):
+    kind = node[0]
+    if kind == 'tag':
+        return bitmaps[tag_ids[node[1]]]
+    if kind == 'not':
+        return universe & ~_evaluate(node[1], bitmaps, tag_ids, universe)
+    left = _evaluate(node[1], bitmaps, tag_ids, universe)
+    right = _evaluate(node[2], bitmaps, tag_ids, universe)
+    return left & right if kind == 'and' else left | right
+
+
+def evaluate_tag_query(gallery_id, query):
+    """
+    태그 검색식에 해당하는 고객 비트맵
+
+    태그는 이름 또는 #ID로 지정하며, 갤러리에 없는 태그는 TagQueryError를 발생시킵니다.
+    """
+    tree = parse_tag_query(query)
+    refs = _tag_refs(tree, set())
+
+    # 태그 사전은 갤러리 메타데이터 캐시에서 찾고, 없는 태그만 DB에서 확인 (방금 만든 태그 등)
+    metadata = get_gallery_metadata(gallery_id)
+    tag_ids = {}
+    for kind, value in refs:
+        if kind == 'name':
+            tag_id = metadata.tag_ids.get(value)
+        else:
+            tag_id = value if value in metadata.tag_names else None
+        if tag_id is not None:
+            tag_ids[(kind, value)] = tag_id
+    missing = refs - set(tag_ids)
+    if missing:
+        names = {value for kind, value in missing if kind == 'name'}
+        ids = {value for kind, value in missing if kind == 'id'}
+        tags = Tag.objects.filter(
+            Q(name__in=list(names)) | Q(id__in=list(ids)),
+            gallery_id=gallery_id,
+        ).values_list('id', 'name')
+        for tag_id, name in tags:
+            if name in names:
+                tag_ids[('name', name)] = tag_id
+            if tag_id in ids:
+                tag_ids[('id', tag_id)] = tag_id
+    unknown = refs - set(tag_ids)
+    if unknown:
+        labels = sorted(value if kind == 'name' else f'#{value}' for kind, value in unknown)
+        raise TagQueryError(f"존재하지 않는 태그입니다: {', '.join(labels)}")
+
+    bitmaps = load_bitmaps(gallery_id, set(tag_ids.values()))
+    universe = bitmaps[None]
+    return _evaluate(tree, bitmaps, tag_ids, universe) & universe
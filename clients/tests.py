@@ -1,3 +1,1214 @@
-from django.test import TestCase
+import codecs
+import io
+import json
+import os
+import tempfile
+import time
+from datetime import datetime, timedelta
+from unittest import mock
 
-# Create your tests here.
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from django.core.management import call_command
+from django.core.files.storage import storages
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import connection, transaction
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from accounts.models import Gallery, User
+
+from .column_keys import KEY_MODE_COLUMN_ID, column_key, get_data_key_map
+from .data_keys import RENAME_JOB_KIND, rename_client_data_key
+from .default_tag import DEFAULT_TAG_NAME, get_default_tag_id
+from .filters import data_key_expression, data_key_index_name, existing_data_key_indexes
+from .import_preview import build_preview, file_hash, parsed_rows_path, read_parsed_rows, save_parsed_rows
+from .importer import (
+    IMPORT_MODE_INSERT,
+    IMPORT_MODE_NAME_PHONE,
+    IMPORT_MODE_PHONE,
+    IMPORT_MODES,
+    IMPORT_STORAGE,
+    NAME_MAX_LENGTH,
+    ClientImporter,
+    detect_delimiter,
+    detect_encoding,
+    enqueue_import,
+    iter_upload_rows,
+    prune_import_uploads,
+)
+from .jobs import (
+    MAX_ATTEMPTS, JobNotCancellable, claim_next_job, enqueue_job, reclaim_stale_jobs, report_progress, request_cancel,
+    run_job,
+)
+from .management.commands.benchmark_client_import import Command as BenchmarkCommand, synthetic_workbook
+from .metadata import forget_gallery_metadata, get_gallery_metadata
+from .models import BackgroundJob, Client, ClientColumn, ClientTagOrdinal, ClientTombstone, Tag
+from .phone import normalize_phone
+from .search import index_clients, search_clients
+from .sync import encode_sync_cursor, prune_tombstones
+from .versioning import bump_gallery_version
+
+
+def make_gallery(name='테스트 갤러리'):
+    # SQLite는 롤백된 ID를 다시 쓰므로 이전 테스트 갤러리의 캐시(기본 태그 ID 등)를 비움
+    cache.clear()
+    return Gallery.objects.create(name=name, address='-', phone='-', email='gallery@example.com')
+
+
+def api_client_for(gallery):
+    user = User.objects.create_user(username=f'user{gallery.pk}', password=None, gallery=gallery)
+    client = APIClient()
+    client.force_authenticate(user)
+    return client
+
+
+class DataKeyRenameTests(TestCase):
+    def setUp(self):
+        self.gallery = make_gallery()
+
+    def test_rename_korean_key_keeps_value_types(self):
+        client = Client.objects.create(
+            gallery=self.gallery, name='김민서', data={'메모': True, '수신 동의': False, '금액': 1200}
+        )
+
+        updated, job = rename_client_data_key(self.gallery.pk, '메모', '메모2')
+
+        self.assertEqual((updated, job), (1, None))
+        client.refresh_from_db()
+        self.assertEqual(client.data, {'메모2': True, '수신 동의': False, '금액': 1200})
+        self.assertIs(client.data['메모2'], True)
+
+    def test_rename_to_column_id_key(self):
+        client = Client.objects.create(gallery=self.gallery, name='이서준', data={'수신 동의': False})
+
+        updated, _ = rename_client_data_key(self.gallery.pk, '수신 동의', '#12')
+
+        self.assertEqual(updated, 1)
+        client.refresh_from_db()
+        self.assertEqual(client.data, {'#12': False})
+        self.assertIs(client.data['#12'], False)
+
+    @override_settings(CLIENT_DATA_RENAME_SYNC_LIMIT=0)
+    def test_pending_rename_reads_previous_key(self):
+        moved = Client.objects.create(gallery=self.gallery, name='박지우', data={'메모': '전시 방문', '동의': True})
+        edited = Client.objects.create(gallery=self.gallery, name='최하은', data={'메모': '이전 값'})
+
+        updated, job = rename_client_data_key(self.gallery.pk, '메모', '메모2')
+
+        self.assertIsNone(updated)
+        key_map = get_data_key_map(self.gallery.pk)
+        self.assertEqual(key_map.to_accessors(moved.data), {'메모2': '전시 방문', '동의': True})
+        # 두 키가 모두 있는 고객(작업 중 가져오기 병합 등)은 새 키 값을 유지
+        edited.data = {'메모': '이전 값', '메모2': '수정한 값'}
+        edited.save()
+        self.assertEqual(key_map.to_accessors(edited.data), {'메모2': '수정한 값'})
+
+        run_job(claim_next_job())
+
+        job.refresh_from_db()
+        self.assertEqual(job.status, BackgroundJob.STATUS_SUCCEEDED)
+        moved.refresh_from_db()
+        edited.refresh_from_db()
+        self.assertEqual(moved.data, {'메모2': '전시 방문', '동의': True})
+        self.assertEqual(edited.data, {'메모2': '수정한 값'})
+        self.assertEqual(get_data_key_map(self.gallery.pk).renamed, {})
+
+    @override_settings(CLIENT_DATA_RENAME_SYNC_LIMIT=0)
+    def test_rename_job_cannot_be_cancelled(self):
+        Client.objects.create(gallery=self.gallery, name='정유나', data={'메모': '값'})
+        _, job = rename_client_data_key(self.gallery.pk, '메모', '메모2')
+
+        with self.assertRaises(JobNotCancellable):
+            request_cancel(job)
+
+        job.refresh_from_db()
+        self.assertFalse(job.cancel_requested)
+        response = api_client_for(self.gallery).post(f'/api/jobs/{job.pk}/cancel/')
+        self.assertEqual(response.status_code, 409)
+
+    @override_settings(CLIENT_DATA_RENAME_SYNC_LIMIT=0)
+    def test_failed_rename_keeps_reading_previous_key(self):
+        client = Client.objects.create(gallery=self.gallery, name='한지호', data={'메모': '남은 값'})
+        _, job = rename_client_data_key(self.gallery.pk, '메모', '메모2')
+
+        # 일부 고객만 옮긴 채 실패한 작업
+        BackgroundJob.objects.filter(pk=job.pk).update(status=BackgroundJob.STATUS_FAILED)
+        bump_gallery_version(self.gallery.pk, metadata=True)
+
+        key_map = get_data_key_map(self.gallery.pk)
+        self.assertEqual(key_map.to_accessors(client.data), {'메모2': '남은 값'})
+
+
+class DataKeyExpressionTests(TestCase):
+    def test_matches_escaped_keys(self):
+        gallery = make_gallery()
+        for accessor in ('메모', "작가's", '달성률 50%'):
+            client = Client.objects.create(gallery=gallery, name='김도윤', data={accessor: '값'})
+            matched = (
+                Client.objects.filter(gallery=gallery)
+                .alias(value=data_key_expression(accessor))
+                .filter(value='값')
+            )
+            self.assertEqual(list(matched.values_list('id', flat=True)), [client.pk])
+
+
+class DataKeyIndexCommandTests(TestCase):
+    def run_command(self, *args):
+        call_command('ensure_client_data_indexes', *args, stdout=io.StringIO())
+        return existing_data_key_indexes()
+
+    def test_indexes_only_shared_accessors_and_large_column_id_galleries(self):
+        for name in ('갤러리1', '갤러리2'):
+            gallery = make_gallery(name)
+            ClientColumn.objects.create(gallery=gallery, header='작가', accessor='작가')
+        single = make_gallery('갤러리3')
+        ClientColumn.objects.create(gallery=single, header='메모', accessor='메모')
+
+        keyed = make_gallery('컬럼 ID 갤러리')
+        keyed.client_data_key_mode = KEY_MODE_COLUMN_ID
+        keyed.save()
+        column = ClientColumn.objects.create(gallery=keyed, header='작가', accessor='작가')
+        Client.objects.create(gallery=keyed, name='고객')
+
+        indexes = self.run_command('--min-galleries', '2', '--min-clients', '2')
+        self.assertEqual(indexes, [data_key_index_name('작가')])
+
+        indexes = self.run_command('--min-galleries', '2', '--min-clients', '1')
+        self.assertEqual(
+            sorted(indexes),
+            sorted([data_key_index_name('작가'), data_key_index_name(column_key(column.pk), keyed.pk)]),
+        )
+
+        indexes = self.run_command('--accessor', '메모', '--prune')
+        self.assertEqual(indexes, [data_key_index_name('메모')])
+
+
+class ColumnKeyTests(TestCase):
+    def test_claim_and_release_round_trip(self):
+        gallery = make_gallery()
+        gallery.client_data_key_mode = KEY_MODE_COLUMN_ID
+        gallery.save()
+        client = Client.objects.create(gallery=gallery, name='정유나', data={'수신 동의': True, '메모': '재방문'})
+
+        with self.captureOnCommitCallbacks(execute=True):
+            column = ClientColumn.objects.create(gallery=gallery, header='수신 동의', accessor='수신 동의', type='boolean')
+        client.refresh_from_db()
+        self.assertEqual(client.data, {column_key(column.pk): True, '메모': '재방문'})
+        self.assertIs(client.data[column_key(column.pk)], True)
+        self.assertEqual(client.accessor_data(), {'수신 동의': True, '메모': '재방문'})
+
+        with self.captureOnCommitCallbacks(execute=True):
+            column.delete()
+        client.refresh_from_db()
+        self.assertEqual(client.data, {'수신 동의': True, '메모': '재방문'})
+        self.assertIs(client.data['수신 동의'], True)
+
+
+class ClientListTests(TestCase):
+    def setUp(self):
+        self.gallery = make_gallery()
+        self.api = api_client_for(self.gallery)
+
+    def add_clients(self, count, tags=()):
+        start = Client.objects.filter(gallery=self.gallery).count()
+        clients = []
+        for index in range(start, start + count):
+            client = Client.objects.create(
+                gallery=self.gallery, name=f'고객{index}', phone=f'010-1000-{index:04d}', data={'메모': f'메모{index}'}
+            )
+            client.tags.add(*tags)
+            clients.append(client)
+        return clients
+
+    def list_ids(self, response):
+        return [row['id'] for row in response.data]
+
+    def test_list_query_count_does_not_grow(self):
+        first_tags = [Tag.objects.create(gallery=self.gallery, name=f'태그{i}') for i in range(2)]
+        self.add_clients(2, first_tags)
+        with CaptureQueriesContext(connection) as baseline:
+            response = self.api.get('/api/clients/')
+        self.assertEqual(len(response.data), 2)
+
+        more_tags = [Tag.objects.create(gallery=self.gallery, name=f'추가 태그{i}') for i in range(5)]
+        self.add_clients(20, first_tags + more_tags)
+        with self.assertNumQueries(len(baseline)):
+            response = self.api.get('/api/clients/')
+        self.assertEqual(len(response.data), 22)
+
+    def test_keyset_pagination_visits_every_client_once(self):
+        expected = [client.pk for client in self.add_clients(5)]
+
+        seen = []
+        url, params = '/api/clients/', {'page_size': 2}
+        while url:
+            response = self.api.get(url, params)
+            self.assertEqual(response.status_code, 200)
+            self.assertLessEqual(len(response.data['results']), 2)
+            seen.extend(row['id'] for row in response.data['results'])
+            url, params = response.data['next'], None
+        self.assertEqual(seen, expected)
+
+    def test_keyset_cursor_is_stable_under_concurrent_writes(self):
+        clients = self.add_clients(6)
+        # 같은 created_at이면 id로 순서를 정함
+        Client.objects.filter(pk__in=[client.pk for client in clients[:4]]).update(created_at=clients[0].created_at)
+
+        first = self.api.get('/api/clients/', {'page_size': 3})
+        seen = [row['id'] for row in first.data['results']]
+        # 이미 내려준 고객 삭제, 새 고객 추가 후에도 다음 페이지가 밀리거나 겹치지 않음
+        Client.objects.filter(pk=seen[0]).delete()
+        added = self.add_clients(1)[0]
+        url = first.data['next']
+        while url:
+            response = self.api.get(url)
+            seen.extend(row['id'] for row in response.data['results'])
+            url = response.data['next']
+
+        self.assertEqual(seen, [client.pk for client in clients] + [added.pk])
+
+    def test_stream_returns_json_lines(self):
+        expected = [client.pk for client in self.add_clients(3)]
+
+        response = self.api.get('/api/clients/', {'stream': '1'})
+
+        self.assertEqual(response['Content-Type'], 'application/x-ndjson; charset=utf-8')
+        lines = b''.join(response.streaming_content).decode('utf-8').splitlines()
+        self.assertEqual([json.loads(line)['id'] for line in lines], expected)
+
+    def test_invalid_cursor(self):
+        response = self.api.get('/api/clients/', {'cursor': 'not-a-cursor'})
+        self.assertEqual(response.status_code, 404)
+
+    def test_since_returns_changes_and_tombstones(self):
+        kept, changed, deleted = self.add_clients(3)
+        cursor = self.api.get('/api/clients/')['X-Sync-Cursor']
+
+        changed.name = '이름 변경'
+        changed.save()
+        deleted_id = deleted.pk
+        deleted.delete()
+
+        response = self.api.get('/api/clients/', {'since': cursor})
+        self.assertEqual(response.status_code, 200)
+        self.assertIn(changed.pk, [row['id'] for row in response.data['changed']])
+        self.assertNotIn(deleted_id, [row['id'] for row in response.data['changed']])
+        self.assertEqual(response.data['deleted'], [deleted_id])
+        self.assertTrue(response.data['cursor'])
+
+    def test_since_rejects_invalid_cursor(self):
+        response = self.api.get('/api/clients/', {'since': '잘못된 커서'})
+        self.assertEqual(response.status_code, 400)
+
+    @override_settings(CLIENT_TOMBSTONE_RETENTION_DAYS=1)
+    def test_since_expired_cursor_asks_for_full_reload(self):
+        (deleted,) = self.add_clients(1)
+        other = Client.objects.create(gallery=make_gallery('다른 갤러리'), name='다른 고객')
+        cursor = self.api.get('/api/clients/')['X-Sync-Cursor']
+        with self.captureOnCommitCallbacks(execute=True):
+            deleted_id = deleted.pk
+            deleted.delete()
+            other.delete()
+
+        # 삭제 기록은 갤러리별로만 내려줌
+        response = self.api.get('/api/clients/', {'since': cursor})
+        self.assertEqual(response.data['deleted'], [deleted_id])
+
+        old_cursor = encode_sync_cursor(timezone.now() - timedelta(days=2))
+        response = self.api.get('/api/clients/', {'since': old_cursor})
+        self.assertEqual(response.status_code, 410)
+        self.assertTrue(response.data['reset'])
+
+        ClientTombstone.objects.update(deleted_at=timezone.now() - timedelta(days=2))
+        self.assertEqual(prune_tombstones(), 2)
+
+    def test_tag_query_uses_bitmap_index(self):
+        vip = Tag.objects.create(gallery=self.gallery, name='VIP')
+        dormant = Tag.objects.create(gallery=self.gallery, name='휴면')
+        with self.captureOnCommitCallbacks(execute=True):
+            (only_vip,) = self.add_clients(1, [vip])
+            self.add_clients(1, [vip, dormant])
+            self.add_clients(1, [dormant])
+
+        response = self.api.get('/api/clients/tag-query/', {'q': 'VIP AND NOT 휴면'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['count'], 1)
+        self.assertEqual(response.data['client_ids'], [only_vip.pk])
+
+        response = self.api.get('/api/clients/tag-query/', {'q': 'VIP OR 휴면', 'count_only': 'true'})
+        self.assertEqual(response.data['count'], 3)
+        self.assertNotIn('client_ids', response.data)
+
+        response = self.api.get('/api/clients/tag-query/', {'q': '없는 태그'})
+        self.assertEqual(response.status_code, 400)
+
+    def test_tag_bitmaps_update_once_per_transaction(self):
+        vip = Tag.objects.create(gallery=self.gallery, name='VIP')
+        (first,) = self.add_clients(1, [vip])
+        self.api.get('/api/clients/tag-query/', {'q': 'VIP'})  # 인덱스 생성
+
+        # 롤백된 작업의 표시는 다음 커밋의 갱신에 섞이지 않아야 함
+        other = make_gallery('다른 갤러리')
+        with self.assertRaises(RuntimeError), transaction.atomic():
+            Client.objects.create(gallery=other, name='롤백 고객')
+            raise RuntimeError
+
+        flush_queries = []
+        for count in (2, 10):
+            with self.captureOnCommitCallbacks() as callbacks:
+                self.add_clients(count, [vip])
+            with CaptureQueriesContext(connection) as queries:
+                for callback in callbacks:
+                    callback()
+            flush_queries.append(len(queries))
+        self.assertEqual(flush_queries[0], flush_queries[1])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            first_id = first.pk
+            first.delete()
+        response = self.api.get('/api/clients/tag-query/', {'q': 'VIP'})
+        self.assertEqual(response.data['count'], 12)
+        self.assertNotIn(first_id, response.data['client_ids'])
+        ordinals = ClientTagOrdinal.objects.filter(gallery=self.gallery).values_list('ordinal', flat=True)
+        self.assertEqual(sorted(ordinals), list(range(13)))
+
+    def test_typed_filters_compare_values_not_text(self):
+        ClientColumn.objects.create(gallery=self.gallery, header='구매 금액', accessor='구매 금액', type='number')
+        ClientColumn.objects.create(gallery=self.gallery, header='메모', accessor='메모', type='text')
+        amounts = {}
+        for amount in (900, 10000, 120000):
+            client = Client.objects.create(gallery=self.gallery, name=f'고객{amount}', data={'구매 금액': amount})
+            amounts[amount] = client.pk
+
+        response = self.api.get('/api/clients/', {'filter.구매 금액.gte': '10000', 'sort': '-구매 금액'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.list_ids(response), [amounts[120000], amounts[10000]])
+
+        response = self.api.get('/api/clients/', {'filter.구매 금액': '900'})
+        self.assertEqual(self.list_ids(response), [amounts[900]])
+
+        response = self.api.get('/api/clients/', {'filter.없는 컬럼': '1'})
+        self.assertEqual(response.status_code, 400)
+
+    def test_text_filter_matches_korean_accessor(self):
+        ClientColumn.objects.create(gallery=self.gallery, header='메모', accessor='메모', type='text')
+        first, second = self.add_clients(2)
+
+        response = self.api.get('/api/clients/', {'filter.메모.contains': '메모1'})
+        self.assertEqual(self.list_ids(response), [second.pk])
+
+        response = self.api.get('/api/clients/', {'sort': '-메모'})
+        self.assertEqual(self.list_ids(response), [second.pk, first.pk])
+
+
+class ClientImportModeTests(TestCase):
+    ROWS = [
+        ('고객명', '연락처', '메모'),
+        ('김민서', '01012345678', '새 메모'),
+        ('이서준', '010-2222-3333', '신규'),
+    ]
+
+    def setUp(self):
+        self.gallery = make_gallery()
+        self.existing = Client.objects.create(
+            gallery=self.gallery, name='김민서', phone='010-1234-5678', data={'메모': '기존', '등급': 'A'}
+        )
+
+    def run_import(self, mode, rows=None):
+        return ClientImporter(self.gallery.pk, {}, mode=mode).run(rows or self.ROWS)
+
+    def test_insert_mode_always_creates(self):
+        result = self.run_import(IMPORT_MODE_INSERT)
+
+        self.assertEqual((result['created_count'], result['updated_count']), (2, 0))
+        self.assertEqual(Client.objects.filter(gallery=self.gallery).count(), 3)
+
+    def test_phone_mode_merges_into_existing_client(self):
+        result = self.run_import(IMPORT_MODE_PHONE)
+
+        self.assertEqual((result['created_count'], result['updated_count']), (1, 1))
+        self.assertEqual(Client.objects.filter(gallery=self.gallery).count(), 2)
+        self.existing.refresh_from_db()
+        self.assertEqual(self.existing.data, {'메모': '새 메모', '등급': 'A'})
+
+    def test_phone_mode_is_idempotent(self):
+        self.run_import(IMPORT_MODE_PHONE)
+        result = self.run_import(IMPORT_MODE_PHONE)
+
+        self.assertEqual((result['created_count'], result['updated_count']), (0, 0))
+        self.assertEqual(result['unchanged_count'], 2)
+
+    def test_name_phone_mode_requires_both_to_match(self):
+        rows = [self.ROWS[0], ('김민수', '010-1234-5678', '동명이인 아님'), ('김민서', '010-1234-5678', '병합')]
+        result = self.run_import(IMPORT_MODE_NAME_PHONE, rows)
+
+        self.assertEqual((result['created_count'], result['updated_count']), (1, 1))
+        self.existing.refresh_from_db()
+        self.assertEqual(self.existing.data['메모'], '병합')
+
+
+def use_temporary_storages(test_case):
+    """기본/가져오기 저장소를 테스트 동안 임시 디렉터리로 교체"""
+    roots = {}
+    for alias in ('default', IMPORT_STORAGE):
+        root = tempfile.TemporaryDirectory()
+        test_case.addCleanup(root.cleanup)
+        roots[alias] = {
+            'BACKEND': 'django.core.files.storage.FileSystemStorage',
+            'OPTIONS': {'location': root.name},
+        }
+    storage_settings = override_settings(STORAGES=roots)
+    storage_settings.enable()
+    test_case.addCleanup(storage_settings.disable)
+
+
+class ImportUploadTests(TestCase):
+    def setUp(self):
+        self.gallery = make_gallery()
+        use_temporary_storages(self)
+
+    def age(self, storage, path, hours):
+        moment = time.time() - hours * 3600
+        os.utime(storage.path(path), (moment, moment))
+
+    def test_upload_goes_to_private_storage(self):
+        job = enqueue_import(self.gallery.pk, ContentFile(b'name\n', name='clients.csv'), {})
+
+        path = job.params['file_path']
+        self.assertEqual(job.params['storage'], IMPORT_STORAGE)
+        self.assertTrue(storages[IMPORT_STORAGE].exists(path))
+        self.assertFalse(storages['default'].exists(path))
+
+    @override_settings(CLIENT_IMPORT_UPLOAD_RETENTION_HOURS=1)
+    def test_prune_deletes_only_stale_unused_uploads(self):
+        storage = storages[IMPORT_STORAGE]
+        active = enqueue_import(self.gallery.pk, ContentFile(b'name\n', name='active.csv'), {})
+        self.age(storage, active.params['file_path'], 2)
+        recent = storage.save(f'client_imports/{self.gallery.pk}/recent.csv', ContentFile(b'name\n'))
+        stale = storage.save(f'client_imports/{self.gallery.pk}/stale.csv', ContentFile(b'name\n'))
+        self.age(storage, stale, 2)
+        legacy = storages['default'].save(f'client_imports/{self.gallery.pk}/legacy.xlsx', ContentFile(b'x'))
+        self.age(storages['default'], legacy, 2)
+
+        self.assertEqual(prune_import_uploads(), 2)
+        self.assertTrue(storage.exists(active.params['file_path']))
+        self.assertTrue(storage.exists(recent))
+        self.assertFalse(storage.exists(stale))
+        self.assertFalse(storages['default'].exists(legacy))
+
+    @override_settings(CLIENT_IMPORT_UPLOAD_RETENTION_HOURS=1)
+    def test_prune_keeps_uploads_of_long_queued_jobs(self):
+        storage = storages[IMPORT_STORAGE]
+        queued = enqueue_import(self.gallery.pk, ContentFile(b'name\n', name='queued.csv'), {}, file_hash='b' * 64)
+        parsed = storage.save(parsed_rows_path(self.gallery.pk, 'b' * 64), ContentFile(b''))
+        for path in (queued.params['file_path'], parsed):
+            self.age(storage, path, 2)
+        BackgroundJob.objects.filter(pk=queued.pk).update(updated_at=timezone.now() - timedelta(hours=2))
+
+        self.assertEqual(prune_import_uploads(), 0)
+        self.assertTrue(storage.exists(queued.params['file_path']))
+        self.assertTrue(storage.exists(parsed))
+
+    def test_stale_running_import_fails_and_drops_upload(self):
+        job = enqueue_import(self.gallery.pk, ContentFile(b'name\n', name='clients.csv'), {})
+        claim_next_job()
+        BackgroundJob.objects.filter(pk=job.pk).update(updated_at=timezone.now() - timedelta(hours=1))
+
+        self.assertEqual([reclaimed.pk for reclaimed in reclaim_stale_jobs(timedelta(minutes=15))], [job.pk])
+        job.refresh_from_db()
+        self.assertEqual(job.status, BackgroundJob.STATUS_FAILED)
+        self.assertIsNotNone(job.finished_at)
+        self.assertFalse(storages[IMPORT_STORAGE].exists(job.params['file_path']))
+
+    def test_parsed_rows_keep_cell_types(self):
+        rows = [('김민서', 1012345678, datetime(2024, 3, 5), True, None)]
+        save_parsed_rows(self.gallery.pk, 'a' * 64, ['고객명', '연락처', '등록일', '동의', '메모'], rows)
+
+        with storages[IMPORT_STORAGE].open(parsed_rows_path(self.gallery.pk, 'a' * 64), 'rb') as file:
+            total, parsed = read_parsed_rows(file)
+            parsed = list(parsed)
+        self.assertEqual(total, 1)
+        self.assertEqual(parsed, [('고객명', '연락처', '등록일', '동의', '메모'), rows[0]])
+
+    def test_preview_maps_only_one_column_to_phone(self):
+        phone = ClientColumn.objects.create(gallery=self.gallery, header='연락처', accessor='연락처')
+        content = (
+            '고객명,보호자 연락처,휴대폰\n'
+            '김민서,010-9999-0001,010-1234-5678\n'
+            '이서준,010-9999-0002,010-2222-3333\n'
+        ).encode('utf-8')
+        preview = build_preview(self.gallery.pk, SimpleUploadedFile('clients.csv', content))
+
+        roles = {column['header']: column['role'] for column in preview['columns']}
+        self.assertEqual(roles, {'고객명': 'name', '보호자 연락처': 'data', '휴대폰': 'phone'})
+        self.assertEqual(
+            preview['proposed_mapping'],
+            {'휴대폰': str(phone.pk), '보호자 연락처': 'new_보호자 연락처'},
+        )
+
+    def test_import_reuses_rows_parsed_by_preview(self):
+        content = '고객명,연락처,메모\n김민서,010-1234-5678,전시 방문\n이서준,010-2222-3333,\n'.encode('utf-8')
+        preview = build_preview(self.gallery.pk, SimpleUploadedFile('clients.csv', content))
+        self.assertEqual(preview['row_count'], 2)
+        parsed_path = parsed_rows_path(self.gallery.pk, preview['file_hash'])
+        self.assertTrue(storages[IMPORT_STORAGE].exists(parsed_path))
+
+        upload = SimpleUploadedFile('clients.csv', content)
+        job = enqueue_import(self.gallery.pk, upload, {}, file_hash=file_hash(upload))
+        # 원본 업로드가 없어도 파싱해 둔 행으로 가져와야 함
+        storages[IMPORT_STORAGE].delete(job.params['file_path'])
+        run_job(claim_next_job())
+
+        job.refresh_from_db()
+        self.assertEqual(job.status, BackgroundJob.STATUS_SUCCEEDED, job.error)
+        self.assertEqual(job.result['created_count'], 2)
+        self.assertFalse(storages[IMPORT_STORAGE].exists(parsed_path))
+
+
+class BackgroundJobTests(TestCase):
+    def setUp(self):
+        self.gallery = make_gallery()
+
+    def stale_rename_job(self):
+        job = enqueue_job(RENAME_JOB_KIND, gallery_id=self.gallery.pk, params={'old_key': 'a', 'new_key': 'b'})
+        claim_next_job()
+        BackgroundJob.objects.filter(pk=job.pk).update(updated_at=timezone.now() - timedelta(hours=1))
+        return job
+
+    def test_progress_is_a_heartbeat(self):
+        job = self.stale_rename_job()
+        job.refresh_from_db()
+        report_progress(job, 1, 10)
+        self.assertEqual(reclaim_stale_jobs(timedelta(minutes=15)), [])
+
+    def test_stale_idempotent_job_is_requeued_until_max_attempts(self):
+        job = self.stale_rename_job()
+        for _ in range(MAX_ATTEMPTS - 1):
+            reclaim_stale_jobs(timedelta(minutes=15))
+            job.refresh_from_db()
+            self.assertEqual(job.status, BackgroundJob.STATUS_PENDING)
+            self.assertEqual(claim_next_job().pk, job.pk)
+            BackgroundJob.objects.filter(pk=job.pk).update(updated_at=timezone.now() - timedelta(hours=1))
+
+        reclaim_stale_jobs(timedelta(minutes=15))
+        job.refresh_from_db()
+        self.assertEqual(job.status, BackgroundJob.STATUS_FAILED)
+        self.assertEqual(job.attempts, MAX_ATTEMPTS)
+
+
+class ImportBenchmarkTests(TestCase):
+    """benchmark_client_import와 같은 경로(업로드 API -> 가져오기 작업)를 적은 행 수로 실행"""
+
+    ROWS = 50
+
+    def setUp(self):
+        use_temporary_storages(self)
+
+    def test_synthetic_workbook_has_header_and_rows(self):
+        from openpyxl import load_workbook
+
+        sheet = load_workbook(io.BytesIO(synthetic_workbook(self.ROWS)), read_only=True).active
+        rows = list(sheet.iter_rows(values_only=True))
+        self.assertEqual(len(rows), self.ROWS + 2)  # 헤더 + 빈 헤더 칸을 채우는 행
+
+    def test_small_import_run(self):
+        for mode in IMPORT_MODES:
+            with self.subTest(mode=mode):
+                result = BenchmarkCommand().run_size(self.ROWS, mode, seed=0)
+                self.assertEqual(result['rows'], self.ROWS)
+                self.assertEqual(result['failed_count'], 0)
+                self.assertEqual(result['created_count'] + result['updated_count'], self.ROWS)
+                self.assertGreater(result['rows_per_sec'], 0)
+
+
+class ClientSearchTests(TestCase):
+    def setUp(self):
+        self.gallery = make_gallery()
+        self.client_obj = Client.objects.create(
+            gallery=self.gallery, name='김민서', phone='010-1234-0005', data={'등록일': '2024-03-05'}
+        )
+        Client.objects.create(gallery=self.gallery, name='이서준', phone='010-9999-1234')
+
+    def search_ids(self, query, **kwargs):
+        return [client.pk for client in search_clients(self.gallery.pk, query, **kwargs)]
+
+    def test_phone_shaped_queries(self):
+        for query in ('1234-0005', '12340005', '010-1234-0005', '+82 10-1234-0005', '82-10-1234-0005'):
+            with self.subTest(query=query):
+                self.assertEqual(self.search_ids(query), [self.client_obj.pk])
+
+    def test_dash_separated_data_value_still_matches(self):
+        self.assertEqual(self.search_ids('2024-03-05'), [self.client_obj.pk])
+
+    def test_korean_name(self):
+        self.assertEqual(self.search_ids('민서'), [self.client_obj.pk])
+        self.assertEqual(self.search_ids('ㄱㅁㅅ'), [self.client_obj.pk])
+
+    def test_search_endpoint_chosung_and_scope(self):
+        Client.objects.create(gallery=make_gallery('다른 갤러리'), name='김민서', phone='010-1234-0005')
+        api = api_client_for(self.gallery)
+
+        response = api.get('/api/clients/search/', {'q': 'ㄱㅁ'})
+        self.assertEqual([row['id'] for row in response.data['results']], [self.client_obj.pk])
+        response = api.get('/api/clients/search/', {'q': '서준', 'mode': 'prefix'})
+        self.assertEqual(response.data['count'], 0)
+        response = api.get('/api/clients/search/', {'q': '이서', 'mode': 'prefix'})
+        self.assertEqual(response.data['count'], 1)
+        self.assertEqual(api.get('/api/clients/search/', {'q': ''}).status_code, 400)
+
+    def test_reindex_deletes_stale_tokens_in_one_statement(self):
+        clients = [
+            Client.objects.create(gallery=self.gallery, name=f'박지현{index}', phone=f'010-5555-{index:04d}')
+            for index in range(5)
+        ]
+        for client in clients:
+            client.name = client.name.replace('박지현', '최도윤')
+        Client.objects.bulk_update(clients, ['name'])
+
+        with CaptureQueriesContext(connection) as queries:
+            index_clients(clients)
+        deletes = [query for query in queries if query['sql'].startswith('DELETE')]
+        self.assertEqual(len(deletes), 1)
+        self.assertEqual(self.search_ids('최도윤'), [client.pk for client in clients])
+        self.assertEqual(self.search_ids('박지현'), [])
+
+
+class PhoneNormalizationTests(TestCase):
+    def setUp(self):
+        self.gallery = make_gallery()
+        self.api = api_client_for(self.gallery)
+
+    def test_normalize_phone_formats(self):
+        for raw, expected in (
+            ('010-1234-5678', '+821012345678'),
+            ('+82 10 1234 5678', '+821012345678'),
+            ('82-10-1234-5678', '+821012345678'),
+            (1012345678, '+821012345678'),  # 앞자리 0이 빠진 엑셀 숫자 셀
+            ('02-123-4567', '+8221234567'),
+            ('123', None),
+            ('', None),
+        ):
+            with self.subTest(raw=raw):
+                self.assertEqual(normalize_phone(raw), expected)
+
+    def test_save_falls_back_to_data_phone(self):
+        client = Client.objects.create(gallery=self.gallery, name='김하늘', data={'연락처': '010 2222 3333'})
+        self.assertEqual(client.phone_normalized, '+821022223333')
+
+        client.phone = '010-4444-5555'
+        client.save(update_fields=['phone'])
+        client.refresh_from_db()
+        self.assertEqual(client.phone_normalized, '+821044445555')
+
+    def test_lookup_and_duplicate_groups(self):
+        first = Client.objects.create(gallery=self.gallery, name='오세린', phone='010-7777-8888')
+        second = Client.objects.create(gallery=self.gallery, name='오세린', phone='+82 10-7777-8888')
+        Client.objects.create(gallery=self.gallery, name='문태오', phone='010-1111-2222')
+        Client.objects.create(gallery=make_gallery('다른 갤러리'), name='오세린', phone='010-7777-8888')
+
+        response = self.api.get('/api/clients/by-phone/', {'phone': '01077778888'})
+        self.assertEqual(response.data['phone_normalized'], '+821077778888')
+        self.assertEqual([row['id'] for row in response.data['results']], [first.pk, second.pk])
+
+        response = self.api.get('/api/clients/duplicate-phones/')
+        self.assertEqual(response.data['groups'], [
+            {'phone_normalized': '+821077778888', 'client_ids': [first.pk, second.pk]},
+        ])
+
+    def test_backfill_command_fills_missing_values(self):
+        client = Client.objects.create(gallery=self.gallery, name='윤채원', phone='010-3333-4444')
+        Client.objects.filter(pk=client.pk).update(phone_normalized=None)
+
+        call_command('backfill_phone_normalized', '--batch-size', '1', stdout=io.StringIO())
+
+        client.refresh_from_db()
+        self.assertEqual(client.phone_normalized, '+821033334444')
+
+
+class ConditionalListTests(TestCase):
+    def setUp(self):
+        self.gallery = make_gallery()
+        self.api = api_client_for(self.gallery)
+        self.client_obj = Client.objects.create(gallery=self.gallery, name='서지안', phone='010-1212-3434')
+
+    def test_matching_etag_returns_304_without_listing(self):
+        response = self.api.get('/api/clients/')
+        self.assertEqual(response.status_code, 200)
+        etag = response['ETag']
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.api.get('/api/clients/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response['ETag'], etag)
+        self.assertFalse([query for query in queries if 'clients_client"' in query['sql']])
+
+    def test_writes_change_the_etag(self):
+        etag = self.api.get('/api/clients/')['ETag']
+
+        self.client_obj.name = '서지안2'
+        self.client_obj.save()
+        response = self.api.get('/api/clients/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+
+        etag = response['ETag']
+        self.client_obj.tags.add(Tag.objects.create(gallery=self.gallery, name='VIP'))
+        response = self.api.get('/api/clients/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+
+    def test_etag_depends_on_query_and_gallery(self):
+        etag = self.api.get('/api/clients/')['ETag']
+
+        self.assertEqual(self.api.get('/api/clients/', {'fields': 'id'}, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+        other = api_client_for(make_gallery('다른 갤러리'))
+        self.assertEqual(other.get('/api/clients/', HTTP_IF_NONE_MATCH=etag).status_code, 200)
+        self.assertEqual(self.api.get('/api/tags/', HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+
+class ClientProjectionTests(TestCase):
+    def setUp(self):
+        self.gallery = make_gallery()
+        self.api = api_client_for(self.gallery)
+        self.client_obj = Client.objects.create(
+            gallery=self.gallery, name='', phone='010-2323-4545', data={'고객명': '배수아', '메모': '도록 요청', '등록일': '2024-05-01'}
+        )
+        self.client_obj.tags.add(Tag.objects.create(gallery=self.gallery, name='VIP'))
+
+    def test_fields_limit_response_and_skip_tags(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.api.get('/api/clients/', {'fields': 'name'})
+
+        self.assertEqual(response.data, [{'id': self.client_obj.pk, 'name': '배수아'}])
+        self.assertFalse([query for query in queries if 'clients_client_tags' in query['sql']])
+
+    def test_data_keys_extract_only_requested_keys(self):
+        response = self.api.get('/api/clients/', {'fields': 'id,phone', 'data_keys': '메모,없는 키'})
+
+        self.assertEqual(response.data, [{'id': self.client_obj.pk, 'phone': '010-2323-4545', '메모': '도록 요청'}])
+
+        response = self.api.get('/api/clients/', {'data_keys': '메모'})
+        self.assertEqual(response.data[0]['data'], {'메모': '도록 요청'})
+        self.assertEqual([tag['name'] for tag in response.data[0]['tags']], ['VIP', '일반고객'])
+
+    def test_unknown_field_is_rejected(self):
+        response = self.api.get('/api/clients/', {'fields': 'id,password'})
+        self.assertEqual(response.status_code, 400)
+
+
+class BulkClientWriteTests(TestCase):
+    def setUp(self):
+        self.gallery = make_gallery()
+        self.api = api_client_for(self.gallery)
+        self.tag = Tag.objects.create(gallery=self.gallery, name='VIP')
+
+    def post(self, operations, **extra):
+        return self.api.post('/api/clients/bulk/', {'operations': operations, **extra}, format='json')
+
+    def test_mixed_operations_apply_in_one_request(self):
+        edited = Client.objects.create(gallery=self.gallery, name='장예린', phone='010-1000-0001')
+        removed = Client.objects.create(gallery=self.gallery, name='강민재', phone='010-1000-0002')
+        cursor = self.api.get('/api/clients/')['X-Sync-Cursor']
+
+        response = self.post([
+            {'op': 'create', 'name': '노은채', 'phone': '010 5000 6000', 'data': {'메모': '신규'}, 'tag_ids': [self.tag.pk]},
+            {'op': 'update', 'id': edited.pk, 'name': '장예린2', 'tag_ids': [self.tag.pk]},
+            {'op': 'delete', 'id': removed.pk},
+        ])
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([result['status'] for result in response.data['results']], ['ok', 'ok', 'ok'])
+        created = Client.objects.get(pk=response.data['results'][0]['id'])
+        self.assertEqual((created.phone_normalized, created.data), ('+821050006000', {'메모': '신규'}))
+        self.assertEqual(list(created.tags.values_list('name', flat=True)), ['VIP'])
+        edited.refresh_from_db()
+        self.assertEqual(edited.name, '장예린2')
+        self.assertEqual(list(edited.tags.values_list('name', flat=True)), ['VIP'])
+        self.assertFalse(Client.objects.filter(pk=removed.pk).exists())
+        self.assertEqual([client.pk for client in search_clients(self.gallery.pk, '노은채')], [created.pk])
+
+        delta = self.api.get('/api/clients/', {'since': cursor})
+        self.assertEqual(delta.data['deleted'], [removed.pk])
+        self.assertEqual({row['id'] for row in delta.data['changed']}, {created.pk, edited.pk})
+
+    def test_invalid_items_fail_individually(self):
+        other = Client.objects.create(gallery=make_gallery('다른 갤러리'), name='남의 고객')
+
+        response = self.post([
+            {'op': 'create', 'name': '허윤'},
+            {'op': 'update', 'id': other.pk, 'name': '변경'},
+            {'op': 'create', 'name': '김', 'tag_ids': [999999]},
+        ])
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['error_count'], 2)
+        self.assertEqual([result['status'] for result in response.data['results']], ['ok', 'error', 'error'])
+        self.assertTrue(Client.objects.filter(gallery=self.gallery, name='허윤').exists())
+        other.refresh_from_db()
+        self.assertEqual(other.name, '남의 고객')
+
+    def test_atomic_batch_is_rejected_as_a_whole(self):
+        response = self.post([{'op': 'create', 'name': '허윤'}, {'op': 'rename'}], atomic=True)
+
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(response.data['applied'])
+        self.assertEqual([result['status'] for result in response.data['results']], ['skipped', 'error'])
+        self.assertFalse(Client.objects.filter(gallery=self.gallery).exists())
+
+    def test_query_count_does_not_grow_with_batch_size(self):
+        def operations(count):
+            return [{'op': 'create', 'name': f'일괄{index}', 'phone': f'010-2000-{index:04d}'} for index in range(count)]
+
+        # 기본 태그 생성 등 첫 요청에만 있는 쿼리 제외
+        self.post(operations(1))
+        with CaptureQueriesContext(connection) as baseline:
+            self.post(operations(2))
+        with self.assertNumQueries(len(baseline)):
+            response = self.post(operations(20))
+        self.assertEqual(response.data['error_count'], 0)
+
+
+class BulkTagUpdateTests(TestCase):
+    def setUp(self):
+        self.gallery = make_gallery()
+        self.api = api_client_for(self.gallery)
+        self.vip = Tag.objects.create(gallery=self.gallery, name='VIP')
+        self.dormant = Tag.objects.create(gallery=self.gallery, name='휴면')
+
+    def add_clients(self, count):
+        return [
+            Client.objects.create(gallery=self.gallery, name=f'고객{index}', data={'메모': f'메모{index % 2}'})
+            for index in range(count)
+        ]
+
+    def tag_names(self, client):
+        return sorted(client.tags.values_list('name', flat=True))
+
+    def post(self, payload, url='/api/clients/tags/bulk/'):
+        return self.api.post(url, payload, format='json')
+
+    def test_add_remove_and_replace(self):
+        first, second = self.add_clients(2)
+
+        response = self.post({'action': 'add', 'tag_ids': [self.vip.pk, self.dormant.pk], 'client_ids': [first.pk]})
+        self.assertEqual((response.data['added'], response.data['client_count']), (2, 1))
+        self.assertEqual(self.tag_names(first), ['VIP', '일반고객', '휴면'])
+
+        response = self.post({'action': 'remove', 'tag_ids': [self.dormant.pk], 'client_ids': [first.pk, second.pk]})
+        self.assertEqual(response.data['removed'], 1)
+        self.assertEqual(self.tag_names(first), ['VIP', '일반고객'])
+
+        response = self.post({'action': 'replace', 'tag_ids': [self.dormant.pk], 'client_ids': [first.pk, second.pk]})
+        self.assertEqual(self.tag_names(first), ['휴면'])
+        self.assertEqual(self.tag_names(second), ['휴면'])
+        response = self.api.get('/api/clients/tag-query/', {'q': '휴면 AND NOT VIP'})
+        self.assertEqual(response.data['client_ids'], [first.pk, second.pk])
+
+    def test_all_uses_list_filters(self):
+        ClientColumn.objects.create(gallery=self.gallery, header='메모', accessor='메모', type='text')
+        clients = self.add_clients(4)
+
+        response = self.post(
+            {'action': 'add', 'tag_ids': [self.vip.pk], 'all': True},
+            url='/api/clients/tags/bulk/?filter.메모=메모1',
+        )
+
+        self.assertEqual(response.data['client_count'], 2)
+        tagged = Client.objects.filter(gallery=self.gallery, tags=self.vip).order_by('id')
+        self.assertEqual(list(tagged), [clients[1], clients[3]])
+
+    def test_rejects_tags_of_other_gallery(self):
+        (client,) = self.add_clients(1)
+        foreign = Tag.objects.create(gallery=make_gallery('다른 갤러리'), name='VIP')
+
+        response = self.post({'action': 'add', 'tag_ids': [foreign.pk], 'client_ids': [client.pk]})
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(self.tag_names(client), ['일반고객'])
+
+    def test_query_count_does_not_grow_with_clients(self):
+        self.post({'action': 'add', 'tag_ids': [self.vip.pk], 'all': True})  # 첫 요청에만 있는 쿼리 제외
+        counts = []
+        for count in (2, 20):
+            client_ids = [client.pk for client in self.add_clients(count)]
+            with CaptureQueriesContext(connection) as queries:
+                response = self.post({'action': 'add', 'tag_ids': [self.vip.pk], 'client_ids': client_ids})
+            self.assertEqual(response.data['added'], count)
+            counts.append(len(queries))
+        self.assertEqual(counts[0], counts[1])
+
+    def test_fix_tags_assigns_default_tag_to_untagged_clients(self):
+        first, second = self.add_clients(2)
+        first.tags.clear()
+
+        response = self.post({}, url='/api/clients/fix-tags/')
+
+        self.assertEqual(response.data['fixed_count'], 1)
+        self.assertEqual(self.tag_names(first), ['일반고객'])
+        self.assertEqual(self.tag_names(second), ['일반고객'])
+
+
+class DefaultTagTests(TestCase):
+    def setUp(self):
+        self.gallery = make_gallery()
+
+    def tag_names(self, client):
+        return list(client.tags.values_list('name', flat=True))
+
+    def test_save_uses_cached_default_tag(self):
+        first = Client.objects.create(gallery=self.gallery, name='권나연')
+        self.assertEqual(self.tag_names(first), [DEFAULT_TAG_NAME])
+
+        with CaptureQueriesContext(connection) as queries:
+            second = Client.objects.create(gallery=self.gallery, name='임도현')
+        # 기본 태그를 이름으로 다시 찾지 않음 (캐시된 ID로 INSERT ... SELECT만 실행)
+        self.assertFalse([query for query in queries if '"clients_tag"."name" =' in query['sql']])
+        self.assertEqual(self.tag_names(second), [DEFAULT_TAG_NAME])
+
+    def test_deleted_default_tag_is_recreated(self):
+        Client.objects.create(gallery=self.gallery, name='권나연')
+        Tag.objects.get(gallery=self.gallery, name=DEFAULT_TAG_NAME).delete()
+
+        client = Client.objects.create(gallery=self.gallery, name='임도현')
+
+        self.assertEqual(self.tag_names(client), [DEFAULT_TAG_NAME])
+
+    def test_stale_cached_id_is_looked_up_again(self):
+        default_id = get_default_tag_id(self.gallery.pk)
+        # 다른 프로세스에서 태그가 지워져 캐시만 남은 경우
+        Tag.objects.filter(pk=default_id).delete()
+        cache.set(f'clients:default_tag:{self.gallery.pk}', default_id)
+
+        client = Client.objects.create(gallery=self.gallery, name='권나연')
+
+        self.assertEqual(self.tag_names(client), [DEFAULT_TAG_NAME])
+        self.assertNotEqual(get_default_tag_id(self.gallery.pk), default_id)
+
+    def test_failure_is_logged_and_client_is_kept(self):
+        with mock.patch('clients.services.assign_default_tag', side_effect=RuntimeError('태그 오류')), \
+                self.assertLogs('clients.models', level='ERROR') as logs:
+            client = Client.objects.create(gallery=self.gallery, name='권나연')
+
+        self.assertTrue(Client.objects.filter(pk=client.pk).exists())
+        self.assertIn('기본 태그 할당 실패', logs.output[0])
+        self.assertIn('RuntimeError', logs.output[0])
+
+
+class ColumnSyncTests(TestCase):
+    def setUp(self):
+        self.gallery = make_gallery()
+        self.api = api_client_for(self.gallery)
+        self.memo = ClientColumn.objects.create(gallery=self.gallery, header='메모', accessor='메모', type='text', order=0)
+        self.amount = ClientColumn.objects.create(
+            gallery=self.gallery, header='금액', accessor='금액', type='text', order=1
+        )
+        self.old = ClientColumn.objects.create(gallery=self.gallery, header='이전', accessor='이전', type='text', order=2)
+
+    def sync(self, columns):
+        return self.api.post('/api/client-columns-sync/', columns, format='json')
+
+    def test_applies_only_the_difference_and_keeps_ids(self):
+        client = Client.objects.create(gallery=self.gallery, name='신유진', data={'메모': '값', '금액': '1200'})
+
+        response = self.sync([
+            {'id': self.memo.pk, 'header': '비고', 'accessor': '비고', 'type': 'text', 'order': 1},
+            {'header': '금액', 'accessor': '금액', 'type': 'number', 'order': 0},
+            {'header': '등록일', 'accessor': '등록일', 'type': 'date', 'order': 2},
+        ])
+
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual((response.data['created'], response.data['updated'], response.data['deleted']), (1, 2, 1))
+        columns = {column.accessor: column for column in ClientColumn.objects.filter(gallery=self.gallery)}
+        self.assertEqual(set(columns), {'비고', '금액', '등록일'})
+        self.assertEqual((columns['비고'].pk, columns['금액'].pk), (self.memo.pk, self.amount.pk))
+        self.assertEqual(
+            [column['id'] for column in response.data['columns']],
+            [self.amount.pk, self.memo.pk, columns['등록일'].pk],
+        )
+        # accessor 변경은 고객 data 키도 옮기고, 타입 변경은 값 변환/인덱스에 반영
+        client.refresh_from_db()
+        self.assertEqual(client.data['비고'], '값')
+        self.assertEqual(response.data['data_migrations'], [
+            {'column_id': self.memo.pk, 'status': 'done', 'updated_count': 1},
+        ])
+        response = self.api.get('/api/clients/', {'filter.금액.gte': '1000'})
+        self.assertEqual([row['id'] for row in response.data], [client.pk])
+
+    def test_header_and_order_changes_do_not_save_each_column(self):
+        columns = [
+            {'id': column.pk, 'header': f'{column.header}!', 'accessor': column.accessor, 'type': 'text', 'order': 5 - index}
+            for index, column in enumerate((self.memo, self.amount, self.old))
+        ]
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.sync(columns)
+
+        self.assertEqual(response.data['updated'], 3)
+        updates = [query for query in queries if query['sql'].startswith('UPDATE "clients_clientcolumn"')]
+        self.assertEqual(len(updates), 1)
+        self.assertEqual(ClientColumn.objects.get(pk=self.old.pk).header, '이전!')
+
+    def test_rejects_duplicate_accessors(self):
+        response = self.sync([
+            {'header': 'A', 'accessor': '메모'},
+            {'header': 'B', 'accessor': '메모'},
+        ])
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(ClientColumn.objects.filter(gallery=self.gallery).count(), 3)
+
+
+class GalleryMetadataTests(TransactionTestCase):
+    # 트랜잭션 밖에서만 캐시를 채우므로 TestCase(테스트 전체가 트랜잭션) 대신 사용
+
+    def setUp(self):
+        self.gallery = make_gallery()
+        forget_gallery_metadata(self.gallery.pk)
+        ClientColumn.objects.create(gallery=self.gallery, header='금액', accessor='금액', type='number')
+        Tag.objects.create(gallery=self.gallery, name='VIP')
+
+    def tearDown(self):
+        # 다음 테스트가 같은 ID의 갤러리를 만들 수 있으므로 메모리 캐시를 남기지 않음
+        forget_gallery_metadata(self.gallery.pk)
+
+    def test_repeated_reads_skip_the_database(self):
+        metadata = get_gallery_metadata(self.gallery.pk)
+        self.assertEqual(metadata.column_types, {'금액': 'number'})
+        self.assertIn('VIP', metadata.tag_ids)
+
+        with self.assertNumQueries(0):
+            self.assertIs(get_gallery_metadata(self.gallery.pk), metadata)
+
+    def test_other_process_reads_shared_cache_with_one_query(self):
+        metadata = get_gallery_metadata(self.gallery.pk)
+        forget_gallery_metadata(self.gallery.pk)  # 다른 프로세스의 빈 메모리 캐시
+
+        with self.assertNumQueries(1):  # 버전 확인만
+            reloaded = get_gallery_metadata(self.gallery.pk)
+        self.assertEqual(reloaded.tags, metadata.tags)
+
+    def test_column_and_tag_changes_are_seen_at_once(self):
+        get_gallery_metadata(self.gallery.pk)
+
+        Tag.objects.create(gallery=self.gallery, name='휴면')
+        ClientColumn.objects.filter(gallery=self.gallery, accessor='금액').get().delete()
+
+        metadata = get_gallery_metadata(self.gallery.pk)
+        self.assertIn('휴면', metadata.tag_ids)
+        self.assertEqual(metadata.column_types, {})
+
+    def test_transaction_does_not_fill_the_cache(self):
+        with transaction.atomic():
+            Tag.objects.create(gallery=self.gallery, name='미확정')
+            self.assertIn('미확정', get_gallery_metadata(self.gallery.pk).tag_ids)
+            transaction.set_rollback(True)
+
+        self.assertNotIn('미확정', get_gallery_metadata(self.gallery.pk).tag_ids)
+
+
+class CsvImportTests(TestCase):
+    def setUp(self):
+        self.gallery = make_gallery()
+
+    def test_detects_encoding(self):
+        self.assertEqual(detect_encoding(codecs.BOM_UTF8 + '고객명'.encode('utf-8')), 'utf-8-sig')
+        self.assertEqual(detect_encoding('고객명'.encode('utf-8')), 'utf-8')
+        # 샘플 끝에서 잘린 UTF-8 문자는 CP949로 오판하지 않음
+        self.assertEqual(detect_encoding('고객명'.encode('utf-8')[:-1]), 'utf-8')
+        self.assertEqual(detect_encoding('고객명,연락처'.encode('cp949')), 'cp949')
+
+    def test_detects_delimiter(self):
+        self.assertEqual(detect_delimiter('a,b\tc', 'clients.tsv'), '\t')
+        self.assertEqual(detect_delimiter('고객명;연락처\n김민서;010-1234-5678\n', 'clients.csv'), ';')
+        self.assertEqual(detect_delimiter('고객명\n', 'clients.csv'), ',')
+
+    def test_reads_cp949_tsv_with_quoted_cells(self):
+        content = '고객명\t메모\n김민서\t"여러 줄\n메모"\n'.encode('cp949')
+
+        rows = list(iter_upload_rows(io.BytesIO(content), 'clients.tsv'))
+
+        self.assertEqual(rows, [['고객명', '메모'], ['김민서', '여러 줄\n메모']])
+
+    def test_imports_csv_through_client_importer(self):
+        content = codecs.BOM_UTF8 + '고객명,연락처,메모\n김민서,010-1234-5678,전시 방문\n\n이서준,010-2222-3333,\n'.encode('utf-8')
+
+        result = ClientImporter(self.gallery.pk, {}).run(iter_upload_rows(io.BytesIO(content), 'clients.csv'))
+
+        self.assertEqual(result['created_count'], 2)
+        clients = Client.objects.filter(gallery=self.gallery).order_by('id')
+        self.assertEqual(
+            [(client.name, client.phone_normalized, client.data) for client in clients],
+            [('김민서', '+821012345678', {'메모': '전시 방문'}), ('이서준', '+821022223333', {})],
+        )
+
+
+class ImportRowCleaningTests(TestCase):
+    def setUp(self):
+        self.gallery = make_gallery()
+        ClientColumn.objects.create(gallery=self.gallery, header='금액', accessor='금액', type='number')
+        ClientColumn.objects.create(gallery=self.gallery, header='등록일', accessor='등록일', type='date')
+
+    def import_rows(self, rows):
+        return ClientImporter(self.gallery.pk, {}).run(iter([('고객명', '연락처', '금액', '등록일', '메모'), *rows]))
+
+    def test_cells_are_trimmed_typed_and_blank_cells_dropped(self):
+        result = self.import_rows([
+            ('  김민서 ', 1012345678, '1200', datetime(2024, 3, 5), '  전시 방문  '),
+            ('이서준', '010-2222-3333', float('nan'), None, '   '),
+            ('박지우',),  # 짧은 행은 빈 칸으로 채움
+        ])
+
+        self.assertEqual(result['created_count'], 3)
+        clients = Client.objects.filter(gallery=self.gallery).order_by('id')
+        self.assertEqual(
+            [(client.name, client.phone_normalized, client.data) for client in clients],
+            [
+                ('김민서', '+821012345678', {'금액': 1200, '등록일': '2024-03-05', '메모': '전시 방문'}),
+                ('이서준', '+821022223333', {}),
+                ('박지우', None, {}),
+            ],
+        )
+
+    def test_too_long_rows_are_counted_as_failed(self):
+        result = self.import_rows([('가' * (NAME_MAX_LENGTH + 1), '', '', '', ''), ('김민서', '', '', '', '')])
+
+        self.assertEqual((result['created_count'], result['failed_count']), (1, 1))
+        self.assertEqual(list(Client.objects.filter(gallery=self.gallery).values_list('name', flat=True)), ['김민서'])
+
+
+class ImportTagResolutionTests(TestCase):
+    def setUp(self):
+        self.gallery = make_gallery()
+        self.vip = Tag.objects.create(gallery=self.gallery, name='VIP')
+
+    def import_rows(self, rows):
+        return ClientImporter(self.gallery.pk, {}).run(iter([('고객명', '고객분류'), *rows]))
+
+    def tag_names(self, name):
+        client = Client.objects.get(gallery=self.gallery, name=name)
+        return sorted(client.tags.values_list('name', flat=True))
+
+    def test_multi_valued_cells_become_several_tags(self):
+        self.import_rows([('김민서', 'VIP, 컬렉터;VIP'), ('이서준', '컬렉터 | 작가\n'), ('박지우', '')])
+
+        self.assertEqual(self.tag_names('김민서'), ['VIP', '일반고객', '컬렉터'])
+        self.assertEqual(self.tag_names('이서준'), ['일반고객', '작가', '컬렉터'])
+        self.assertEqual(self.tag_names('박지우'), ['일반고객'])
+        self.assertEqual(Tag.objects.get(gallery=self.gallery, name='VIP').pk, self.vip.pk)
+        self.assertEqual(Tag.objects.filter(gallery=self.gallery, name='컬렉터').count(), 1)
+
+    def test_tag_queries_do_not_grow_with_rows(self):
+        self.import_rows([('준비', 'VIP')])  # 기본 태그 생성 등 첫 가져오기에만 있는 쿼리 제외
+
+        counts = []
+        for count in (2, 20):
+            rows = [(f'고객{count}_{index}', f'VIP, 신규{count}, 분류{count}') for index in range(count)]
+            with CaptureQueriesContext(connection) as queries:
+                self.import_rows(rows)
+            counts.append(len([query for query in queries if 'clients_tag"' in query['sql']]))
+        self.assertEqual(counts[0], counts[1])
+
+        response = api_client_for(self.gallery).get('/api/clients/tag-query/', {'q': '신규20 AND VIP'})
+        self.assertEqual(response.data['count'], 20)
@@ -0,0 +1,240 @@
+"""
+타입 컬럼 값 변환 및 타입 인덱스
+
+ClientColumn.type이 number/date/boolean인 컬럼은 저장 시 data 값을 해당 타입으로 변환하고
+(변환할 수 없는 값은 원본 문자열 유지), ClientTypedValue에 타입별 컬럼으로 한 번 더 저장해
+범위 필터/정렬/집계를 DB 인덱스로 처리합니다.
+
+    number   '1,200,000원' -> 1200000
+    date     '2024.3.5', '2024년 3월 5일', 엑셀 날짜 일련번호 -> '2024-03-05'
+    boolean  'Y', '예', '동의', 'O' -> True / 'N', '아니오', 'X' -> False
+"""
+import math
+import re
+from datetime import date, datetime, timedelta
+from decimal import Decimal, InvalidOperation
+
+from django.db import transaction
+
+from .column_keys import ACCESSOR_KEY_MAP, get_data_key_map
+from .metadata import get_gallery_metadata
+from .models import Client, ClientTypedValue
+
+NUMBER = 'number'
+DATE = 'date'
+BOOLEAN = 'boolean'
+TYPED_COLUMN_TYPES = (NUMBER, DATE, BOOLEAN)
+
+# 타입별 ClientTypedValue 값 컬럼
+VALUE_FIELDS = {
+    NUMBER: 'num_value',
+    DATE: 'date_value',
+    BOOLEAN: 'bool_value',
+}
+
+TRUE_WORDS = frozenset(['true', 't', '1', 'y', 'yes', 'o', 'v', '예', '네', 'ㅇ', '동의', '수신', '수신동의'])
+FALSE_WORDS = frozenset(['false', 'f', '0', 'n', 'no', 'x', '아니오', '아니요', 'ㄴ', '미동의', '거부', '수신거부'])
+
+EXCEL_EPOCH = date(1899, 12, 30)
+EXCEL_SERIAL_RANGE = (20000, 80000)  # 1954 ~ 2119년
+
+_NUMBER_NOISE_RE = re.compile(r'[,\s원₩$]')
+_NUMBER_RE = re.compile(r'^[+-]?(\d+(\.\d*)?|\.\d+)$')
+_DATE_RE = re.compile(r'^(\d{4})\s*[-./년]\s*(\d{1,2})\s*[-./월]\s*(\d{1,2})\s*일?(?:[\sT].*)?$')
+_COMPACT_DATE_RE = re.compile(r'^(\d{4})(\d{2})(\d{2})$')
+_BATCH_SIZE = 1000
+
+
+# 값 변환
+
+def coerce_number(value):
+    """숫자로 변환할 수 없으면 None"""
+    if isinstance(value, bool):
+        return None
+    if isinstance(value, int):
+        return value
+    if isinstance(value, float) and not math.isfinite(value):
+        return None
+    if isinstance(value, Decimal) and not value.is_finite():
+        return None
+    if isinstance(value, (float, Decimal)):
+        return int(value) if value == int(value) else float(value)
+    text = _NUMBER_NOISE_RE.sub('', str(value))
+    if not _NUMBER_RE.match(text):
+        return None
+    try:
+        number = Decimal(text)
+    except InvalidOperation:
+        return None
+    return int(number) if number == number.to_integral_value() else float(number)
+
+
+def coerce_date(value):
+    """date로 변환할 수 없으면 None"""
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        # 엑셀 날짜 셀이 일련번호로 들어온 경우
+        if EXCEL_SERIAL_RANGE[0] <= value <= EXCEL_SERIAL_RANGE[1]:
+            return EXCEL_EPOCH + timedelta(days=int(value))
+        return None
+    text = str(value).strip()
+    match = _DATE_RE.match(text) or _COMPACT_DATE_RE.match(text)
+    if not match:
+        return None
+    try:
+        return date(int(match.group(1)), int(match.group(2)), int(match.group(3)))
+    except ValueError:
+        return None
+
+
+def coerce_boolean(value):
+    """bool로 변환할 수 없으면 None"""
+    if isinstance(value, bool):
+        return value
+    word = str(value).strip().lower()
+    if word in TRUE_WORDS:
+        return True
+    if word in FALSE_WORDS:
+        return False
+    return None
+
+
+def typed_value(value, column_type):
+    """컬럼 타입에 맞는 파이썬 값 (변환 불가/빈 값이면 None)"""
+    if value is None or value == '':
+        return None
+    if column_type == NUMBER:
+        return coerce_number(value)
+    if column_type == DATE:
+        return coerce_date(value)
+    if column_type == BOOLEAN:
+        return coerce_boolean(value)
+    return None
+
+
+def coerce_value(value, column_type):
+    """
+    data에 저장할 값 (JSON 호환)
+
+    날짜는 정렬 가능한 ISO 문자열로 저장합니다. 변환할 수 없는 값은 그대로 둡니다.
+    """
+    converted = typed_value(value, column_type)
+    if converted is None:
+        return value
+    if isinstance(converted, date):
+        return converted.isoformat()
+    return converted
+
+
+def coerce_data(data, column_types):
+    """column_types({accessor: type})에 해당하는 data 값들을 변환한 새 dict"""
+    if not data or not column_types:
+        return data
+    return {
+        key: coerce_value(value, column_types[key]) if key in column_types else value
+        for key, value in data.items()
+    }
+
+
+def _typed_column_types(metadata):
+    return {
+        accessor: column_type for accessor, column_type in metadata.column_types.items()
+        if column_type in TYPED_COLUMN_TYPES
+    }
+
+
+def get_column_types(gallery_id):
+    """갤러리의 타입 컬럼 {accessor: type} (text 등 변환이 필요 없는 컬럼 제외, 메타데이터 캐시 사용)"""
+    if not gallery_id:
+        return {}
+    return get_gallery_metadata(gallery_id).memo('typed_column_types', _typed_column_types)
+
+
+# 타입 인덱스
+
+def _typed_rows(client, column_types, key_map=ACCESSOR_KEY_MAP):
+    rows = []
+    for accessor, column_type in column_types.items():
+        data = client.data or {}
+        # 컬럼 ID 키나 새 accessor로 옮기는 중인 값은 이전 키로 남아 있을 수 있음
+        value = typed_value(key_map.lookup(data, accessor), column_type)
+        if value is None:
+            continue
+        rows.append(ClientTypedValue(
+            gallery_id=client.gallery_id,
+            client_id=client.pk,
+            accessor=accessor,
+            **{VALUE_FIELDS[column_type]: value},
+        ))
+    return rows
+
+
+def sync_typed_values(clients, column_types=None):
+    """
+    고객들의 타입 인덱스 행을 현재 data 기준으로 교체
+
+    같은 갤러리 고객들만 받습니다. column_types를 넘기면 컬럼 조회를 생략합니다.
+    bulk_create/bulk_update처럼 save 시그널을 거치지 않는 경로에서도 호출합니다.
+    """
+    clients = [client for client in clients if client.pk]
+    if not clients:
+        return
+    if column_types is None:
+        column_types = get_column_types(clients[0].gallery_id)
+
+    key_map = get_data_key_map(clients[0].gallery_id)
+    rows = []
+    for client in clients:
+        rows.extend(_typed_rows(client, column_types, key_map))
+    with transaction.atomic():
+        ClientTypedValue.objects.filter(client_id__in=[client.pk for client in clients]).delete()
+        ClientTypedValue.objects.bulk_create(rows, batch_size=_BATCH_SIZE)
+
+
+def rebuild_typed_column(gallery_id, accessor, column_type=None):
+    """
+    컬럼 하나의 타입 인덱스를 갤러리 전체에 대해 다시 생성 (컬럼 타입/accessor 변경 시)
+
+    column_type이 타입 컬럼이 아니면 해당 accessor의 인덱스 행만 삭제합니다. 반환값: 생성한 행 수
+    """
+    with transaction.atomic():
+        ClientTypedValue.objects.filter(gallery_id=gallery_id, accessor=accessor).delete()
+        if column_type not in TYPED_COLUMN_TYPES:
+            return 0
+
+        created = 0
+        rows = []
+        key_map = get_data_key_map(gallery_id)
+        clients = (
+            Client.objects
+            .filter(gallery_id=gallery_id, data__has_any_keys=key_map.source_keys(accessor))
+            .only('id', 'gallery', 'data')
+        )
+        for client in clients.iterator(chunk_size=_BATCH_SIZE):
+            rows.extend(_typed_rows(client, {accessor: column_type}, key_map))
+            if len(rows) >= _BATCH_SIZE:
+                ClientTypedValue.objects.bulk_create(rows, batch_size=_BATCH_SIZE)
+                created += len(rows)
+                rows = []
+        if rows:
+            ClientTypedValue.objects.bulk_create(rows, batch_size=_BATCH_SIZE)
+            created += len(rows)
+    return created
+
+
+def rename_typed_column(gallery_id, old_accessor, new_accessor):
+    """accessor만 바뀐 경우 인덱스 행의 accessor를 UPDATE 한 번으로 변경"""
+    with transaction.atomic():
+        ClientTypedValue.objects.filter(gallery_id=gallery_id, accessor=new_accessor).delete()
+        ClientTypedValue.objects.filter(gallery_id=gallery_id, accessor=old_accessor).update(accessor=new_accessor)
+
+
+def typed_filter_value(value, column_type):
+    """필터 쿼리 파라미터 값을 인덱스 컬럼 타입으로 변환 (실패 시 ValueError)"""
+    converted = typed_value(value, column_type)
+    if converted is None:
+        raise ValueError(value)
+    return converted
@@ -6,9 +6,19 @@ from .views import (
     TagRetrieveUpdateDestroyView,
     create_tag_if_not_exists,
     filter_clients_by_tag,
+    query_clients_by_tags,
+    search_clients_view,
+    lookup_clients_by_phone,
+    find_duplicate_phone_clients,
+    bulk_write_clients,
+    bulk_update_client_tags,
+    client_column_stats,
+    background_job_detail,
+    cancel_background_job,
     update_client_tags_only,
     fix_clients_without_tags,
     log_frontend_debug,
+    preview_excel_file,
     process_excel_file_pandas_with_mapping
 )
 
@@ -21,8 +31,18 @@ urlpatterns = [
     path('tags/<int:pk>/', TagRetrieveUpdateDestroyView.as_view(), name='tag-detail-update-delete'),
     path('tags/create-if-not-exists/', create_tag_if_not_exists, name='create-tag-if-not-exists'),
     path('clients/filter-by-tag/', filter_clients_by_tag, name='filter-clients-by-tag'),
+    path('clients/tag-query/', query_clients_by_tags, name='query-clients-by-tags'),
+    path('clients/search/', search_clients_view, name='search-clients'),
+    path('clients/by-phone/', lookup_clients_by_phone, name='lookup-clients-by-phone'),
+    path('clients/duplicate-phones/', find_duplicate_phone_clients, name='find-duplicate-phone-clients'),
+    path('clients/bulk/', bulk_write_clients, name='bulk-write-clients'),
+    path('clients/tags/bulk/', bulk_update_client_tags, name='bulk-update-client-tags'),
+    path('clients/column-stats/', client_column_stats, name='client-column-stats'),
+    path('jobs/<int:job_id>/', background_job_detail, name='background-job-detail'),
+    path('jobs/<int:job_id>/cancel/', cancel_background_job, name='cancel-background-job'),
     
     # 엑셀 처리 API (UI에서 실제 사용하는 것만 유지)
+    path('excel/preview/', preview_excel_file, name='preview-excel-file'),
     path('excel/upload-with-mapping/', process_excel_file_pandas_with_mapping, name='process-excel-file-pandas-with-mapping'),
     
     # 태그 전용 업데이트 API
@@ -0,0 +1,117 @@
+"""
+갤러리 데이터 버전 및 조건부 GET(ETag / 304)
+
+고객/태그/컬럼/작품이 변경될 때마다 갤러리 버전을 1씩 올리고,
+목록 API는 이 버전으로 ETag를 만들어 If-None-Match가 같으면
+큰 테이블을 조회하지 않고 304로 응답합니다.
+"""
+import hashlib
+
+from django.db import IntegrityError, transaction
+from django.db.models import F
+from django.utils.cache import patch_vary_headers
+from rest_framework import status
+from rest_framework.response import Response
+
+from .models import GalleryDataVersion
+
+
+def get_gallery_version(gallery_id):
+    if not gallery_id:
+        return 0
+    version = (
+        GalleryDataVersion.objects
+        .filter(gallery_id=gallery_id)
+        .values_list('version', flat=True)
+        .first()
+    )
+    return version or 0
+
+
+def get_meta_version(gallery_id):
+    """컬럼/태그 메타데이터 버전 (clients.metadata 캐시 키)"""
+    if not gallery_id:
+        return 0
+    version = (
+        GalleryDataVersion.objects
+        .filter(gallery_id=gallery_id)
+        .values_list('meta_version', flat=True)
+        .first()
+    )
+    return version or 0
+
+
+def bump_gallery_version(gallery_id, metadata=False):
+    """
+    갤러리 데이터 버전 증가 (metadata=True면 컬럼/태그 메타데이터 버전도 증가)
+
+    시그널을 거치지 않는 대량 작업(bulk_create, queryset.update 등) 후에는 직접 호출해야 합니다.
+    """
+    if not gallery_id:
+        return
+    fields = {'version': F('version') + 1}
+    if metadata:
+        fields['meta_version'] = F('meta_version') + 1
+        # 같은 프로세스는 확인 주기를 기다리지 않고 바로 다시 읽도록 메모리 캐시 삭제
+        from .metadata import forget_gallery_metadata
+        forget_gallery_metadata(gallery_id)
+    updated = GalleryDataVersion.objects.filter(gallery_id=gallery_id).update(**fields)
+    if updated:
+        return
+    try:
+        with transaction.atomic():
+            GalleryDataVersion.objects.create(gallery_id=gallery_id, version=1, meta_version=1 if metadata else 0)
+    except IntegrityError:
+        # 동시에 다른 요청이 먼저 생성했거나 갤러리가 이미 삭제된 경우
+        GalleryDataVersion.objects.filter(gallery_id=gallery_id).update(**fields)
+
+
+def build_etag(gallery_id, version, request):
+    """갤러리 버전 + 요청 경로(쿼리 파라미터 포함)로 약한 ETag 생성"""
+    path_hash = hashlib.md5(request.get_full_path().encode('utf-8')).hexdigest()[:12]
+    return f'W/"g{gallery_id}-v{version}-{path_hash}"'
+
+
+def etag_matches(etag, if_none_match):
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == '*':
+        return True
+    bare = etag[2:] if etag.startswith('W/') else etag
+    for candidate in if_none_match.split(','):
+        candidate = candidate.strip()
+        if candidate.startswith('W/'):
+            candidate = candidate[2:]
+        if candidate == bare:
+            return True
+    return False
+
+
+class GalleryETagListMixin:
+    """
+    갤러리 스코프 목록 뷰용 조건부 GET 믹스인
+
+    list() 앞에서 갤러리 버전만 조회해 ETag를 비교하고,
+    일치하면 get_queryset()을 호출하지 않고 304를 반환합니다.
+    """
+
+    def list(self, request, *args, **kwargs):
+        gallery_id = getattr(request.user, 'gallery_id', None)
+        if not gallery_id:
+            return super().list(request, *args, **kwargs)
+
+        # 버전은 응답 생성 전에 읽음 (생성 중 변경되면 다음 요청에서 새 ETag)
+        etag = build_etag(gallery_id, get_gallery_version(gallery_id), request)
+        if etag_matches(etag, request.headers.get('If-None-Match')):
+            response = Response(status=status.HTTP_304_NOT_MODIFIED)
+        else:
+            response = self.list_response(request, *args, **kwargs)
+
+        response['ETag'] = etag
+        response['Cache-Control'] = 'private, no-cache'
+        patch_vary_headers(response, ('Authorization', 'Cookie'))
+        return response
+
+    def list_response(self, request, *args, **kwargs):
+        """ETag가 일치하지 않을 때의 목록 응답 (캐시된 데이터로 응답하려면 재정의)"""
+        return super().list(request, *args, **kwargs)
@@ -1,35 +1,121 @@
 from django.shortcuts import render
 from rest_framework import generics, permissions
-from .models import Client, Tag
-from .serializers import DynamicClientSerializer, TagSerializer
+from .models import BackgroundJob, Client, ClientTypedValue, Tag
+from .serializers import BackgroundJobSerializer, DynamicClientSerializer, TagSerializer
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status
 from rest_framework.decorators import api_view, permission_classes
-from django.db.models import Q
+from django.db.models import Avg, Count, Max, Min, Q, Sum
 from .column_mapper import normalize_columns, map_excel_data
-import pandas as pd
+from .pagination import ClientKeysetPagination, stream_jsonl_response
+from .filters import ClientDataFilterBackend
+from .search import search_clients
+from .tag_index import TagQueryError, bitmap_to_ids, evaluate_tag_query, ordinals_to_client_ids
+from .typed_values import VALUE_FIELDS, get_column_types
+from .importer import IMPORT_MODE_INSERT, IMPORT_MODES, enqueue_import
+from .import_preview import build_preview, file_hash
+from .jobs import JobNotCancellable, request_cancel
+from .phone import normalize_phone
+from .projection import ClientProjection
+from .default_tag import get_default_tag_id
+from .services import MAX_BULK_OPERATIONS, ClientBulkWriteService, ClientTagBulkService
+from .versioning import GalleryETagListMixin
+from .sync import (
+    InvalidSyncCursor,
+    changed_clients,
+    decode_sync_cursor,
+    deleted_client_ids,
+    is_cursor_expired,
+    new_sync_cursor,
+)
 import io
 import base64
+import logging
 import re
 from django.core.files.uploadedfile import InMemoryUploadedFile
 
+logger = logging.getLogger(__name__)
+
 # Create your views here.
 
-class DynamicClientListCreateView(generics.ListCreateAPIView):
+# 태그 검색식 결과 고객을 조회할 때 한 번에 IN 조건으로 넘기는 ID 수
+TAG_QUERY_FETCH_SIZE = 500
+
+
+class DynamicClientListCreateView(GalleryETagListMixin, generics.ListCreateAPIView):
     serializer_class = DynamicClientSerializer
     permission_classes = [permissions.IsAuthenticated]
+    # cursor/page_size 파라미터가 있을 때만 페이지네이션 (없으면 기존처럼 전체 반환)
+    pagination_class = ClientKeysetPagination
+    # filter.<accessor>=값, sort=<accessor> 서버사이드 필터/정렬
+    filter_backends = [ClientDataFilterBackend]
 
     def get_queryset(self):
         user = getattr(self.request, 'user', None)
         if user and getattr(user, 'gallery_id', None):
-            return Client.objects.filter(gallery_id=user.gallery_id).prefetch_related('tags')
+            queryset = Client.objects.filter(gallery_id=user.gallery_id).prefetch_related('tags')
+            if self.projection is not None:
+                queryset = self.projection.apply(queryset)
+            return queryset
         return Client.objects.none()
 
+    @property
+    def projection(self):
+        """?fields= / ?data_keys= 필드 선택 (GET 목록에만 적용)"""
+        if not hasattr(self, '_projection'):
+            self._projection = None
+            if self.request.method == 'GET':
+                self._projection = ClientProjection.from_request(self.request)
+        return self._projection
+
     def get_serializer_context(self):
         context = super().get_serializer_context()
         context['request'] = self.request
+        context['projection'] = self.projection
         return context
+
+    def list(self, request, *args, **kwargs):
+        # 조회 전에 커서를 만들어야 조회 중 변경된 고객을 다음 동기화에서 받을 수 있음
+        sync_cursor = new_sync_cursor()
+
+        # ?since=<cursor> 이면 변경분만 반환 (델타 동기화)
+        if 'since' in request.query_params:
+            response = self.delta_response(request, sync_cursor)
+        # ?stream=1 이면 JSON Lines 스트리밍 (대용량 갤러리용)
+        elif request.query_params.get('stream') in ('1', 'true', 'jsonl'):
+            queryset = self.filter_queryset(self.get_queryset())
+            if not queryset.query.order_by:
+                queryset = queryset.order_by('created_at', 'id')
+            response = stream_jsonl_response(
+                queryset,
+                self.get_serializer_class(),
+                context=self.get_serializer_context(),
+            )
+        else:
+            response = super().list(request, *args, **kwargs)
+
+        response['X-Sync-Cursor'] = sync_cursor
+        return response
+
+    def delta_response(self, request, sync_cursor):
+        try:
+            since = decode_sync_cursor(request.query_params['since'])
+        except InvalidSyncCursor:
+            return Response({'error': '잘못된 동기화 커서입니다.'}, status=status.HTTP_400_BAD_REQUEST)
+        if is_cursor_expired(since):
+            return Response({
+                'error': '동기화 커서가 만료되었습니다. 전체 목록을 다시 받아주세요.',
+                'reset': True,
+            }, status=status.HTTP_410_GONE)
+
+        queryset = changed_clients(self.filter_queryset(self.get_queryset()), since)
+        serializer = self.get_serializer(queryset, many=True)
+        return Response({
+            'cursor': sync_cursor,
+            'changed': serializer.data,
+            'deleted': deleted_client_ids(request.user.gallery_id, since),
+        })
     
     def create(self, request, *args, **kwargs):
         return super().create(request, *args, **kwargs)
@@ -54,7 +140,31 @@ class DynamicClientRetrieveUpdateView(generics.RetrieveUpdateDestroyAPIView):
 @api_view(['GET'])
 @permission_classes([permissions.IsAuthenticated])
 def filter_clients_by_tag(request):
-    """태그로 고객을 필터링합니다."""
+    """
+    태그로 고객을 필터링합니다.
+
+    ?tag_ids=1&tag_ids=2   태그 중 하나라도 가진 고객 (OR)
+    ?q=VIP AND NOT 휴면     태그 검색식 (AND/OR/NOT, 괄호, "공백 있는 태그", #태그ID)
+    """
+    if request.GET.get('q', '').strip():
+        gallery_id = getattr(request.user, 'gallery_id', None)
+        if not gallery_id:
+            return Response({'error': '갤러리 ID가 없습니다.'}, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            bits = evaluate_tag_query(gallery_id, request.GET['q'])
+            client_ids = ordinals_to_client_ids(gallery_id, bitmap_to_ids(bits))
+        except TagQueryError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        clients = []
+        for start in range(0, len(client_ids), TAG_QUERY_FETCH_SIZE):
+            clients.extend(
+                Client.objects
+                .filter(gallery_id=gallery_id, id__in=client_ids[start:start + TAG_QUERY_FETCH_SIZE])
+                .order_by('id')
+            )
+        serializer = DynamicClientSerializer(clients, many=True, context={'request': request})
+        return Response(serializer.data)
+
     tag_ids = request.GET.getlist('tag_ids[]') or request.GET.getlist('tag_ids')
     
     if not tag_ids:
@@ -71,8 +181,266 @@ def filter_clients_by_tag(request):
     return Response(serializer.data)
 
 
+@api_view(['GET'])
+@permission_classes([permissions.IsAuthenticated])
+def query_clients_by_tags(request):
+    """
+    태그 검색식에 해당하는 고객 ID와 수 (태그 비트맵 인덱스 사용, 연결 테이블 조회 없음)
+
+    ?q=VIP AND NOT 휴면&count_only=true
+    """
+    gallery_id = getattr(request.user, 'gallery_id', None)
+    if not gallery_id:
+        return Response({'error': '갤러리 ID가 없습니다.'}, status=status.HTTP_400_BAD_REQUEST)
+
+    query = request.GET.get('q', '').strip()
+    try:
+        bits = evaluate_tag_query(gallery_id, query)
+    except TagQueryError as e:
+        return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+    response_data = {'query': query, 'count': bits.bit_count()}
+    if request.GET.get('count_only', '').lower() not in ('1', 'true'):
+        response_data['client_ids'] = ordinals_to_client_ids(gallery_id, bitmap_to_ids(bits))
+    return Response(response_data)
+
+
+@api_view(['GET'])
+@permission_classes([permissions.IsAuthenticated])
+def search_clients_view(request):
+    """
+    고객 검색 (고객명/연락처/data 값, 한글 부분 일치 및 초성 검색 지원)
+
+    ?q=검색어&mode=substring|prefix&limit=50
+    """
+    gallery_id = getattr(request.user, 'gallery_id', None)
+    if not gallery_id:
+        return Response({'error': '갤러리 ID가 없습니다.'}, status=status.HTTP_400_BAD_REQUEST)
+
+    query = request.GET.get('q', '').strip()
+    mode = request.GET.get('mode', 'substring')
+    if mode not in ('substring', 'prefix'):
+        return Response({'error': 'mode는 substring 또는 prefix 입니다.'}, status=status.HTTP_400_BAD_REQUEST)
+    try:
+        limit = max(1, min(int(request.GET.get('limit', 50)), 500))
+    except ValueError:
+        return Response({'error': 'limit는 숫자여야 합니다.'}, status=status.HTTP_400_BAD_REQUEST)
+
+    results = search_clients(gallery_id, query, mode=mode, limit=limit) if query else None
+    if results is None:
+        return Response({'error': '검색어가 너무 짧습니다.'}, status=status.HTTP_400_BAD_REQUEST)
+
+    serializer = DynamicClientSerializer(results, many=True, context={'request': request})
+    return Response({
+        'query': query,
+        'count': len(results),
+        'results': serializer.data,
+    })
+
+
+@api_view(['GET'])
+@permission_classes([permissions.IsAuthenticated])
+def lookup_clients_by_phone(request):
+    """
+    연락처로 고객 조회 (입력 형식과 무관하게 E.164 정규화 후 인덱스 조회)
+
+    ?phone=010-1234-5678
+    """
+    gallery_id = getattr(request.user, 'gallery_id', None)
+    if not gallery_id:
+        return Response({'error': '갤러리 ID가 없습니다.'}, status=status.HTTP_400_BAD_REQUEST)
+
+    normalized = normalize_phone(request.GET.get('phone', ''))
+    if not normalized:
+        return Response({'error': '올바른 전화번호를 입력해주세요.'}, status=status.HTTP_400_BAD_REQUEST)
+
+    clients = Client.objects.filter(gallery_id=gallery_id, phone_normalized=normalized).prefetch_related('tags')
+    serializer = DynamicClientSerializer(clients, many=True, context={'request': request})
+    return Response({
+        'phone_normalized': normalized,
+        'results': serializer.data,
+    })
+
+
+@api_view(['GET'])
+@permission_classes([permissions.IsAuthenticated])
+def find_duplicate_phone_clients(request):
+    """
+    같은 연락처(정규화 기준)를 가진 고객 그룹 조회
+    """
+    gallery_id = getattr(request.user, 'gallery_id', None)
+    if not gallery_id:
+        return Response({'error': '갤러리 ID가 없습니다.'}, status=status.HTTP_400_BAD_REQUEST)
+
+    duplicate_phones = (
+        Client.objects
+        .filter(gallery_id=gallery_id, phone_normalized__isnull=False)
+        .values('phone_normalized')
+        .annotate(client_count=Count('id'))
+        .filter(client_count__gt=1)
+        .values_list('phone_normalized', flat=True)
+    )
+    groups = {}
+    for client_id, phone in Client.objects.filter(
+        gallery_id=gallery_id, phone_normalized__in=duplicate_phones
+    ).order_by('phone_normalized', 'id').values_list('id', 'phone_normalized'):
+        groups.setdefault(phone, []).append(client_id)
+
+    return Response({
+        'group_count': len(groups),
+        'groups': [
+            {'phone_normalized': phone, 'client_ids': ids}
+            for phone, ids in groups.items()
+        ],
+    })
+
+
+@api_view(['POST'])
+@permission_classes([permissions.IsAuthenticated])
+def bulk_write_clients(request):
+    """
+    고객 생성/수정/삭제 일괄 처리 (한 트랜잭션)
+
+    {"operations": [{"op": "create"|"update"|"delete", ...}, ...], "atomic": false}
+    항목별 결과를 요청 순서대로 반환합니다. atomic=true면 실패 항목이 있을 때 전체를 반영하지 않습니다.
+    """
+    gallery_id = getattr(request.user, 'gallery_id', None)
+    if not gallery_id:
+        return Response({'error': '갤러리 ID가 없습니다.'}, status=status.HTTP_400_BAD_REQUEST)
+
+    operations = request.data.get('operations')
+    if not isinstance(operations, list) or not operations:
+        return Response({'error': 'operations 목록이 필요합니다.'}, status=status.HTTP_400_BAD_REQUEST)
+    if len(operations) > MAX_BULK_OPERATIONS:
+        return Response(
+            {'error': f'한 번에 최대 {MAX_BULK_OPERATIONS}건까지 처리할 수 있습니다.'},
+            status=status.HTTP_400_BAD_REQUEST,
+        )
+
+    atomic = bool(request.data.get('atomic', False))
+    results, error_count = ClientBulkWriteService(gallery_id).execute(operations, atomic=atomic)
+    applied = not (atomic and error_count)
+    return Response({
+        'success': error_count == 0,
+        'applied': applied,
+        'error_count': error_count,
+        'results': results,
+    }, status=status.HTTP_200_OK if applied else status.HTTP_400_BAD_REQUEST)
+
+
+@api_view(['POST'])
+@permission_classes([permissions.IsAuthenticated])
+def bulk_update_client_tags(request):
+    """
+    여러 고객의 태그 일괄 추가/제거/교체
+
+    {"action": "add"|"remove"|"replace", "tag_ids": [...], "client_ids": [...]}
+    client_ids 대신 "all": true와 목록 API와 같은 filter.* 쿼리 파라미터로 대상을 고를 수 있습니다.
+    """
+    gallery_id = getattr(request.user, 'gallery_id', None)
+    if not gallery_id:
+        return Response({'error': '갤러리 ID가 없습니다.'}, status=status.HTTP_400_BAD_REQUEST)
+
+    action = request.data.get('action')
+    if action not in ClientTagBulkService.ACTIONS:
+        return Response({'error': 'action은 add, remove, replace 중 하나여야 합니다.'}, status=status.HTTP_400_BAD_REQUEST)
+    tag_ids = request.data.get('tag_ids', [])
+    if not isinstance(tag_ids, list) or not all(isinstance(tag_id, int) for tag_id in tag_ids):
+        return Response({'error': 'tag_ids는 정수 목록이어야 합니다.'}, status=status.HTTP_400_BAD_REQUEST)
+    if not tag_ids and action != 'replace':
+        return Response({'error': 'tag_ids가 필요합니다.'}, status=status.HTTP_400_BAD_REQUEST)
+
+    service = ClientTagBulkService(gallery_id)
+    valid_tag_ids = service.valid_tag_ids(tag_ids)
+    unknown = set(tag_ids) - set(valid_tag_ids)
+    if unknown:
+        return Response(
+            {'error': f"존재하지 않는 태그입니다: {', '.join(map(str, sorted(unknown)))}"},
+            status=status.HTTP_400_BAD_REQUEST,
+        )
+
+    clients = Client.objects.filter(gallery_id=gallery_id)
+    client_ids = request.data.get('client_ids')
+    if client_ids is not None:
+        if not isinstance(client_ids, list) or not all(isinstance(client_id, int) for client_id in client_ids):
+            return Response({'error': 'client_ids는 정수 목록이어야 합니다.'}, status=status.HTTP_400_BAD_REQUEST)
+        clients = clients.filter(id__in=client_ids)
+    elif request.data.get('all') is True:
+        # 목록 API와 같은 filter.* 파라미터로 대상 선택 (없으면 갤러리 전체)
+        clients = ClientDataFilterBackend().filter_queryset(request, clients, None)
+    else:
+        return Response({'error': 'client_ids 또는 all: true가 필요합니다.'}, status=status.HTTP_400_BAD_REQUEST)
+
+    result = service.apply(clients, action, valid_tag_ids)
+    return Response({'success': True, 'action': action, **result})
+
+
+@api_view(['GET'])
+@permission_classes([permissions.IsAuthenticated])
+def client_column_stats(request):
+    """
+    숫자/날짜 컬럼 집계 (타입 인덱스 사용)
+
+    ?accessor=작품가 [&filter.*=... 목록 API와 같은 필터]
+    number: count/min/max/sum/avg, date: count/min/max, boolean: count/true_count
+    """
+    gallery_id = getattr(request.user, 'gallery_id', None)
+    if not gallery_id:
+        return Response({'error': '갤러리 ID가 없습니다.'}, status=status.HTTP_400_BAD_REQUEST)
+
+    accessor = request.GET.get('accessor', '').strip()
+    column_type = get_column_types(gallery_id).get(accessor)
+    if column_type is None:
+        return Response(
+            {'error': '숫자/날짜/참거짓 타입 컬럼의 accessor를 지정해주세요.'},
+            status=status.HTTP_400_BAD_REQUEST,
+        )
+
+    values = ClientTypedValue.objects.filter(gallery_id=gallery_id, accessor=accessor)
+    if any(param.startswith('filter.') for param in request.GET):
+        clients = ClientDataFilterBackend().filter_queryset(request, Client.objects.filter(gallery_id=gallery_id), None)
+        values = values.filter(client_id__in=clients.order_by().values('id'))
+
+    field = VALUE_FIELDS[column_type]
+    if column_type == 'boolean':
+        stats = values.aggregate(count=Count('id'), true_count=Count('id', filter=Q(bool_value=True)))
+    elif column_type == 'date':
+        stats = values.aggregate(count=Count('id'), min=Min(field), max=Max(field))
+    else:
+        stats = values.aggregate(count=Count('id'), min=Min(field), max=Max(field), sum=Sum(field), avg=Avg(field))
+    return Response({'accessor': accessor, 'type': column_type, **stats})
+
+
+@api_view(['GET'])
+@permission_classes([permissions.IsAuthenticated])
+def background_job_detail(request, job_id):
+    """백그라운드 작업 상태/진행률 조회"""
+    gallery_id = getattr(request.user, 'gallery_id', None)
+    job = BackgroundJob.objects.filter(id=job_id, gallery_id=gallery_id).first()
+    if job is None:
+        return Response({'error': '작업을 찾을 수 없습니다.'}, status=status.HTTP_404_NOT_FOUND)
+    return Response(BackgroundJobSerializer(job).data)
+
+
+@api_view(['POST'])
+@permission_classes([permissions.IsAuthenticated])
+def cancel_background_job(request, job_id):
+    """백그라운드 작업 취소 요청 (처리 중인 청크까지 반영 후 중단)"""
+    gallery_id = getattr(request.user, 'gallery_id', None)
+    job = BackgroundJob.objects.filter(id=job_id, gallery_id=gallery_id).first()
+    if job is None:
+        return Response({'error': '작업을 찾을 수 없습니다.'}, status=status.HTTP_404_NOT_FOUND)
+    try:
+        requested = request_cancel(job)
+    except JobNotCancellable:
+        return Response({'error': '이 작업은 취소할 수 없습니다.'}, status=status.HTTP_409_CONFLICT)
+    if not requested:
+        return Response({'error': '이미 종료된 작업입니다.'}, status=status.HTTP_409_CONFLICT)
+    return Response(BackgroundJobSerializer(job).data, status=status.HTTP_202_ACCEPTED)
+
+
 # Tag CRUD API
-class TagListCreateView(generics.ListCreateAPIView):
+class TagListCreateView(GalleryETagListMixin, generics.ListCreateAPIView):
     """태그 목록 조회 및 생성"""
     serializer_class = TagSerializer
     permission_classes = [permissions.IsAuthenticated]
@@ -209,28 +577,15 @@ def fix_clients_without_tags(request):
         clients_without_tags = Client.objects.filter(
             gallery_id=gallery_id,
             tags__isnull=True
-        ).distinct()
-        
-        print(f"🔧 [FIX TAGS] 태그가 없는 클라이언트 수: {clients_without_tags.count()}")
-        
-        # 기본 태그 생성 또는 찾기
-        default_tag, created = Tag.objects.get_or_create(
-            gallery_id=gallery_id,
-            name='일반고객',
-            defaults={'color': '#6B7280'}
         )
         
-        if created:
-            print(f"🔧 [FIX TAGS] 기본 태그 생성됨: {default_tag.name}")
-        else:
-            print(f"🔧 [FIX TAGS] 기존 기본 태그 사용: {default_tag.name}")
+        # 기본 태그 찾기 (없으면 생성)
+        default_tag_id = get_default_tag_id(gallery_id)
         
-        # 각 클라이언트에 기본 태그 할당
-        fixed_count = 0
-        for client in clients_without_tags:
-            client.tags.add(default_tag)
-            print(f"🔧 [FIX TAGS] {client.name} (ID: {client.id})에 기본 태그 할당")
-            fixed_count += 1
+        # 기본 태그 일괄 할당 (연결 테이블 INSERT ... SELECT 한 번)
+        result = ClientTagBulkService(gallery_id).apply(clients_without_tags, 'add', [default_tag_id])
+        fixed_count = result['added']
+        logger.info("기본 태그 할당: gallery_id=%s, %s개 클라이언트", gallery_id, fixed_count)
         
         return Response({
             'success': True,
@@ -239,7 +594,7 @@ def fix_clients_without_tags(request):
         })
         
     except Exception as e:
-        print(f"❌ [FIX TAGS] 태그 수정 실패: {e}")
+        logger.exception("기본 태그 일괄 할당 실패: gallery_id=%s", getattr(request.user, 'gallery_id', None))
         return Response({
             'error': f'태그 수정 실패: {str(e)}'
         }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
@@ -269,274 +624,75 @@ def log_frontend_debug(request):
         return Response({'error': str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
 
+@api_view(['POST'])
+@permission_classes([permissions.IsAuthenticated])
+def preview_excel_file(request):
+    """
+    엑셀/CSV 가져오기 미리보기 (clients.import_preview)
+
+    모든 행 기준 컬럼별 타입 추론(연락처/날짜/숫자/참거짓, 고유 값 수, 빈 셀 비율),
+    제안 매핑(column_mappings 형식)과 샘플 행을 반환합니다. 같은 파일은 캐시된 결과를 사용합니다.
+    """
+    if 'file' not in request.FILES:
+        return Response({'error': '파일이 필요합니다.'}, status=status.HTTP_400_BAD_REQUEST)
+    
+    try:
+        preview = build_preview(getattr(request.user, 'gallery_id', None), request.FILES['file'])
+        logger.debug('엑셀 미리보기: %s행, 캐시 %s', preview['row_count'], '사용' if preview['cached'] else '생성')
+        return Response(preview)
+    except Exception as e:
+        logger.exception('엑셀 미리보기 실패')
+        return Response({'error': f'엑셀 미리보기 중 오류: {str(e)}'}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+
 @api_view(['POST'])
 @permission_classes([permissions.IsAuthenticated])
 def process_excel_file_pandas_with_mapping(request):
     """
-    pandas를 사용한 엑셀 파일 처리 (컬럼 매핑 정보 포함)
+    엑셀 파일 처리 (컬럼 매핑 정보 포함, .csv/.tsv 파일도 같은 매핑/저장 경로로 처리)
+
+    파일을 저장소에 올리고 가져오기 작업(import_clients)만 등록한 뒤 바로 응답합니다 (202).
+    worker(run_background_jobs)가 행을 스트리밍하며 청크 단위로 저장하고(clients.importer),
+    진행 상황은 jobs/<job_id>/, 취소는 jobs/<job_id>/cancel/ 로 처리합니다.
     """
     if 'file' not in request.FILES:
         return Response({'error': '파일이 필요합니다.'}, status=status.HTTP_400_BAD_REQUEST)
     
     excel_file = request.FILES['file']
     column_mappings_str = request.POST.get('column_mappings', '{}')
+    # insert(기본): 모두 새로 생성, phone / name_phone: 같은 연락처(+고객명) 고객은 병합
+    import_mode = request.POST.get('import_mode', IMPORT_MODE_INSERT)
+    if import_mode not in IMPORT_MODES:
+        return Response(
+            {'error': f"import_mode는 {', '.join(IMPORT_MODES)} 중 하나여야 합니다."},
+            status=status.HTTP_400_BAD_REQUEST,
+        )
     
     try:
         # 매핑 정보 파싱
         import json
         column_mappings = json.loads(column_mappings_str)
-        
-        # pandas로 엑셀 파일 읽기
-        df = pd.read_excel(excel_file, engine='openpyxl', header=0)
-        df = df.dropna(how='all')
-        
-        
-        # 🔧 Unnamed 컬럼 처리 + 중복 문제 해결 (기존 성공 로직 적용)
-        cleaned_columns = []
-        for i, col in enumerate(df.columns):
-            # Unnamed 컬럼의 경우 첫 번째 행의 값을 헤더로 사용
-            if str(col).startswith('Unnamed'):
-                first_row_value = df.iloc[0, i]
-                if pd.notna(first_row_value) and str(first_row_value).strip():
-                    cleaned_columns.append(str(first_row_value).strip())
-                else:
-                    cleaned_columns.append(f'column{i+1}')
-            else:
-                cleaned_columns.append(str(col).strip())
-        
-        # 중복 컬럼명 처리
-        final_columns = []
-        column_counts = {}
-        for col in cleaned_columns:
-            if col in column_counts:
-                column_counts[col] += 1
-                final_columns.append(f"{col}_{column_counts[col]}")
-            else:
-                column_counts[col] = 0
-                final_columns.append(col)
-        
-        # 컬럼명 적용
-        df.columns = final_columns
-        
-        # 헤더로 사용된 첫 번째 행 제거 (Unnamed 컬럼이 있었던 경우)
-        has_unnamed = any(str(original_col).startswith('Unnamed') for original_col in pd.read_excel(excel_file, engine='openpyxl', header=0).columns)
-        if has_unnamed:
-            df = df.iloc[1:].reset_index(drop=True)
-        
-        
-        # 매핑 정보에 따라 컬럼명 변경 및 새 컬럼 생성 준비
-        column_rename_map = {}
-        new_columns_to_create = []
-        
-        print(f"🔍 [EXCEL DEBUG] 전달받은 매핑 정보: {column_mappings}")
-        
-        # 기존 컬럼 정보를 가져와서 ID -> accessor 매핑 테이블 생성
-        from .models import ClientColumn
-        user_gallery_id = getattr(request.user, 'gallery_id', None)
-        existing_columns = ClientColumn.objects.filter(gallery_id=user_gallery_id)
-        id_to_accessor_map = {str(col.id): col.accessor for col in existing_columns}
-        id_to_header_map = {str(col.id): col.header for col in existing_columns}
-        
-        print(f"🔍 [EXCEL DEBUG] ID->accessor 매핑: {id_to_accessor_map}")
-        print(f"🔍 [EXCEL DEBUG] ID->header 매핑: {id_to_header_map}")
-        
-        for original_header, mapped_to in column_mappings.items():
-            print(f"🔍 [EXCEL DEBUG] 매핑 처리: {original_header} -> {mapped_to}")
-            
-            if mapped_to.startswith('new_'):
-                # 새 컬럼인 경우 헤더명 그대로 사용하고 생성할 컬럼 목록에 추가
-                column_rename_map[original_header] = original_header
-                new_columns_to_create.append({
-                    'header': original_header,
-                    'accessor': original_header,  # 🔧 header와 동일하게 설정하여 데이터 매핑 일관성 유지
-                    'type': 'text',
-                    'order': 100 + len(new_columns_to_create)  # 기본 컬럼 이후에 배치
-                })
-                print(f"✅ [EXCEL DEBUG] 새 컬럼 추가: {original_header}")
-            else:
-                # 기존 컬럼에 매핑하는 경우 - ID를 accessor로 변환
-                if mapped_to in id_to_accessor_map:
-                    target_accessor = id_to_accessor_map[mapped_to]
-                    column_rename_map[original_header] = target_accessor
-                    print(f"✅ [EXCEL DEBUG] 기존 컬럼 매핑: {original_header} -> {target_accessor} (ID: {mapped_to})")
-                else:
-                    # ID를 찾을 수 없는 경우 - 새 컬럼으로 처리
-                    column_rename_map[original_header] = original_header
-                    new_columns_to_create.append({
-                        'header': original_header,
-                        'accessor': original_header,
-                        'type': 'text',
-                        'order': 100 + len(new_columns_to_create)
-                    })
-                    print(f"⚠️ [EXCEL DEBUG] ID를 찾을 수 없어 새 컬럼으로 생성: {original_header} -> {mapped_to}")
-        
-        print(f"🔍 [EXCEL DEBUG] 생성할 새 컬럼 목록: {new_columns_to_create}")
-        print(f"🔍 [EXCEL DEBUG] 최종 컬럼 매핑: {column_rename_map}")
-        
-        # 새 컬럼들을 데이터베이스에 생성 (갤러리별 중복 방지)
-        from .models import ClientColumn
-        user_gallery_id = getattr(request.user, 'gallery_id', None)
-        created_columns = []
-        
-        for col_data in new_columns_to_create:
-            try:
-                print(f"🔧 [EXCEL DEBUG] 새 컬럼 생성 시도: {col_data}")
-                
-                # 갤러리별 중복 체크: 같은 갤러리 내에서만 중복 확인
-                existing_column = ClientColumn.objects.filter(
-                    gallery_id=user_gallery_id,
-                    accessor=col_data['accessor']  # accessor로 중복 체크 (더 정확함)
-                ).first()
-                
-                if existing_column:
-                    print(f"✅ [EXCEL DEBUG] 기존 컬럼 사용: {existing_column.header} (ID: {existing_column.id})")
-                    created_columns.append(existing_column)
-                else:
-                    # 새 컬럼 생성 (갤러리 정보 포함)
-                    new_column = ClientColumn.objects.create(
-                        gallery_id=user_gallery_id,
-                        header=col_data['header'],
-                        accessor=col_data['accessor'],
-                        type=col_data['type'],
-                        order=col_data['order']
-                    )
-                    print(f"✅ [EXCEL DEBUG] 새 컬럼 생성 완료: {new_column.header} (ID: {new_column.id})")
-                    created_columns.append(new_column)
-                    
-            except Exception as e:
-                print(f"❌ [EXCEL DEBUG] 컬럼 생성 실패: {col_data['header']}, 에러: {e}")
-                pass  # 컬럼 생성 실패 시 무시하고 계속
-        
-        print(f"🔍 [EXCEL DEBUG] 생성/확인된 컬럼 수: {len(created_columns)}")
-        
-        
-        
-        # 실제 컬럼명 변경
-        df = df.rename(columns=column_rename_map)
-        
-        print(f"🔍 [EXCEL DEBUG] 컬럼명 변경 후 DataFrame 컬럼들: {list(df.columns)}")
-        print(f"🔍 [EXCEL DEBUG] DataFrame 첫 번째 행 샘플: {df.iloc[0].to_dict() if len(df) > 0 else 'No data'}")
-        
-        # 나머지는 기존 pandas 로직과 동일
-        df_dict = df.to_dict('records')
-        
-        created_count = 0
-        failed_count = 0
-        
-        for row_data in df_dict:
-            try:
-                print(f"🔍 [EXCEL DEBUG] 처리할 row_data 키들: {list(row_data.keys())}")
-                print(f"🔍 [EXCEL DEBUG] row_data 샘플: {dict(list(row_data.items())[:5])}")
-                
-                # 기본 필드 분리 - 매핑된 accessor와 원본 컬럼명 모두 확인
-                name = ''
-                phone = ''
-                tags_data = ''
-                
-                # 매핑된 컬럼들을 기반으로 기본 필드 추출
-                print(f"🔍 [EXCEL DEBUG] 매핑 전 row_data 키들: {list(row_data.keys())}")
-                print(f"🔍 [EXCEL DEBUG] 컬럼 매핑 정보: {column_rename_map}")
-                
-                # 기본 필드 매핑 테이블 생성 (원본 컬럼명 -> 기본 필드)
-                name_fields = ['name', '고객명', 'customer_name']
-                phone_fields = ['phone', '연락처', '전화번호', '휴대폰', '핸드폰']
-                category_fields = ['category', '고객분류', '고객 분류', 'tags']
-                
-                # row_data에서 기본 필드 추출
-                keys_to_remove = []
-                for key, value in row_data.items():
-                    # 고객명 추출
-                    if key in name_fields or any(mapped_key in name_fields for mapped_key in [column_rename_map.get(key, key)]):
-                        name = str(value).strip() if value and pd.notna(value) else ''
-                        keys_to_remove.append(key)
-                        print(f"🔍 [EXCEL DEBUG] name 필드 데이터 추출 (key: {key}): '{name}'")
-                    
-                    # 연락처 추출
-                    elif key in phone_fields or any(mapped_key in phone_fields for mapped_key in [column_rename_map.get(key, key)]):
-                        phone = str(value).strip() if value and pd.notna(value) else ''
-                        keys_to_remove.append(key)
-                        print(f"🔍 [EXCEL DEBUG] phone 필드 데이터 추출 (key: {key}): '{phone}'")
-                    
-                    # 고객분류/태그 추출
-                    elif key in category_fields or any(mapped_key in category_fields for mapped_key in [column_rename_map.get(key, key)]):
-                        tags_data = str(value).strip() if value and pd.notna(value) else ''
-                        keys_to_remove.append(key)
-                        print(f"🔍 [EXCEL DEBUG] tags 필드 데이터 추출 (key: {key}): '{tags_data}'")
-                
-                # 추출한 기본 필드들을 row_data에서 제거
-                for key in keys_to_remove:
-                    row_data.pop(key, None)
-                
-                print(f"🔍 [EXCEL DEBUG] 추출된 기본 데이터: name='{name}', phone='{phone}', tags='{tags_data}'")
-                
-                # 나머지는 data 필드에 저장
-                client_data = {key: value for key, value in row_data.items() 
-                             if pd.notna(value) and str(value).strip()}
-                
-                print(f"🔍 [EXCEL DEBUG] 남은 client_data: {client_data}")
-                
-                print(f"🔍 [EXCEL DEBUG] 최종 저장될 데이터: name='{name}', phone='{phone}'")
-                print(f"🔍 [EXCEL DEBUG] client_data에 저장될 데이터: {client_data}")
-                
-                # 빈 데이터 필터링
-                clean_client_data = {}
-                for key, value in client_data.items():
-                    if pd.notna(value) and str(value).strip():
-                        clean_client_data[key] = str(value).strip()
-                
-                
-                client = Client.objects.create(
-                    gallery_id=getattr(request.user, 'gallery_id', None),
-                    name=name,
-                    phone=phone,
-                    data=clean_client_data
-                )
-                
-                # 태그 처리 (고객분류 데이터가 있는 경우)
-                if tags_data:
-                    try:
-                        # 태그명으로 기존 태그 찾거나 생성
-                        tag, created = Tag.objects.get_or_create(
-                            gallery_id=getattr(request.user, 'gallery_id', None),
-                            name=tags_data,
-                            defaults={'color': '#3B82F6'}  # 기본 파란색
-                        )
-                        client.tags.add(tag)
-                        print(f"🔍 [EXCEL DEBUG] 태그 추가: '{tags_data}' ({'새 태그' if created else '기존 태그'})")
-                    except Exception as tag_error:
-                        print(f"❌ [EXCEL DEBUG] 태그 생성/할당 실패: {tag_error}")
-                
-                # 태그가 없으면 기본 태그 할당
-                if not client.tags.exists():
-                    try:
-                        default_tag, created = Tag.objects.get_or_create(
-                            gallery_id=getattr(request.user, 'gallery_id', None),
-                            name='일반고객',
-                            defaults={'color': '#6B7280'}
-                        )
-                        client.tags.add(default_tag)
-                        print(f"🔍 [EXCEL DEBUG] 기본 태그 할당: 일반고객")
-                    except Exception as tag_error:
-                        print(f"❌ [EXCEL DEBUG] 기본 태그 할당 실패: {tag_error}")
-                        pass  # 기본 태그 할당 실패 시 무시
-                created_count += 1
-                
-            except Exception as row_error:
-                failed_count += 1
-                continue
-        
-        # 중복 컬럼 정리 로직 제거 - 수동 매핑으로 중복 방지 완료, 갤러리별 독립성 보장
-        
+        logger.debug('엑셀 가져오기 매핑: %s', column_mappings)
+        
+        job = enqueue_import(
+            getattr(request.user, 'gallery_id', None),
+            excel_file,
+            column_mappings,
+            created_by=request.user,
+            file_hash=file_hash(excel_file),  # 미리보기한 파일이면 캐시된 파싱 결과 사용
+            mode=import_mode,
+        )
+        logger.info('엑셀 가져오기 작업 등록: #%s (%s)', job.id, import_mode)
         
         return Response({
-            'message': f'업로드 완료: 성공 {created_count}건, 실패 {failed_count}건',
-            'created_count': created_count,
-            'failed_count': failed_count,
-            'column_mapping': column_rename_map,
-            'new_columns_created': len(new_columns_to_create)
-        })
+            'message': '업로드가 접수되었습니다. 진행 상황은 작업 조회로 확인해주세요.',
+            'status': 'queued',
+            'job_id': job.id,
+            'job': BackgroundJobSerializer(job).data,
+        }, status=status.HTTP_202_ACCEPTED)
         
     except Exception as e:
+        logger.exception('엑셀 가져오기 작업 등록 실패')
         return Response({'error': f'엑셀 처리 중 오류: {str(e)}'}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
 # process_excel_file_pandas 함수 제거됨 (UI에서 사용하지 않음)
\ No newline at end of file
@@ -1,12 +1,16 @@
 import os
-import re
 import time
 from django.conf import settings
 from django.utils import timezone
 from twilio.rest import Client as TwilioClient
 from twilio.base.exceptions import TwilioException
 from .models import SMSMessage, SMSDelivery
+from django.db.models import Q
+from clients.column_keys import get_data_key_map
 from clients.models import Client
+from clients.phone import normalize_phone
+
+CONSENT_ACCESSOR = '문자수신동의'
 
 
 class TwilioSMSService:
@@ -58,23 +62,18 @@ class TwilioSMSService:
             }
     
     def format_phone_number(self, phone_number):
-        """전화번호를 국제 형식으로 변환"""
+        """전화번호를 국제 형식(E.164)으로 변환"""
         if not phone_number:
             raise ValueError("전화번호가 비어있습니다.")
         
-        # 숫자만 추출
-        digits_only = re.sub(r'\D', '', phone_number)
+        # 이미 정규화된 번호(Client.phone_normalized)는 그대로 사용
+        if phone_number.startswith('+') and phone_number[1:].isdigit():
+            return phone_number
         
-        # 한국 번호 형식 처리
-        if digits_only.startswith('010'):
-            return f'+82{digits_only[1:]}'  # 010 -> +8210
-        elif digits_only.startswith('82'):
-            return f'+{digits_only}'  # 82 -> +82
-        elif digits_only.startswith('1') and len(digits_only) == 11:
-            return f'+{digits_only}'  # 미국 번호 (테스트용)
-        else:
-            # 기타 형식은 그대로 + 추가
-            return f'+{digits_only}' if not digits_only.startswith('+') else digits_only
+        normalized = normalize_phone(phone_number)
+        if not normalized:
+            raise ValueError(f"올바르지 않은 전화번호입니다: {phone_number}")
+        return normalized
     
     def render_template(self, template, client, gallery):
         """메시지 템플릿에서 변수 치환"""
@@ -134,13 +133,13 @@ class BulkSMSService:
                 delivery = SMSDelivery.objects.create(
                     message=sms_message,
                     client=client,
-                    phone_number=client.phone,
+                    phone_number=client.phone_normalized,
                     personalized_message=personalized_message,
                     status='pending'
                 )
                 
                 # SMS 발송
-                result = self.twilio_service.send_sms(client.phone, personalized_message)
+                result = self.twilio_service.send_sms(client.phone_normalized, personalized_message)
                 
                 # 결과 업데이트
                 if result['success']:
@@ -164,7 +163,7 @@ class BulkSMSService:
                 results.append({
                     'client_id': client.id,
                     'client_name': client.name,
-                    'phone': client.phone,
+                    'phone': client.phone_normalized,
                     'success': result['success'],
                     'sid': result['sid'],
                     'error': result['error']
@@ -204,25 +203,18 @@ class BulkSMSService:
             }
     
     def get_eligible_clients(self, gallery, client_ids):
-        """발송 가능한 고객들만 필터링"""
+        """발송 가능한 고객들만 필터링 (정규화 연락처 인덱스 사용)"""
         
+        # 정규화된 연락처가 있고, 문자수신동의가 명시적으로 거부(False)되지 않은 고객
+        # (컬럼 ID 키 갤러리는 '#<컬럼 ID>' 키, 키를 옮기는 중이면 이전 키까지 모두 확인)
+        consent_q = Q()
+        for key in get_data_key_map(gallery.id).source_keys(CONSENT_ACCESSOR):
+            consent_q &= Q(**{f'data__{key}__isnull': True}) | ~Q(**{f'data__{key}': False})
         clients = Client.objects.filter(
+            consent_q,
             id__in=client_ids,
-            gallery=gallery
-        )
-        
-        eligible_clients = []
-        
-        for client in clients:
-            # 전화번호 확인
-            if not client.phone or client.phone.strip() == '':
-                continue
-            
-            # 수신 동의 확인 (data 필드의 문자수신동의)
-            if hasattr(client, 'data') and client.data:
-                if client.data.get('문자수신동의') == False:
-                    continue
-            
-            eligible_clients.append(client)
+            gallery=gallery,
+            phone_normalized__isnull=False,
+        ).exclude(phone_normalized='')
         
-        return eligible_clients
\ No newline at end of file
+        return list(clients)
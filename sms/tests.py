@@ -1,3 +1,46 @@
 from django.test import TestCase
 
-# Create your tests here.
+from accounts.models import Gallery
+from clients.column_keys import KEY_MODE_COLUMN_ID, column_key
+from clients.models import Client, ClientColumn
+
+from .services import CONSENT_ACCESSOR, BulkSMSService
+
+
+class EligibleClientTests(TestCase):
+    def setUp(self):
+        self.gallery = Gallery.objects.create(name='테스트 갤러리', address='-', phone='-', email='gallery@example.com')
+        # Twilio 설정 없이 수신 대상 필터만 사용
+        self.service = BulkSMSService.__new__(BulkSMSService)
+
+    def add_clients(self):
+        return {
+            consent: Client.objects.create(
+                gallery=self.gallery,
+                name=f'고객{index}',
+                phone=f'010-2000-{index:04d}',
+                data={} if consent is None else {CONSENT_ACCESSOR: consent},
+            )
+            for index, consent in enumerate((True, False, None))
+        }
+
+    def eligible_ids(self, clients):
+        ids = [client.pk for client in clients.values()]
+        return sorted(client.pk for client in self.service.get_eligible_clients(self.gallery, ids))
+
+    def test_excludes_refused_clients(self):
+        clients = self.add_clients()
+        self.assertEqual(self.eligible_ids(clients), sorted([clients[True].pk, clients[None].pk]))
+
+    def test_excludes_refused_clients_in_column_id_gallery(self):
+        self.gallery.client_data_key_mode = KEY_MODE_COLUMN_ID
+        self.gallery.save()
+        clients = self.add_clients()
+        with self.captureOnCommitCallbacks(execute=True):
+            column = ClientColumn.objects.create(
+                gallery=self.gallery, header=CONSENT_ACCESSOR, accessor=CONSENT_ACCESSOR, type='boolean'
+            )
+        clients[False].refresh_from_db()
+        self.assertEqual(clients[False].data, {column_key(column.pk): False})
+
+        self.assertEqual(self.eligible_ids(clients), sorted([clients[True].pk, clients[None].pk]))